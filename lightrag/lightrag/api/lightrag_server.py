@@ -54,6 +54,7 @@ from lightrag.api.routers.comic_routes import create_comic_routes
 from lightrag.api.routers.ollama_api import OllamaAPI
 
 from lightrag.utils import logger, set_verbose_debug
+from lightrag.http_clients import close_http_clients
 from lightrag.kg.shared_storage import (
     get_namespace_data,
     initialize_pipeline_status,
@@ -220,6 +221,7 @@ def create_app(args):
         finally:
             # Clean up database connections
             await rag.finalize_storages()
+            await close_http_clients()
 
             # Clean up shared data
             finalize_share_data()
@@ -472,6 +474,24 @@ def create_app(args):
                     return await jina_embed(
                         texts, dimensions=dimensions, base_url=host, api_key=api_key
                     )
+                elif binding == "onnx":
+                    from lightrag.llm.onnx import (
+                        DEFAULT_ONNX_BATCH_SIZE,
+                        DEFAULT_ONNX_MAX_LENGTH,
+                        onnx_embed,
+                    )
+
+                    return await onnx_embed(
+                        texts,
+                        model=model,
+                        pooling=get_env_value("ONNX_POOLING", None, special_none=True),
+                        batch_size=get_env_value(
+                            "ONNX_BATCH_SIZE", DEFAULT_ONNX_BATCH_SIZE, int
+                        ),
+                        max_length=get_env_value(
+                            "ONNX_MAX_LENGTH", DEFAULT_ONNX_MAX_LENGTH, int
+                        ),
+                    )
                 else:  # openai and compatible
                     from lightrag.llm.openai import openai_embed
 
@@ -527,18 +547,26 @@ def create_app(args):
             dimensions=args.embedding_dim,
             args=args,  # Pass args object for fallback option generation
         ),
+        truncate_dim=args.embedding_truncate_dim,
+        model_name=args.embedding_model,
     )
 
     # Configure rerank function based on args.rerank_bindingparameter
     rerank_model_func = None
     if args.rerank_binding != "null":
-        from lightrag.rerank import cohere_rerank, jina_rerank, ali_rerank
+        from lightrag.rerank import (
+            cohere_rerank,
+            jina_rerank,
+            ali_rerank,
+            local_rerank,
+        )
 
         # Map rerank binding to corresponding function
         rerank_functions = {
             "cohere": cohere_rerank,
             "jina": jina_rerank,
             "aliyun": ali_rerank,
+            "local": local_rerank,
         }
 
         # Select the appropriate rerank function based on binding
@@ -563,6 +591,9 @@ def create_app(args):
                 if default_base_url != inspect.Parameter.empty:
                     args.rerank_binding_host = default_base_url
 
+        if args.rerank_binding == "local" and not args.rerank_model:
+            raise ValueError("RERANK_MODEL is required for the local rerank binding")
+
         async def server_rerank_func(
             query: str, documents: list, top_n: int = None, extra_body: dict = None
         ):
@@ -577,6 +608,11 @@ def create_app(args):
                 extra_body=extra_body,
             )
 
+        # Identifies the model in the rerank score cache
+        server_rerank_func.model_name = f"{args.rerank_binding}:{args.rerank_model}"
+        server_rerank_func.max_candidates = getattr(
+            selected_rerank_func, "max_candidates", None
+        )
         rerank_model_func = server_rerank_func
         logger.info(
             f"Reranking is enabled: {args.rerank_model or 'default model'} using {args.rerank_binding} provider"
@@ -640,7 +676,7 @@ def create_app(args):
         )
     )
     app.include_router(create_query_routes(rag, api_key, args.top_k))
-    app.include_router(create_graph_routes(rag, api_key))
+    app.include_router(create_graph_routes(rag, api_key, args.graph_cache_size))
     app.include_router(create_podcast_routes(rag, api_key))
     app.include_router(create_comic_routes(rag, api_key))
 
@@ -776,6 +812,16 @@ def create_app(args):
                 "auth_mode": auth_mode,
                 "pipeline_busy": pipeline_status.get("busy", False),
                 "keyed_locks": keyed_lock_info,
+                "concurrency": {
+                    "llm": rag.llm_model_func.stats(),
+                    "embedding": rag.embedding_func.stats(),
+                },
+                "embedding_store": (
+                    rag.embedding_store.stats() if rag.embedding_store else None
+                ),
+                "rerank_score_cache": (
+                    rag.rerank_score_cache.stats() if rag.rerank_score_cache else None
+                ),
                 "core_version": core_version,
                 "api_version": __api_version__,
                 "webui_title": webui_title,
@@ -24,6 +24,7 @@ from pydantic import BaseModel, Field, field_validator
 from lightrag import LightRAG
 from lightrag.base import DeletionResult, DocProcessingStatus, DocStatus
 from lightrag.utils import generate_track_id
+from lightrag.utils_graph import bump_graph_version
 from lightrag.api.utils_api import get_combined_auth_dependency
 from ..config import global_args
 
@@ -2076,6 +2077,8 @@ def create_document_routes(
 
             # Wait for all drop tasks to complete
             drop_results = await asyncio.gather(*drop_tasks, return_exceptions=True)
+            # Invalidate responses cached for the dropped graph
+            await bump_graph_version(rag.chunk_entity_relation_graph)
 
             # Check for errors and log results
             errors = []
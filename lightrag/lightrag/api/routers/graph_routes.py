@@ -2,9 +2,15 @@
 This module contains all graph-related routes for the LightRAG API.
 """
 
-from typing import Optional, Dict, Any
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from functools import cached_property
+from typing import Optional, Dict, Any, Hashable
 import traceback
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from lightrag.utils import logger
@@ -25,8 +31,117 @@ class RelationUpdateRequest(BaseModel):
     updated_data: Dict[str, Any]
 
 
-def create_graph_routes(rag, api_key: Optional[str] = None):
+class CachedGraphResponse:
+    """Serialized subgraph response, its ETag and gzip body are computed on first use"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    @cached_property
+    def etag(self) -> str:
+        return f'"{hashlib.md5(self.body).hexdigest()}"'
+
+    @cached_property
+    def gzip_body(self) -> bytes:
+        return gzip.compress(self.body, compresslevel=6)
+
+
+class GraphResponseCache:
+    """LRU cache of serialized /graphs responses for the current graph version
+
+    Entries are keyed by request parameters; all entries are discarded as soon as
+    a newer graph version is seen.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.version: int | None = None
+        self._entries: OrderedDict[Hashable, CachedGraphResponse] = OrderedDict()
+
+    def get(self, version: int, key: Hashable) -> CachedGraphResponse | None:
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def put(self, version: int, key: Hashable, body: bytes) -> CachedGraphResponse:
+        entry = CachedGraphResponse(body)
+        if self.max_size > 0 and version == self.version:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag, using weak comparison
+
+    The header may list several ETags; proxies that compress the response hand out
+    weak (W/ prefixed) versions of the ETag, which match the strong one.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Whether an Accept-Encoding header accepts gzip, honoring q=0"""
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def cached_graph_response(
+    request: Request, entry: CachedGraphResponse, conditional: bool = True
+) -> Response:
+    """Serve a cached graph response, honoring If-None-Match and gzip encoding
+
+    Without conditional (response cache disabled) the body is sent as is, without
+    hashing or compressing it on every request.
+    """
+    if not conditional:
+        return Response(content=entry.body, media_type="application/json")
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(
+            content=entry.gzip_body, media_type="application/json", headers=headers
+        )
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def create_graph_routes(rag, api_key: Optional[str] = None, cache_size: int = 64):
     combined_auth = get_combined_auth_dependency(api_key)
+    graph_cache = GraphResponseCache(cache_size)
 
     @router.get("/graph/label/list", dependencies=[Depends(combined_auth)])
     async def get_graph_labels():
@@ -97,6 +212,7 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
 
     @router.get("/graphs", dependencies=[Depends(combined_auth)])
     async def get_knowledge_graph(
+        request: Request,
         label: str = Query(..., description="Label to get knowledge graph for"),
         max_depth: int = Query(3, description="Maximum depth of graph", ge=1),
         max_nodes: int = Query(1000, description="Maximum nodes to return", ge=1),
@@ -107,6 +223,9 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
             1. Hops(path) to the staring node take precedence
             2. Followed by the degree of the nodes
 
+        Serialized responses are cached per graph version and carry an ETag, so
+        repeated requests with a matching If-None-Match header get a 304 response.
+
         Args:
             label (str): Label of the starting node
             max_depth (int, optional): Maximum depth of the subgraph,Defaults to 3
@@ -121,11 +240,20 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
                 f"get_knowledge_graph called with label: '{label}' (length: {len(label)}, repr: {repr(label)})"
             )
 
-            return await rag.get_knowledge_graph(
-                node_label=label,
-                max_depth=max_depth,
-                max_nodes=max_nodes,
-            )
+            version = await rag.get_graph_version()
+            cache_key = (rag.workspace, label, max_depth, max_nodes)
+            entry = graph_cache.get(version, cache_key)
+            if entry is None:
+                graph = await rag.get_knowledge_graph(
+                    node_label=label,
+                    max_depth=max_depth,
+                    max_nodes=max_nodes,
+                )
+                entry = graph_cache.put(
+                    version, cache_key, graph.model_dump_json().encode("utf-8")
+                )
+
+            return cached_graph_response(request, entry, graph_cache.enabled)
         except Exception as e:
             logger.error(f"Error getting knowledge graph for label '{label}': {str(e)}")
             logger.error(traceback.format_exc())
@@ -133,6 +261,112 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
                 status_code=500, detail=f"Error getting knowledge graph: {str(e)}"
             )
 
+    @router.get("/graphs/stream", dependencies=[Depends(combined_auth)])
+    async def stream_knowledge_graph(
+        request: Request,
+        label: str = Query(..., description="Label to get knowledge graph for"),
+        max_depth: int = Query(3, description="Maximum depth of graph", ge=1),
+        max_nodes: int = Query(1000, description="Maximum nodes to return", ge=1),
+    ):
+        """
+        Stream the subgraph returned by /graphs level by level as NDJSON.
+
+        Each line holds the nodes of one BFS level and the edges linking them to
+        nodes already sent, so clients can start rendering the neighborhood of the
+        starting node before the whole subgraph is available:
+            {"level": 0, "nodes": [...], "edges": [...], "is_truncated": false}
+        The stream ends with {"done": true, "is_truncated": ...}, or with
+        {"error": "..."} if retrieval fails. Closing the connection cancels the
+        traversal.
+
+        Args:
+            label (str): Label of the starting node
+            max_depth (int, optional): Maximum depth of the subgraph,Defaults to 3
+            max_nodes: Maxiumu nodes to return
+
+        Returns:
+            StreamingResponse: NDJSON stream of subgraph levels
+        """
+
+        async def stream_generator():
+            is_truncated = False
+            try:
+                level = 0
+                async for partial in rag.get_knowledge_graph_stream(
+                    node_label=label,
+                    max_depth=max_depth,
+                    max_nodes=max_nodes,
+                ):
+                    if await request.is_disconnected():
+                        logger.debug(f"Graph stream for label '{label}' cancelled")
+                        return
+                    is_truncated = is_truncated or partial.is_truncated
+                    yield f"{json.dumps({'level': level, **partial.model_dump()})}\n"
+                    level += 1
+                yield f"{json.dumps({'done': True, 'is_truncated': is_truncated})}\n"
+            except Exception as e:
+                logger.error(
+                    f"Error streaming knowledge graph for label '{label}': {str(e)}"
+                )
+                logger.error(traceback.format_exc())
+                yield f"{json.dumps({'error': str(e)})}\n"
+
+        return StreamingResponse(
+            stream_generator(),
+            media_type="application/x-ndjson",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "Content-Type": "application/x-ndjson",
+                "X-Accel-Buffering": "no",
+            },
+        )
+
+    @router.get("/graphs/overview", dependencies=[Depends(combined_auth)])
+    async def get_graph_overview(
+        request: Request,
+        level: int = Query(
+            0, description="Zoom level, 0 is the coarsest overview", ge=0
+        ),
+    ):
+        """
+        Get a clustered overview of the whole knowledge graph at a zoom level.
+
+        Entities are grouped into communities; each node of the response is a
+        cluster labeled after its most connected entity, and each edge aggregates
+        the relations between two clusters. Higher levels give finer clusters, up
+        to the deepest level available (reported in "levels").
+
+        Args:
+            level (int): Zoom level, 0 is the coarsest overview
+
+        Returns:
+            Dict: Cluster graph with "level" and "levels" keys
+        """
+        try:
+            version = await rag.get_graph_version()
+            cache_key = (rag.workspace, "__overview__", level)
+            entry = graph_cache.get(version, cache_key)
+            if entry is None:
+                overview = await rag.get_graph_overview()
+                levels = len(overview.levels)
+                body = {
+                    "level": min(level, max(levels - 1, 0)),
+                    "levels": levels,
+                    **overview.get_level(level).model_dump(),
+                }
+                entry = graph_cache.put(
+                    overview.version, cache_key, json.dumps(body).encode("utf-8")
+                )
+
+            return cached_graph_response(request, entry, graph_cache.enabled)
+        except Exception as e:
+            logger.error(f"Error getting graph overview: {str(e)}")
+            logger.error(traceback.format_exc())
+            raise HTTPException(
+                status_code=500, detail=f"Error getting graph overview: {str(e)}"
+            )
+
     @router.get("/graph/entity/exists", dependencies=[Depends(combined_auth)])
     async def check_entity_exists(
         name: str = Query(..., description="Entity name to check"),
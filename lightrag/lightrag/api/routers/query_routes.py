@@ -93,6 +93,29 @@ class QueryRequest(BaseModel):
         description="If True, includes reference list in responses. Affects /query and /query/stream endpoints. /query/data always includes references.",
     )
 
+    hnsw_ef_search: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Candidate list size of HNSW vector searches (e.g. pgvector hnsw.ef_search). Higher values improve recall at the cost of latency.",
+    )
+
+    ivfflat_probes: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Number of IVFFlat lists probed by vector searches (e.g. pgvector ivfflat.probes). Higher values improve recall at the cost of latency.",
+    )
+
+    metadata_filter: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description='Restrict vector retrieval to records whose metadata match. Maps a field to a value, a list of accepted values, or a range such as {"gte": 1700000000}, e.g. {"file_path": ["a.pdf", "b.pdf"]}.',
+    )
+
+    truncate_dim: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="Dimensions of a first vector search pass whose best candidates are re-scored at full dimension, for embedding models supporting truncation (Matryoshka). 0 searches all dimensions in a single pass.",
+    )
+
     stream: Optional[bool] = Field(
         default=True,
         description="If True, enables streaming output for real-time responses. Only affects /query/stream endpoint.",
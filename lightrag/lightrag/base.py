@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+import asyncio
 from enum import Enum
 import os
 from dotenv import load_dotenv
@@ -26,6 +27,7 @@ from .constants import (
     DEFAULT_MAX_RELATION_TOKENS,
     DEFAULT_MAX_TOTAL_TOKENS,
     DEFAULT_HISTORY_TURNS,
+    DEFAULT_TRUNCATE_RERANK_FACTOR,
     DEFAULT_OLLAMA_MODEL_NAME,
     DEFAULT_OLLAMA_MODEL_TAG,
     DEFAULT_OLLAMA_MODEL_SIZE,
@@ -169,6 +171,35 @@ class QueryParam:
     containing citation information for the retrieved content.
     """
 
+    hnsw_ef_search: int | None = None
+    """Size of the candidate list of HNSW vector searches (e.g. pgvector hnsw.ef_search).
+    Higher values improve recall at the cost of latency. None uses the storage default.
+    """
+
+    ivfflat_probes: int | None = None
+    """Number of IVFFlat lists probed by vector searches (e.g. pgvector ivfflat.probes).
+    Higher values improve recall at the cost of latency. None uses the storage default.
+    """
+
+    metadata_filter: dict[str, Any] | None = None
+    """Restrict vector retrieval to records whose metadata match, applied inside the vector search.
+    Maps a field to a value, a list of accepted values, or a range dict with gt/gte/lt/lte,
+    e.g. {"file_path": ["a.pdf", "b.pdf"], "created_at": {"gte": 1700000000}}.
+    Use fields stored by every searched namespace, such as file_path and created_at.
+    Entities and relations found in several documents match any one of their file paths.
+    """
+
+    truncate_dim: int | None = None
+    """Dimensions of a first search pass over the whole vector index, whose best candidates are
+    then re-scored at full dimension. Only for embedding models supporting truncation (Matryoshka).
+    None uses EmbeddingFunc.truncate_dim, 0 searches all dimensions in a single pass.
+    """
+
+    truncate_rerank_factor: int = int(
+        os.getenv("TRUNCATE_RERANK_FACTOR", str(DEFAULT_TRUNCATE_RERANK_FACTOR))
+    )
+    """Candidates of the truncated first search pass re-scored per requested result."""
+
 
 @dataclass
 class StorageNameSpace(ABC):
@@ -223,7 +254,11 @@ class BaseVectorStorage(StorageNameSpace, ABC):
 
     @abstractmethod
     async def query(
-        self, query: str, top_k: int, query_embedding: list[float] = None
+        self,
+        query: str,
+        top_k: int,
+        query_embedding: list[float] = None,
+        query_param: QueryParam | None = None,
     ) -> list[dict[str, Any]]:
         """Query the vector storage and retrieve top_k results.
 
@@ -232,7 +267,55 @@ class BaseVectorStorage(StorageNameSpace, ABC):
             top_k: Number of top results to return
             query_embedding: Optional pre-computed embedding for the query.
                            If provided, skips embedding computation for better performance.
+            query_param: Optional query parameters carrying per-query search settings
+                           such as hnsw_ef_search, ignored by storages without them.
+        """
+
+    def _truncate_dim(self, query_param: QueryParam | None) -> int | None:
+        """Dimensions of the truncated first search pass, None for a single full pass"""
+        dim = query_param.truncate_dim if query_param else None
+        if dim is None:
+            dim = getattr(self.embedding_func, "truncate_dim", None)
+        if not dim or dim >= self.embedding_func.embedding_dim:
+            return None
+        return dim
+
+    async def query_many(
+        self,
+        queries: list[str],
+        top_k: int,
+        query_embeddings: list[list[float]] | None = None,
+        query_param: QueryParam | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Query the vector storage with several queries, one result list per query.
+
+        Default implementation embeds all queries in one call and runs the searches
+        concurrently. Override this method in storage backends with a native batch
+        search so that all queries share one request.
+
+        Args:
+            queries: The query strings to search for
+            top_k: Number of top results to return per query
+            query_embeddings: Optional pre-computed embeddings, one per query
+            query_param: Optional query parameters, see query()
         """
+        if not queries:
+            return []
+        if query_embeddings is None:
+            query_embeddings = await self.embedding_func(queries, _priority=5)
+        return list(
+            await asyncio.gather(
+                *(
+                    self.query(
+                        query,
+                        top_k,
+                        query_embedding=embedding,
+                        query_param=query_param,
+                    )
+                    for query, embedding in zip(queries, query_embeddings)
+                )
+            )
+        )
 
     @abstractmethod
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
@@ -314,6 +397,26 @@ class BaseVectorStorage(StorageNameSpace, ABC):
         """
         pass
 
+    async def get_fields_by_id(
+        self, id: str, fields: list[str]
+    ) -> dict[str, Any] | None:
+        """Get selected metadata fields of a vector record
+
+        Storages that can read columns selectively override this to skip the
+        vector and the other fields.
+
+        Args:
+            id: The unique identifier of the vector
+            fields: Names of the fields to return, fields a record lacks are omitted
+
+        Returns:
+            The selected fields if the record was found, or None if not found
+        """
+        record = await self.get_by_id(id)
+        if record is None:
+            return None
+        return {name: record[name] for name in fields if name in record}
+
 
 @dataclass
 class BaseKVStorage(StorageNameSpace, ABC):
@@ -601,6 +704,34 @@ class BaseGraphStorage(StorageNameSpace, ABC):
             edge_data: A dictionary of edge properties
         """
 
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        """Insert or update multiple nodes
+
+        Default implementation upserts nodes one by one.
+        Override this method for better performance in storage backends
+        that support batch operations.
+
+        Args:
+            nodes: Mapping of node ID to node properties
+        """
+        for node_id, node_data in nodes.items():
+            await self.upsert_node(node_id, node_data)
+
+    async def upsert_edges_batch(
+        self, edges: list[tuple[str, str, dict[str, str]]]
+    ) -> None:
+        """Insert or update multiple edges
+
+        Default implementation upserts edges one by one.
+        Override this method for better performance in storage backends
+        that support batch operations.
+
+        Args:
+            edges: List of (source_node_id, target_node_id, edge_data) tuples
+        """
+        for source_node_id, target_node_id, edge_data in edges:
+            await self.upsert_edge(source_node_id, target_node_id, edge_data)
+
     @abstractmethod
     async def delete_node(self, node_id: str) -> None:
         """Delete a node from the graph.
@@ -666,6 +797,19 @@ class BaseGraphStorage(StorageNameSpace, ABC):
             indicating whether the graph was truncated due to max_nodes limit
         """
 
+    async def get_knowledge_graph_stream(
+        self, node_label: str, max_depth: int = 3, max_nodes: int = 1000
+    ) -> AsyncIterator[KnowledgeGraph]:
+        """
+        Retrieve the subgraph of get_knowledge_graph as a sequence of partial graphs.
+
+        Storages able to walk the graph incrementally should yield one KnowledgeGraph
+        per BFS level, each holding the newly reached nodes and the edges linking them
+        to nodes already yielded. The default implementation yields the whole subgraph
+        at once.
+        """
+        yield await self.get_knowledge_graph(node_label, max_depth, max_nodes)
+
     @abstractmethod
     async def get_all_nodes(self) -> list[dict]:
         """Get all nodes in the graph.
@@ -9,6 +9,9 @@ consistency and makes maintenance easier.
 # Default values for server settings
 DEFAULT_WOKERS = 2
 DEFAULT_MAX_GRAPH_NODES = 1000
+DEFAULT_GRAPH_CACHE_SIZE = 64  # Cached /graphs responses per worker, 0 to disable
+DEFAULT_GRAPH_OVERVIEW_RESOLUTION = 1.0  # Louvain resolution of the graph overview
+DEFAULT_GRAPH_OVERVIEW_REDETECT_RATIO = 0.2  # Changed node ratio triggering re-detection
 
 # Default values for extraction settings
 DEFAULT_SUMMARY_LANGUAGE = "English"  # Default language for document processing
@@ -49,13 +52,26 @@ DEFAULT_MAX_TOTAL_TOKENS = 30000
 DEFAULT_COSINE_THRESHOLD = 0.2
 DEFAULT_RELATED_CHUNK_NUMBER = 5
 DEFAULT_KG_CHUNK_PICK_METHOD = "VECTOR"
+# Candidates of a truncated-dimension first search pass re-scored per result
+DEFAULT_TRUNCATE_RERANK_FACTOR = 4
 
 # TODO: Deprated. All conversation_history messages is send to LLM.
 DEFAULT_HISTORY_TURNS = 0
 
+# Shared HTTP clients of the LLM, embedding and rerank bindings
+DEFAULT_HTTP_POOL_MAX_CONNECTIONS = 100  # Connections per client
+DEFAULT_HTTP_POOL_MAX_KEEPALIVE = 20  # Idle connections kept open per client
+DEFAULT_HTTP_KEEPALIVE_EXPIRY = 30.0  # Seconds before idle connections are closed
+
 # Rerank configuration defaults
 DEFAULT_MIN_RERANK_SCORE = 0.0
 DEFAULT_RERANK_BINDING = "null"
+DEFAULT_RERANK_CACHE_SIZE = 10000  # Cached (query, chunk) scores, 0 disables
+DEFAULT_RERANK_SHARD_SIZE = 0  # Documents per rerank request, 0 disables
+DEFAULT_RERANK_MAX_CANDIDATES = 100  # Documents scored by the local reranker
+
+# NetworkX graph storage: size in bytes of the cross-process change log before it is compacted
+DEFAULT_NETWORKX_CHANGELOG_MAX_BYTES = 32 * 1024 * 1024
 
 # File path configuration for vector and graph database(Should not be changed, used in Milvus Schema)
 DEFAULT_MAX_FILE_PATH_LENGTH = 32768
@@ -66,10 +82,14 @@ DEFAULT_TEMPERATURE = 1.0
 # Async configuration defaults
 DEFAULT_MAX_ASYNC = 4  # Default maximum async operations
 DEFAULT_MAX_PARALLEL_INSERT = 2  # Default maximum parallel insert operations
+DEFAULT_ADAPTIVE_MIN_ASYNC = 1  # Lowest concurrency of adaptive queues
+# Completion tokens charged to the TPM budget for LLM calls without max_tokens
+DEFAULT_RATE_LIMIT_COMPLETION_TOKENS = 500
 
 # Embedding configuration defaults
 DEFAULT_EMBEDDING_FUNC_MAX_ASYNC = 8  # Default max async for embedding functions
 DEFAULT_EMBEDDING_BATCH_NUM = 10  # Default batch size for embedding computations
+DEFAULT_EMBEDDING_DEDUP_CACHE_SIZE = 4096  # Embeddings kept by content hash
 
 # Gunicorn worker timeout
 DEFAULT_TIMEOUT = 300
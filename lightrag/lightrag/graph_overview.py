@@ -0,0 +1,252 @@
+"""
+Multi-resolution overview of the knowledge graph.
+
+Entities are grouped into communities with Louvain community detection; every level
+of the Louvain hierarchy becomes one zoom level of the overview, where each
+community is a cluster node and the relations between communities are aggregated
+into weighted cluster edges. Level 0 is the coarsest view.
+
+Communities are only re-detected once enough entities have been added or removed
+since the last detection. Smaller changes are applied incrementally by assigning
+new entities to the community most of their neighbors belong to.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+import networkx as nx
+
+from .types import KnowledgeGraph, KnowledgeGraphEdge, KnowledgeGraphNode
+
+# Number of member names listed in the properties of a cluster node
+CLUSTER_TOP_MEMBERS = 10
+
+
+@dataclass
+class GraphOverview:
+    version: int
+    """Graph version the overview was built from"""
+
+    partitions: list[dict[str, int]] = field(default_factory=list)
+    """Community id of every entity, one mapping per level from finest to coarsest"""
+
+    levels: list[KnowledgeGraph] = field(default_factory=list)
+    """Cluster graph of every zoom level, from coarsest to finest"""
+
+    detected_node_count: int = 0
+    """Number of entities when communities were last detected"""
+
+    changed_node_count: int = 0
+    """Number of entities added or removed since communities were last detected"""
+
+    def get_level(self, level: int) -> KnowledgeGraph:
+        """Get the cluster graph of a zoom level, clamped to the available levels"""
+        if not self.levels:
+            return KnowledgeGraph()
+        return self.levels[max(0, min(level, len(self.levels) - 1))]
+
+
+def _detect_partitions(
+    graph: nx.Graph, resolution: float, seed: int | None
+) -> list[dict[str, int]]:
+    partitions = []
+    for communities in nx.community.louvain_partitions(
+        graph, weight="weight", resolution=resolution, seed=seed
+    ):
+        partition = {}
+        for community_id, members in enumerate(communities):
+            for node_id in members:
+                partition[node_id] = community_id
+        partitions.append(partition)
+    return partitions
+
+
+def _extend_partition(graph: nx.Graph, previous: dict[str, int]) -> dict[str, int]:
+    """Carry a partition over to a changed graph without re-running detection
+
+    Entities that still exist keep their community. New entities join the community
+    with the largest total edge weight among their assigned neighbors, repeated until
+    no more entities can be assigned; the remaining ones become singletons.
+    """
+    partition = {node_id: c for node_id, c in previous.items() if node_id in graph}
+    pending = [node_id for node_id in graph if node_id not in partition]
+
+    while pending:
+        unassigned = []
+        assigned = {}
+        for node_id in pending:
+            votes = defaultdict(float)
+            for neighbor, data in graph.adj[node_id].items():
+                community_id = partition.get(neighbor)
+                if community_id is not None:
+                    votes[community_id] += data.get("weight", 1.0)
+            if votes:
+                assigned[node_id] = max(votes, key=votes.get)
+            else:
+                unassigned.append(node_id)
+        if not assigned:
+            break
+        partition.update(assigned)
+        pending = unassigned
+
+    # Ids of communities whose members were all removed are not reused
+    next_id = max(previous.values(), default=-1) + 1
+    for node_id in pending:
+        partition[node_id] = next_id
+        next_id += 1
+    return partition
+
+
+def _derive_partition(
+    finest: dict[str, int],
+    previous_finest: dict[str, int],
+    previous: dict[str, int],
+) -> dict[str, int]:
+    """Coarser level of an extended finest partition, keeping the hierarchy nested
+
+    Every finest community stays in the coarser community it belonged to before;
+    communities that did not exist then become coarser communities of their own.
+    """
+    parent = {}
+    for node_id, community_id in previous_finest.items():
+        if node_id in previous:
+            parent.setdefault(community_id, previous[node_id])
+
+    next_id = max(previous.values(), default=-1) + 1
+    partition = {}
+    for node_id, community_id in finest.items():
+        if community_id not in parent:
+            parent[community_id] = next_id
+            next_id += 1
+        partition[node_id] = parent[community_id]
+    return partition
+
+
+def _build_cluster_graph(
+    graph: nx.Graph, partition: dict[str, int], level: int, max_nodes: int
+) -> KnowledgeGraph:
+    members = defaultdict(list)
+    for node_id, community_id in partition.items():
+        members[community_id].append(node_id)
+
+    result = KnowledgeGraph()
+    communities = sorted(members, key=lambda c: len(members[c]), reverse=True)
+    if len(communities) > max_nodes:
+        communities = communities[:max_nodes]
+        result.is_truncated = True
+
+    cluster_ids = {}
+    for community_id in communities:
+        ranked = sorted(members[community_id], key=graph.degree, reverse=True)
+        cluster_id = f"cluster-{level}-{community_id}"
+        cluster_ids[community_id] = cluster_id
+        entity_types = Counter(
+            graph.nodes[node_id].get("entity_type", "UNKNOWN") for node_id in ranked
+        )
+        top_members = ranked[:CLUSTER_TOP_MEMBERS]
+        result.nodes.append(
+            KnowledgeGraphNode(
+                id=cluster_id,
+                labels=[ranked[0]],
+                properties={
+                    "entity_id": ranked[0],
+                    "entity_type": entity_types.most_common(1)[0][0],
+                    "description": f"{len(ranked)} entities, including: {', '.join(top_members)}",
+                    "member_count": len(ranked),
+                    "top_members": top_members,
+                },
+            )
+        )
+
+    weights = defaultdict(float)
+    counts = defaultdict(int)
+    for u, v, data in graph.edges(data=True):
+        cu, cv = cluster_ids.get(partition[u]), cluster_ids.get(partition[v])
+        if cu is None or cv is None or cu == cv:
+            continue
+        key = (cu, cv) if cu < cv else (cv, cu)
+        weights[key] += data.get("weight", 1.0)
+        counts[key] += 1
+
+    for (source, target), weight in weights.items():
+        result.edges.append(
+            KnowledgeGraphEdge(
+                id=f"{source}-{target}",
+                type="DIRECTED",
+                source=source,
+                target=target,
+                properties={
+                    "weight": weight,
+                    "edge_count": counts[(source, target)],
+                },
+            )
+        )
+    return result
+
+
+def build_graph_overview(
+    nodes: list[dict],
+    edges: list[dict],
+    version: int,
+    max_nodes: int,
+    previous: GraphOverview | None = None,
+    resolution: float = 1.0,
+    redetect_ratio: float = 0.2,
+    seed: int | None = 42,
+) -> GraphOverview:
+    """Build the multi-resolution overview of a graph
+
+    CPU bound; run it in a worker thread when called from the event loop.
+
+    Args:
+        nodes: All nodes as returned by BaseGraphStorage.get_all_nodes
+        edges: All edges as returned by BaseGraphStorage.get_all_edges
+        version: Graph version the nodes and edges were read at
+        max_nodes: Maximum number of cluster nodes per zoom level
+        previous: Overview of an earlier version to update incrementally
+        resolution: Louvain resolution, higher values give smaller communities
+        redetect_ratio: Re-run community detection once the entities added or
+            removed since the last detection exceed this fraction of the graph
+        seed: Random seed of the community detection
+    """
+    graph = nx.Graph()
+    for node in nodes:
+        graph.add_node(node["id"], **{k: v for k, v in node.items() if k != "id"})
+    for edge in edges:
+        try:
+            weight = float(edge.get("weight", 1.0))
+        except (TypeError, ValueError):
+            weight = 1.0
+        graph.add_edge(edge["source"], edge["target"], weight=weight)
+
+    overview = GraphOverview(version=version)
+    if previous is not None and previous.partitions:
+        old_nodes = previous.partitions[0].keys()
+        added = sum(1 for node_id in graph if node_id not in previous.partitions[0])
+        removed = sum(1 for node_id in old_nodes if node_id not in graph)
+        changed = previous.changed_node_count + added + removed
+        if changed <= redetect_ratio * max(previous.detected_node_count, 1):
+            # Only the finest level is extended, coarser levels follow from it so
+            # that every community stays inside its parent community
+            finest = _extend_partition(graph, previous.partitions[0])
+            overview.partitions = [finest] + [
+                _derive_partition(finest, previous.partitions[0], partition)
+                for partition in previous.partitions[1:]
+            ]
+            overview.detected_node_count = previous.detected_node_count
+            overview.changed_node_count = changed
+
+    if not overview.partitions and graph.number_of_nodes() > 0:
+        overview.partitions = _detect_partitions(graph, resolution, seed)
+        overview.detected_node_count = graph.number_of_nodes()
+
+    num_levels = len(overview.partitions)
+    overview.levels = [
+        _build_cluster_graph(
+            graph, overview.partitions[num_levels - 1 - level], level, max_nodes
+        )
+        for level in range(num_levels)
+    ]
+    return overview
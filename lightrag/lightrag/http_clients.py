@@ -0,0 +1,154 @@
+"""
+Per-process registry of long-lived HTTP clients for the LLM, embedding and rerank bindings.
+
+Bindings get their client from the registry instead of opening one per request, so
+calls reuse keep-alive connections instead of paying TCP and TLS setup every time.
+Clients are created lazily on first use and keyed by (binding, base_url, api_key,
+config); their connection pools are bounded by HTTP_POOL_MAX_CONNECTIONS.
+
+Clients are bound to the event loop they were created on, a binding called from
+another event loop gets a client of its own. close_http_clients() closes all clients
+and is called by LightRAG.finalize_storages and on API server shutdown.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import json
+from typing import Any, Awaitable, Callable
+
+from .constants import (
+    DEFAULT_HTTP_KEEPALIVE_EXPIRY,
+    DEFAULT_HTTP_POOL_MAX_CONNECTIONS,
+    DEFAULT_HTTP_POOL_MAX_KEEPALIVE,
+)
+from .utils import get_env_value, logger
+
+# (binding, base_url, api_key hash, config, loop id) -> (loop, client, close)
+_clients: dict[tuple, tuple[asyncio.AbstractEventLoop, Any, Callable | None]] = {}
+
+
+def http_pool_limits() -> dict[str, Any]:
+    """Connection pool bounds of the shared clients"""
+    return {
+        "max_connections": get_env_value(
+            "HTTP_POOL_MAX_CONNECTIONS", DEFAULT_HTTP_POOL_MAX_CONNECTIONS, int
+        ),
+        "max_keepalive_connections": get_env_value(
+            "HTTP_POOL_MAX_KEEPALIVE", DEFAULT_HTTP_POOL_MAX_KEEPALIVE, int
+        ),
+        "keepalive_expiry": get_env_value(
+            "HTTP_KEEPALIVE_EXPIRY", DEFAULT_HTTP_KEEPALIVE_EXPIRY, float
+        ),
+    }
+
+
+def httpx_limits():
+    """httpx.Limits for the clients of httpx based SDKs (openai, ollama)"""
+    import httpx
+
+    return httpx.Limits(**http_pool_limits())
+
+
+def _client_key(
+    binding: str, base_url: str | None, api_key: str | None, config: Any
+) -> tuple:
+    # Keys are hashed so that they never appear in the registry
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+    config_key = json.dumps(config, sort_keys=True, default=repr) if config else ""
+    return (binding, base_url, key_hash, config_key)
+
+
+def _is_closed(client: Any) -> bool:
+    closed = getattr(client, "closed", None)  # aiohttp
+    if closed is None and callable(getattr(client, "is_closed", None)):  # openai
+        closed = client.is_closed()
+    return bool(closed)
+
+
+async def _close_client(client: Any, close: Callable | None) -> None:
+    result = close(client) if close is not None else client.close()
+    if inspect.isawaitable(result):
+        await result
+
+
+def get_http_client(
+    binding: str,
+    base_url: str | None,
+    api_key: str | None,
+    config: Any,
+    factory: Callable[[], Any],
+    close: Callable[[Any], Awaitable[None] | None] | None = None,
+) -> Any:
+    """Get the shared client of a binding endpoint, creating it on first use
+
+    Args:
+        binding: Name of the binding owning the client
+        base_url: Endpoint the client talks to
+        api_key: Credentials the client was created with
+        config: Any other client settings, JSON serializable or with a stable repr
+        factory: Creates the client
+        close: Closes the client, defaults to client.close()
+    """
+    loop = asyncio.get_running_loop()
+    key = _client_key(binding, base_url, api_key, config) + (id(loop),)
+    entry = _clients.get(key)
+    if entry is not None and entry[0] is loop and not _is_closed(entry[1]):
+        return entry[1]
+
+    # Drop the clients of event loops that are gone
+    for stale_key in [k for k, (lp, _, _) in _clients.items() if lp.is_closed()]:
+        del _clients[stale_key]
+
+    client = factory()
+    _clients[key] = (loop, client, close)
+    logger.debug(f"Created shared {binding} HTTP client for {base_url}")
+    return client
+
+
+def get_aiohttp_session(
+    binding: str,
+    base_url: str | None,
+    api_key: str | None = None,
+    headers: dict[str, str] | None = None,
+    timeout: float | None = None,
+):
+    """Shared aiohttp session of a binding endpoint
+
+    Headers and timeout become session defaults, requests may still override them.
+    """
+    import aiohttp
+
+    def factory():
+        limits = http_pool_limits()
+        connector = aiohttp.TCPConnector(
+            limit=limits["max_connections"],
+            keepalive_timeout=limits["keepalive_expiry"],
+        )
+        kwargs = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+        return aiohttp.ClientSession(connector=connector, headers=headers, **kwargs)
+
+    return get_http_client(
+        binding, base_url, api_key, {"headers": headers, "timeout": timeout}, factory
+    )
+
+
+async def close_http_clients() -> None:
+    """Close the shared clients created on the running event loop
+
+    Clients of other event loops can not be closed from here and are dropped.
+    """
+    loop = asyncio.get_running_loop()
+    clients = list(_clients.values())
+    _clients.clear()
+    for client_loop, client, close in clients:
+        if client_loop is not loop or _is_closed(client):
+            continue
+        try:
+            await _close_client(client, close)
+        except Exception as e:
+            logger.warning(f"Failed to close shared HTTP client: {e}")
+    if clients:
+        logger.debug(f"Closed {len(clients)} shared HTTP clients")
@@ -6,18 +6,34 @@ import json
 import numpy as np
 from dataclasses import dataclass
 
-from lightrag.utils import logger, compute_mdhash_id
-from lightrag.base import BaseVectorStorage
+from lightrag.utils import (
+    logger,
+    compute_mdhash_id,
+    metadata_filter_conditions,
+    metadata_filter_mask,
+)
+from lightrag.base import BaseVectorStorage, QueryParam
+from lightrag.constants import DEFAULT_TRUNCATE_RERANK_FACTOR
 
 from .shared_storage import (
     get_storage_lock,
     get_update_flag,
     set_all_update_flags,
 )
+from .vector_quantization import (
+    DEFAULT_RERANK_FACTOR,
+    get_quantization_config,
+    pq_subvector_count,
+)
 
 # You must manually install faiss-cpu or faiss-gpu before using FAISS vector db
 import faiss  # type: ignore
 
+# Metadata filter bitmaps kept per storage
+MAX_CACHED_FILTERS = 64
+# Quantized namespaces keep a flat index until they hold enough vectors to train on
+QUANTIZATION_MIN_VECTORS = 1024
+
 
 @final
 @dataclass
@@ -55,11 +71,20 @@ class FaissVectorDBStorage(BaseVectorStorage):
             workspace_dir, f"faiss_index_{self.namespace}.index"
         )
         self._meta_file = self._faiss_index_file + ".meta.json"
+        self._vectors_file = self._faiss_index_file + ".vectors.npy"
 
         self._max_batch_size = self.global_config["embedding_batch_num"]
         # Embedding dimension (e.g. 768) must match your embedding function
         self._dim = self.embedding_func.embedding_dim
 
+        # int8 or PQ codes instead of float vectors, see vector_quantization
+        self._quantization = get_quantization_config(self.global_config, self.namespace)
+        self._rerank_factor = int(
+            self._quantization.get("rerank_factor", DEFAULT_RERANK_FACTOR)
+        )
+        # Number of vectors the quantized index was trained on
+        self._trained_on = 0
+
         # Create an empty Faiss index for inner product (useful for normalized vectors = cosine similarity).
         # If you have a large number of vectors, you might want IVF or other indexes.
         # For demonstration, we use a simple IndexFlatIP.
@@ -67,6 +92,13 @@ class FaissVectorDBStorage(BaseVectorStorage):
         # Keep a local store for metadata, IDs, etc.
         # Maps <int faiss_id> → metadata (including your original ID).
         self._id_to_meta = {}
+        # Float16 copies of the vectors of a quantized index for re-scoring,
+        # row i belongs to faiss id i; unquantized records keep "__vector__"
+        self._vectors = self._empty_vectors()
+        # Metadata filter selectors, valid until the stored vectors change
+        self._filter_selectors: dict[tuple, Any] = {}
+        # Index over leading dimensions for truncated first passes
+        self._truncated: tuple | None = None
 
         self._load_faiss_index()
 
@@ -168,11 +200,25 @@ class FaissVectorDBStorage(BaseVectorStorage):
         index.add(embeddings)
 
         # Step 3: Store metadata + vector for each new ID
+        if self._quantization:
+            self._vectors = np.concatenate(
+                [self._vectors, embeddings.astype(np.float16)]
+            )
         for i, meta in enumerate(list_data):
             fid = start_idx + i
             # Store the raw vector so we can rebuild if something is removed
-            meta["__vector__"] = embeddings[i].tolist()
+            if not self._quantization:
+                meta["__vector__"] = embeddings[i].tolist()
             self._id_to_meta.update({fid: meta})
+        self._filter_selectors.clear()
+        self._truncated = None
+
+        # (Re)train the quantizer once the collection outgrew its training set
+        if self._quantization and self._index.ntotal >= max(
+            QUANTIZATION_MIN_VECTORS, 2 * self._trained_on
+        ):
+            async with self._storage_lock:
+                self._index = self._build_quantized_index(self._stored_vectors())
 
         logger.debug(
             f"[{self.workspace}] Upserted {len(list_data)} vectors into Faiss index."
@@ -180,7 +226,11 @@ class FaissVectorDBStorage(BaseVectorStorage):
         return [m["__id__"] for m in list_data]
 
     async def query(
-        self, query: str, top_k: int, query_embedding: list[float] = None
+        self,
+        query: str,
+        top_k: int,
+        query_embedding: list[float] = None,
+        query_param: QueryParam | None = None,
     ) -> list[dict[str, Any]]:
         """
         Search by a textual query; returns top_k results with their metadata + similarity distance.
@@ -198,10 +248,48 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         # Perform the similarity search
         index = await self._get_index()
-        distances, indices = index.search(embedding, top_k)
+        # Quantized or truncated first passes only pick candidates for _rescore
+        search_index, search_query, search_k = index, embedding, top_k
+        truncate_dim = self._truncate_dim(query_param)
+        if self._is_quantized(index):
+            search_k = top_k * self._rerank_factor
+        elif truncate_dim:
+            search_index = self._truncated_index(index, truncate_dim)
+            search_query = np.ascontiguousarray(embedding[:, :truncate_dim])
+            faiss.normalize_L2(search_query)
+            search_k = top_k * (
+                query_param.truncate_rerank_factor
+                if query_param
+                else DEFAULT_TRUNCATE_RERANK_FACTOR
+            )
 
-        distances = distances[0]
-        indices = indices[0]
+        conditions = metadata_filter_conditions(
+            query_param.metadata_filter if query_param else None
+        )
+        selected = None
+        if conditions:
+            selected = self._filter_selector(index, conditions)
+            if selected is None:
+                return []
+
+        if selected is not None and self._quantization_kind(index) == "pq":
+            # IndexPQ rejects id selectors, score the matching vectors directly
+            distances, indices = self._rescore(embedding[0], selected[1], top_k)
+        else:
+            if selected is not None:
+                distances, indices = search_index.search(
+                    search_query,
+                    search_k,
+                    params=faiss.SearchParameters(sel=selected[0]),
+                )
+            else:
+                distances, indices = search_index.search(search_query, search_k)
+
+            distances = distances[0]
+            indices = indices[0]
+
+            if search_index is not index or self._is_quantized(index):
+                distances, indices = self._rescore(embedding[0], indices, top_k)
 
         results = []
         for dist, idx in zip(distances, indices):
@@ -227,6 +315,112 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
         return results
 
+    @staticmethod
+    def _quantization_kind(index) -> str | None:
+        if isinstance(index, faiss.IndexScalarQuantizer):
+            return "int8"
+        if isinstance(index, faiss.IndexPQ):
+            return "pq"
+        return None
+
+    @classmethod
+    def _is_quantized(cls, index) -> bool:
+        return cls._quantization_kind(index) is not None
+
+    def _truncated_index(self, index, dim: int):
+        """Flat index over the normalized leading dimensions of the stored vectors"""
+        # Rebuilt once the index is replaced or grows; upsert clears it on updates
+        cached = self._truncated
+        if (
+            cached is None
+            or cached[0] is not index
+            or cached[1:3] != (index.ntotal, dim)
+        ):
+            vectors = np.ascontiguousarray(self._stored_vectors()[:, :dim])
+            faiss.normalize_L2(vectors)
+            truncated = faiss.IndexFlatIP(dim)
+            truncated.add(vectors)
+            cached = (index, index.ntotal, dim, truncated)
+            self._truncated = cached
+        return cached[3]
+
+    def _rescore(
+        self, query: np.ndarray, indices: np.ndarray, top_k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Re-score first pass candidates with their full float vectors
+
+        ``indices`` holds the candidate ids of a single query, a ``(1, k)``
+        search result row is flattened.
+        """
+        indices = np.asarray(indices).ravel()
+        indices = indices[indices != -1]
+        if len(indices) == 0:
+            return np.empty(0, np.float32), indices
+        scores = self._vector_rows(indices) @ query.ravel()
+        order = np.argsort(-scores)[:top_k]
+        return scores[order], indices[order]
+
+    def _empty_vectors(self) -> np.ndarray:
+        return np.empty((0, self._dim), dtype=np.float16)
+
+    def _vector_rows(self, fids) -> np.ndarray:
+        """Float32 vectors of the given faiss ids"""
+        if self._quantization:
+            return self._vectors[np.asarray(fids, dtype=np.int64)].astype(np.float32)
+        return np.array(
+            [self._id_to_meta[int(fid)]["__vector__"] for fid in fids],
+            dtype=np.float32,
+        ).reshape(-1, self._dim)
+
+    def _stored_vectors(self) -> np.ndarray:
+        return self._vector_rows(range(len(self._id_to_meta)))
+
+    def _build_quantized_index(self, vectors: np.ndarray):
+        """Train an int8 or PQ index on the stored vectors and add them to it"""
+        kind = str(self._quantization.get("type", "int8")).lower()
+        if kind == "int8":
+            index = faiss.IndexScalarQuantizer(
+                self._dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+        elif kind == "pq":
+            m = pq_subvector_count(self._quantization, self._dim)
+            index = faiss.IndexPQ(self._dim, m, 8, faiss.METRIC_INNER_PRODUCT)
+        else:
+            raise ValueError(f"Unsupported vector quantization type: {kind}")
+        index.train(vectors)
+        index.add(vectors)
+        self._trained_on = len(vectors)
+        logger.info(
+            f"[{self.workspace}] Faiss {kind} index trained on {len(vectors)} vectors for {self.namespace}"
+        )
+        return index
+
+    def _filter_selector(self, index, conditions: list[tuple[str, str, Any]]):
+        """Faiss id selector and ids of the vectors matching a metadata filter
+
+        The bitmap is built once per filter and reused until the stored vectors
+        change, so filtered searches scan the index like unfiltered ones.
+        Returns None when no vector matches.
+        """
+        # _id_to_meta is replaced when vectors are removed; upsert clears the cache
+        key = (id(self._id_to_meta), index.ntotal, repr(conditions))
+        if key not in self._filter_selectors:
+            if len(self._filter_selectors) >= MAX_CACHED_FILTERS:
+                self._filter_selectors.clear()
+            records = [self._id_to_meta.get(fid, {}) for fid in range(index.ntotal)]
+            mask = metadata_filter_mask(
+                records, conditions, {"created_at": "__created_at__"}
+            )
+            if not mask.any():
+                self._filter_selectors[key] = None
+            else:
+                bitmap = np.packbits(mask, bitorder="little")
+                selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap))
+                # The selector reads the bitmap buffer, keep it referenced
+                self._filter_selectors[key] = (selector, bitmap, np.flatnonzero(mask))
+        entry = self._filter_selectors[key]
+        return (entry[0], entry[2]) if entry is not None else None
+
     @property
     def client_storage(self):
         # Return whatever structure LightRAG might need for debugging
@@ -313,21 +507,23 @@ class FaissVectorDBStorage(BaseVectorStorage):
         keep_fids = [fid for fid in self._id_to_meta if fid not in fid_list]
 
         # Rebuild the index
-        vectors_to_keep = []
+        vectors_to_keep = self._vector_rows(keep_fids)
         new_id_to_meta = {}
         for new_fid, old_fid in enumerate(keep_fids):
-            vec_meta = self._id_to_meta[old_fid]
-            vectors_to_keep.append(vec_meta["__vector__"])  # stored as list
-            new_id_to_meta[new_fid] = vec_meta
+            new_id_to_meta[new_fid] = self._id_to_meta[old_fid]
 
         async with self._storage_lock:
-            # Re-init index
-            self._index = faiss.IndexFlatIP(self._dim)
-            if vectors_to_keep:
-                arr = np.array(vectors_to_keep, dtype=np.float32)
-                self._index.add(arr)
+            # Re-init index, a quantized one keeps its trained codebooks
+            if self._is_quantized(self._index):
+                self._index.reset()
+            else:
+                self._index = faiss.IndexFlatIP(self._dim)
+            if len(vectors_to_keep):
+                self._index.add(vectors_to_keep)
 
             self._id_to_meta = new_id_to_meta
+            if self._quantization:
+                self._vectors = vectors_to_keep.astype(np.float16)
 
     def _save_faiss_index(self):
         """
@@ -345,11 +541,20 @@ class FaissVectorDBStorage(BaseVectorStorage):
         with open(self._meta_file, "w", encoding="utf-8") as f:
             json.dump(serializable_dict, f)
 
+        # A quantized index keeps its re-score vectors next to the metadata
+        if self._quantization:
+            with open(self._vectors_file, "wb") as f:
+                np.save(f, self._vectors)
+        elif os.path.exists(self._vectors_file):
+            os.remove(self._vectors_file)
+
     def _load_faiss_index(self):
         """
         Load the Faiss index + metadata from disk if it exists,
         and rebuild in-memory structures so we can query.
         """
+        self._trained_on = 0
+        self._vectors = self._empty_vectors()
         if not os.path.exists(self._faiss_index_file):
             logger.warning(
                 f"[{self.workspace}] No existing Faiss index file found for {self.namespace}"
@@ -368,6 +573,20 @@ class FaissVectorDBStorage(BaseVectorStorage):
             for fid_str, meta in stored_dict.items():
                 fid = int(fid_str)
                 self._id_to_meta[fid] = meta
+            self._load_vectors()
+
+            # Follow quantization settings changed since the index was written
+            index_kind = self._quantization_kind(self._index)
+            wanted_kind = str(self._quantization.get("type", "int8")).lower()
+            if not self._quantization and index_kind:
+                self._index = faiss.IndexFlatIP(self._dim)
+                self._index.add(self._stored_vectors())
+            elif self._quantization and index_kind == wanted_kind:
+                self._trained_on = self._index.ntotal
+            elif self._quantization and (
+                index_kind or self._index.ntotal >= QUANTIZATION_MIN_VECTORS
+            ):
+                self._index = self._build_quantized_index(self._stored_vectors())
 
             logger.info(
                 f"[{self.workspace}] Faiss index loaded with {self._index.ntotal} vectors from {self._faiss_index_file}"
@@ -379,6 +598,39 @@ class FaissVectorDBStorage(BaseVectorStorage):
             logger.warning(f"[{self.workspace}] Starting with an empty Faiss index.")
             self._index = faiss.IndexFlatIP(self._dim)
             self._id_to_meta = {}
+            self._vectors = self._empty_vectors()
+
+    def _load_vectors(self):
+        """Move the stored float vectors to where the quantization setting wants them
+
+        Metadata written without quantization carries "__vector__" lists, a
+        quantized index writes the float16 vectors file instead.
+        """
+        vectors = None
+        if os.path.exists(self._vectors_file):
+            vectors = np.load(self._vectors_file)
+            if len(vectors) != len(self._id_to_meta):
+                logger.warning(
+                    f"[{self.workspace}] Ignoring stale Faiss vectors file for {self.namespace}"
+                )
+                vectors = None
+        if vectors is None:
+            vectors = np.array(
+                [
+                    self._id_to_meta[fid].get("__vector__", [])
+                    for fid in range(len(self._id_to_meta))
+                ],
+                dtype=np.float32,
+            ).reshape(-1, self._dim)
+
+        if self._quantization:
+            self._vectors = vectors.astype(np.float16)
+            for meta in self._id_to_meta.values():
+                meta.pop("__vector__", None)
+        else:
+            for fid, meta in self._id_to_meta.items():
+                if "__vector__" not in meta:
+                    meta["__vector__"] = vectors[fid].astype(np.float32).tolist()
 
     async def index_done_callback(self) -> None:
         async with self._storage_lock:
@@ -488,6 +740,9 @@ class FaissVectorDBStorage(BaseVectorStorage):
             # Find the Faiss internal ID for the custom ID
             fid = self._find_faiss_id_by_custom_id(id)
             if fid is not None and fid in self._id_to_meta:
+                if self._quantization:
+                    vectors_dict[id] = self._vector_rows([fid])[0].tolist()
+                    continue
                 metadata = self._id_to_meta[fid]
                 # Get the stored vector from metadata
                 if "__vector__" in metadata:
@@ -522,6 +777,8 @@ class FaissVectorDBStorage(BaseVectorStorage):
                     os.remove(self._faiss_index_file)
                 if os.path.exists(self._meta_file):
                     os.remove(self._meta_file)
+                if os.path.exists(self._vectors_file):
+                    os.remove(self._vectors_file)
 
                 self._id_to_meta = {}
                 self._load_faiss_index()
@@ -1,11 +1,19 @@
 import asyncio
+import json
 import os
 from typing import Any, final
 from dataclasses import dataclass
 import numpy as np
-from lightrag.utils import logger, compute_mdhash_id
-from ..base import BaseVectorStorage
-from ..constants import DEFAULT_MAX_FILE_PATH_LENGTH
+from lightrag.utils import (
+    logger,
+    compute_mdhash_id,
+    metadata_filter_conditions,
+    match_metadata_filter,
+    multi_value_conditions,
+    METADATA_FILTER_MULTI_VALUE_FIELDS,
+)
+from ..base import BaseVectorStorage, QueryParam
+from ..constants import DEFAULT_MAX_FILE_PATH_LENGTH, GRAPH_FIELD_SEP
 from ..kg.shared_storage import get_data_init_lock, get_storage_lock
 import pipmaster as pm
 
@@ -18,6 +26,41 @@ from pymilvus import MilvusClient, DataType, CollectionSchema, FieldSchema  # ty
 config = configparser.ConfigParser()
 config.read("config.ini", "utf-8")
 
+MILVUS_COMPARISON_OPS = {"eq": "==", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def _multi_value_expr(name: str, values: list[Any]) -> str:
+    """Match any one of the GRAPH_FIELD_SEP joined values of a field
+
+    like treats % and _ in the values as wildcards, the results are checked again
+    with match_metadata_filter.
+    """
+    clauses = []
+    for value in map(str, values):
+        clauses.append(f"{name} == {json.dumps(value)}")
+        for pattern in (
+            f"{value}{GRAPH_FIELD_SEP}%",
+            f"%{GRAPH_FIELD_SEP}{value}",
+            f"%{GRAPH_FIELD_SEP}{value}{GRAPH_FIELD_SEP}%",
+        ):
+            clauses.append(f"{name} like {json.dumps(pattern)}")
+    return f"({' or '.join(clauses)})"
+
+
+def build_filter_expr(conditions: list[tuple[str, str, Any]]) -> str:
+    """Translate metadata filter conditions into a Milvus boolean expression"""
+    clauses = []
+    for name, op, value in conditions:
+        if not name.isidentifier():
+            raise ValueError(f"Invalid metadata filter field: {name}")
+        if name in METADATA_FILTER_MULTI_VALUE_FIELDS and op in ("eq", "in"):
+            clauses.append(_multi_value_expr(name, value if op == "in" else [value]))
+        elif op == "in":
+            clauses.append(f"{name} in {json.dumps(value)}")
+        else:
+            clauses.append(f"{name} {MILVUS_COMPARISON_OPS[op]} {json.dumps(value)}")
+    return " and ".join(clauses)
+
 
 @final
 @dataclass
@@ -1047,25 +1090,53 @@ class MilvusVectorDBStorage(BaseVectorStorage):
         return results
 
     async def query(
-        self, query: str, top_k: int, query_embedding: list[float] = None
+        self,
+        query: str,
+        top_k: int,
+        query_embedding: list[float] = None,
+        query_param: QueryParam | None = None,
     ) -> list[dict[str, Any]]:
+        results = await self.query_many(
+            [query],
+            top_k,
+            query_embeddings=None if query_embedding is None else [query_embedding],
+            query_param=query_param,
+        )
+        return results[0]
+
+    async def query_many(
+        self,
+        queries: list[str],
+        top_k: int,
+        query_embeddings: list[list[float]] | None = None,
+        query_param: QueryParam | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        if not queries:
+            return []
+
         # Ensure collection is loaded before querying
         self._ensure_collection_loaded()
 
-        # Use provided embedding or compute it
-        if query_embedding is not None:
-            embedding = [query_embedding]  # Milvus expects a list of embeddings
-        else:
-            embedding = await self.embedding_func(
-                [query], _priority=5
+        # Use provided embeddings or compute them
+        if query_embeddings is None:
+            query_embeddings = await self.embedding_func(
+                queries, _priority=5
             )  # higher priority for query
 
         # Include all meta_fields (created_at is now always included)
         output_fields = list(self.meta_fields)
 
+        conditions = metadata_filter_conditions(
+            query_param.metadata_filter if query_param else None
+        )
+        filter_expr = build_filter_expr(conditions)
+        recheck = multi_value_conditions(conditions)
+
+        # One search request with nq=len(queries)
         results = self._client.search(
             collection_name=self.final_namespace,
-            data=embedding,
+            data=list(query_embeddings),
+            filter=filter_expr,
             limit=top_k,
             output_fields=output_fields,
             search_params={
@@ -1074,13 +1145,17 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             },
         )
         return [
-            {
-                **dp["entity"],
-                "id": dp["id"],
-                "distance": dp["distance"],
-                "created_at": dp.get("created_at"),
-            }
-            for dp in results[0]
+            [
+                {
+                    **dp["entity"],
+                    "id": dp["id"],
+                    "distance": dp["distance"],
+                    "created_at": dp.get("created_at"),
+                }
+                for dp in hits
+                if match_metadata_filter(dp["entity"], recheck)
+            ]
+            for hits in results
         ]
 
     async def index_done_callback(self) -> None:
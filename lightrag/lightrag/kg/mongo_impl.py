@@ -15,6 +15,7 @@ from ..base import (
     DocProcessingStatus,
     DocStatus,
     DocStatusStorage,
+    QueryParam,
 )
 from ..utils import logger, compute_mdhash_id
 from ..types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
@@ -38,6 +39,9 @@ config.read("config.ini", "utf-8")
 
 GRAPH_BFS_MODE = os.getenv("MONGO_GRAPH_BFS_MODE", "bidirectional")
 
+# Only the endpoint ids, answered from the edge endpoint indexes without fetching documents
+EDGE_ENDPOINTS_PROJECTION = {"_id": 0, "source_node_id": 1, "target_node_id": 1}
+
 
 class ClientManager:
     _instances = {"db": None, "ref_count": 0}
@@ -386,16 +390,14 @@ class MongoDocStatusStorage(DocStatusStorage):
         logger.debug(f"[{self.workspace}] Inserting {len(data)} to {self.namespace}")
         if not data:
             return
-        update_tasks: list[Any] = []
+        operations = []
         for k, v in data.items():
             # Ensure chunks_list field exists and is an array
             if "chunks_list" not in v:
                 v["chunks_list"] = []
             data[k]["_id"] = k
-            update_tasks.append(
-                self._data.update_one({"_id": k}, {"$set": v}, upsert=True)
-            )
-        await asyncio.gather(*update_tasks)
+            operations.append(UpdateOne({"_id": k}, {"$set": v}, upsert=True))
+        await self._data.bulk_write(operations, ordered=False)
 
     async def get_status_counts(self) -> dict[str, int]:
         """Get counts of documents in each status"""
@@ -762,6 +764,8 @@ class MongoGraphStorage(BaseGraphStorage):
                 self.db, self._edge_collection_name
             )
 
+            await self.create_edge_indexes_if_not_exists()
+
             # Create Atlas Search index for better search performance if possible
             await self.create_search_index_if_not_exists()
 
@@ -825,19 +829,8 @@ class MongoGraphStorage(BaseGraphStorage):
         Check if there's a direct single-hop edge between source_node_id and target_node_id.
         """
         doc = await self.edge_collection.find_one(
-            {
-                "$or": [
-                    {
-                        "source_node_id": source_node_id,
-                        "target_node_id": target_node_id,
-                    },
-                    {
-                        "source_node_id": target_node_id,
-                        "target_node_id": source_node_id,
-                    },
-                ]
-            },
-            {"_id": 1},
+            self._edge_filter(source_node_id, target_node_id),
+            {"_id": 0, "source_node_id": 1},
         )
         return doc is not None
 
@@ -870,6 +863,16 @@ class MongoGraphStorage(BaseGraphStorage):
 
         return src_degree + trg_degree
 
+    async def edge_degrees_batch(
+        self, edge_pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], int]:
+        node_ids = list({node_id for pair in edge_pairs for node_id in pair})
+        degrees = await self.node_degrees_batch(node_ids)
+        return {
+            (src_id, tgt_id): degrees.get(src_id, 0) + degrees.get(tgt_id, 0)
+            for src_id, tgt_id in edge_pairs
+        }
+
     #
     # -------------------------------------------------------------------------
     # GETTERS
@@ -886,18 +889,7 @@ class MongoGraphStorage(BaseGraphStorage):
         self, source_node_id: str, target_node_id: str
     ) -> dict[str, str] | None:
         return await self.edge_collection.find_one(
-            {
-                "$or": [
-                    {
-                        "source_node_id": source_node_id,
-                        "target_node_id": target_node_id,
-                    },
-                    {
-                        "source_node_id": target_node_id,
-                        "target_node_id": source_node_id,
-                    },
-                ]
-            }
+            self._edge_filter(source_node_id, target_node_id)
         )
 
     async def get_node_edges(self, source_node_id: str) -> list[tuple[str, str]] | None:
@@ -918,7 +910,7 @@ class MongoGraphStorage(BaseGraphStorage):
                     {"target_node_id": source_node_id},
                 ]
             },
-            {"source_node_id": 1, "target_node_id": 1},
+            EDGE_ENDPOINTS_PROJECTION,
         )
 
         return [
@@ -985,8 +977,7 @@ class MongoGraphStorage(BaseGraphStorage):
 
         # Query outgoing edges (where node is the source)
         outgoing_cursor = self.edge_collection.find(
-            {"source_node_id": {"$in": node_ids}},
-            {"source_node_id": 1, "target_node_id": 1},
+            {"source_node_id": {"$in": node_ids}}, EDGE_ENDPOINTS_PROJECTION
         )
         async for edge in outgoing_cursor:
             source = edge["source_node_id"]
@@ -995,8 +986,7 @@ class MongoGraphStorage(BaseGraphStorage):
 
         # Query incoming edges (where node is the target)
         incoming_cursor = self.edge_collection.find(
-            {"target_node_id": {"$in": node_ids}},
-            {"source_node_id": 1, "target_node_id": 1},
+            {"target_node_id": {"$in": node_ids}}, EDGE_ENDPOINTS_PROJECTION
         )
         async for edge in incoming_cursor:
             source = edge["source_node_id"]
@@ -1050,28 +1040,34 @@ class MongoGraphStorage(BaseGraphStorage):
     # -------------------------------------------------------------------------
     #
 
-    async def upsert_node(self, node_id: str, node_data: dict[str, str]) -> None:
-        """
-        Insert or update a node document.
-        """
+    @staticmethod
+    def _edge_filter(source_node_id: str, target_node_id: str) -> dict:
+        """Match the edge between two nodes in either direction"""
+        return {
+            "$or": [
+                {
+                    "source_node_id": source_node_id,
+                    "target_node_id": target_node_id,
+                },
+                {
+                    "source_node_id": target_node_id,
+                    "target_node_id": source_node_id,
+                },
+            ]
+        }
+
+    @staticmethod
+    def _node_update(node_id: str, node_data: dict[str, str]) -> UpdateOne:
         update_doc = {"$set": {**node_data}}
         if node_data.get("source_id", ""):
             update_doc["$set"]["source_ids"] = node_data["source_id"].split(
                 GRAPH_FIELD_SEP
             )
+        return UpdateOne({"_id": node_id}, update_doc, upsert=True)
 
-        await self.collection.update_one({"_id": node_id}, update_doc, upsert=True)
-
-    async def upsert_edge(
+    def _edge_update(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
-    ) -> None:
-        """
-        Upsert an edge between source_node_id and target_node_id with optional 'relation'.
-        If an edge with the same target exists, we remove it and re-insert with updated data.
-        """
-        # Ensure source node exists
-        await self.upsert_node(source_node_id, {})
-
+    ) -> UpdateOne:
         update_doc = {"$set": edge_data}
         if edge_data.get("source_id", ""):
             update_doc["$set"]["source_ids"] = edge_data["source_id"].split(
@@ -1081,23 +1077,51 @@ class MongoGraphStorage(BaseGraphStorage):
         edge_data["source_node_id"] = source_node_id
         edge_data["target_node_id"] = target_node_id
 
-        await self.edge_collection.update_one(
-            {
-                "$or": [
-                    {
-                        "source_node_id": source_node_id,
-                        "target_node_id": target_node_id,
-                    },
-                    {
-                        "source_node_id": target_node_id,
-                        "target_node_id": source_node_id,
-                    },
-                ]
-            },
-            update_doc,
-            upsert=True,
+        return UpdateOne(
+            self._edge_filter(source_node_id, target_node_id), update_doc, upsert=True
         )
 
+    async def upsert_node(self, node_id: str, node_data: dict[str, str]) -> None:
+        """
+        Insert or update a node document.
+        """
+        await self.upsert_nodes_batch({node_id: node_data})
+
+    async def upsert_edge(
+        self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
+    ) -> None:
+        """
+        Upsert an edge between source_node_id and target_node_id with optional 'relation'.
+        If an edge with the same target exists, we remove it and re-insert with updated data.
+        """
+        await self.upsert_edges_batch([(source_node_id, target_node_id, edge_data)])
+
+    async def upsert_nodes_batch(self, nodes: dict[str, dict[str, str]]) -> None:
+        if not nodes:
+            return
+        operations = [
+            self._node_update(node_id, node_data)
+            for node_id, node_data in nodes.items()
+        ]
+        await self.collection.bulk_write(operations, ordered=False)
+
+    async def upsert_edges_batch(
+        self, edges: list[tuple[str, str, dict[str, str]]]
+    ) -> None:
+        if not edges:
+            return
+
+        # Ensure source nodes exist
+        source_node_ids = dict.fromkeys(source for source, _, _ in edges)
+        await self.upsert_nodes_batch({node_id: {} for node_id in source_node_ids})
+
+        # Ordered, so repeated pairs are applied in sequence like individual upserts
+        operations = [
+            self._edge_update(source_node_id, target_node_id, edge_data)
+            for source_node_id, target_node_id, edge_data in edges
+        ]
+        await self.edge_collection.bulk_write(operations)
+
     #
     # -------------------------------------------------------------------------
     # DELETION
@@ -1281,7 +1305,8 @@ class MongoGraphStorage(BaseGraphStorage):
                     {"source_node_id": {"$in": node_labels}},
                     {"target_node_id": {"$in": node_labels}},
                 ]
-            }
+            },
+            EDGE_ENDPOINTS_PROJECTION,
         )
 
         neighbor_nodes = []
@@ -1979,6 +2004,28 @@ class MongoGraphStorage(BaseGraphStorage):
             f"[{self.workspace}] Index will be built asynchronously, using regex fallback until ready."
         )
 
+    async def create_edge_indexes_if_not_exists(self):
+        """Create indexes on edge endpoints and chunk ids
+
+        The compound endpoint indexes cover neighbor lookups projected to
+        EDGE_ENDPOINTS_PROJECTION and degree aggregations, so those never read the
+        edge documents themselves.
+        """
+        indexes = [
+            (self.edge_collection, [("source_node_id", 1), ("target_node_id", 1)]),
+            (self.edge_collection, [("target_node_id", 1), ("source_node_id", 1)]),
+            (self.edge_collection, [("source_ids", 1)]),
+            (self.collection, [("source_ids", 1)]),
+        ]
+        for collection, keys in indexes:
+            try:
+                # create_index is a no-op when an identical index already exists
+                await collection.create_index(keys)
+            except PyMongoError as e:
+                logger.warning(
+                    f"[{self.workspace}] Failed to create index {keys} for collection {collection.name}: {e}"
+                )
+
     async def create_search_index_if_not_exists(self):
         """Creates an improved Atlas Search index for entity search, rebuilding if necessary."""
         index_name = "entity_id_search_idx"
@@ -2206,17 +2253,20 @@ class MongoVectorDBStorage(BaseVectorStorage):
         for i, d in enumerate(list_data):
             d["vector"] = np.array(embeddings[i], dtype=np.float32).tolist()
 
-        update_tasks = []
-        for doc in list_data:
-            update_tasks.append(
-                self._data.update_one({"_id": doc["_id"]}, {"$set": doc}, upsert=True)
-            )
-        await asyncio.gather(*update_tasks)
+        operations = [
+            UpdateOne({"_id": doc["_id"]}, {"$set": doc}, upsert=True)
+            for doc in list_data
+        ]
+        await self._data.bulk_write(operations, ordered=False)
 
         return list_data
 
     async def query(
-        self, query: str, top_k: int, query_embedding: list[float] = None
+        self,
+        query: str,
+        top_k: int,
+        query_embedding: list[float] = None,
+        query_param: QueryParam | None = None,
     ) -> list[dict[str, Any]]:
         """Queries the vector database using Atlas Vector Search."""
         if query_embedding is not None:
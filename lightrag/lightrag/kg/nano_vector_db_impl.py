@@ -3,22 +3,272 @@ import base64
 import os
 import zlib
 from typing import Any, final
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import json
 import numpy as np
 import time
 
 from lightrag.utils import (
     logger,
     compute_mdhash_id,
+    metadata_filter_conditions,
+    metadata_filter_mask,
 )
 
-from lightrag.base import BaseVectorStorage
+from lightrag.base import BaseVectorStorage, QueryParam
+from lightrag.constants import DEFAULT_TRUNCATE_RERANK_FACTOR
 from nano_vectordb import NanoVectorDB
+from nano_vectordb.dbs import (
+    array_to_buffer_string,
+    f_ID,
+    f_METRICS,
+    f_VECTOR,
+    hash_ndarray,
+    normalize,
+)
 from .shared_storage import (
     get_storage_lock,
     get_update_flag,
     set_all_update_flags,
 )
+from .vector_quantization import (
+    DEFAULT_RERANK_FACTOR,
+    create_quantizer,
+    get_quantization_config,
+)
+
+# Metadata filter bitmasks kept per storage
+MAX_CACHED_FILTERS = 64
+# additional_data key holding the trained quantizer and codes of a quantized client
+QUANTIZATION_STATE_KEY = "quantization"
+
+
+def encode_vector(vector: np.ndarray) -> str:
+    """Compress a vector using Float16 + zlib + Base64 for storage optimization"""
+    compressed_vector = zlib.compress(np.asarray(vector, np.float16).tobytes())
+    return base64.b64encode(compressed_vector).decode("utf-8")
+
+
+def decode_vector(encoded: str) -> np.ndarray:
+    """Decompress a vector stored by encode_vector"""
+    decompressed = zlib.decompress(base64.b64decode(encoded))
+    return np.frombuffer(decompressed, dtype=np.float16).astype(np.float32)
+
+
+def encode_array(array: np.ndarray) -> dict[str, Any]:
+    """Serialize an array of any dtype and shape to JSON compatible data"""
+    array = np.ascontiguousarray(array)
+    return {
+        "dtype": array.dtype.str,
+        "shape": list(array.shape),
+        "data": base64.b64encode(zlib.compress(array.tobytes())).decode("utf-8"),
+    }
+
+
+def decode_array(encoded: dict[str, Any]) -> np.ndarray:
+    """Restore an array serialized by encode_array"""
+    data = zlib.decompress(base64.b64decode(encoded["data"]))
+    return np.frombuffer(data, dtype=np.dtype(encoded["dtype"])).reshape(
+        encoded["shape"]
+    )
+
+
+@dataclass
+class QuantizedNanoVectorDB(NanoVectorDB):
+    """NanoVectorDB keeping int8 or PQ codes in memory instead of the float32 matrix
+
+    Searches score the codes, then re-score the best top_k * rerank_factor candidates
+    with the float16 vector every record carries in its "vector" field. The float32
+    matrix only exists while loading and saving, so files stay compatible with
+    NanoVectorDB and quantization can be switched on and off freely.
+
+    The trained quantizer and the codes are saved in additional_data, so loading a
+    file, e.g. after another process saved it, reuses them instead of retraining.
+    """
+
+    quantizer: Any = None
+    rerank_factor: int = DEFAULT_RERANK_FACTOR
+    _codes: np.ndarray = field(default=None, init=False, repr=False)
+    _trained_on: int = field(default=0, init=False, repr=False)
+
+    @property
+    def _storage(self) -> dict[str, Any]:
+        return self._NanoVectorDB__storage
+
+    def __post_init__(self):
+        super().__post_init__()
+        storage = self._storage
+        matrix = storage.pop("matrix")
+        for record, row in zip(storage["data"], matrix):
+            # Records written before vectors were kept in the data
+            if "vector" not in record:
+                record["vector"] = encode_vector(row)
+        if not self._restore():
+            self._train(matrix)
+
+    def _restore(self) -> bool:
+        """Reuse the saved quantizer and codes, False when they do not fit the data"""
+        state = self._storage.get("additional_data", {}).pop(
+            QUANTIZATION_STATE_KEY, None
+        )
+        if not state or state.get("kind") != self.quantizer.kind:
+            return False
+        try:
+            codes = decode_array(state["codes"])
+            quantizer_state = {
+                name: decode_array(value) for name, value in state["state"].items()
+            }
+            if codes.shape != (len(self._storage["data"]), self.quantizer.code_size):
+                raise ValueError(f"codes of shape {codes.shape}")
+            self.quantizer.set_state(quantizer_state)
+        except (KeyError, TypeError, ValueError, zlib.error) as e:
+            logger.warning(f"Retraining {self.quantizer.kind} quantizer: {e}")
+            return False
+        # Writable copy, upsert updates codes in place
+        self._codes = codes.copy()
+        self._trained_on = int(state.get("trained_on", len(codes)))
+        # Same growth rule as upsert
+        if len(codes) >= 2 * self._trained_on:
+            self._train(self._float_vectors(range(len(codes))))
+        return True
+
+    def _train(self, vectors: np.ndarray) -> None:
+        if len(vectors) == 0:
+            self._codes = None
+            return
+        self.quantizer.train(vectors)
+        self._trained_on = len(vectors)
+        self._codes = self.quantizer.encode(vectors)
+
+    def _float_vectors(self, indices) -> np.ndarray:
+        data = self._storage["data"]
+        return normalize(np.stack([decode_vector(data[i]["vector"]) for i in indices]))
+
+    @property
+    def code_bytes(self) -> int:
+        """Memory used by the codes"""
+        return 0 if self._codes is None else self._codes.nbytes
+
+    def upsert(self, datas: list[dict]):
+        storage = self._storage
+        index_datas = {
+            data.get(f_ID, hash_ndarray(data[f_VECTOR])): data for data in datas
+        }
+        vectors = normalize(
+            np.array([data.pop(f_VECTOR) for data in index_datas.values()], np.float32)
+        )
+        for (data_id, data), vector in zip(index_datas.items(), vectors):
+            data[f_ID] = data_id
+            if "vector" not in data:
+                data["vector"] = encode_vector(vector)
+
+        if self._codes is None:
+            self._train(vectors)
+            storage["data"].extend(index_datas.values())
+            return {"update": [], "insert": list(index_datas)}
+
+        codes = self.quantizer.encode(vectors)
+        positions = {data[f_ID]: i for i, data in enumerate(storage["data"])}
+        report_return = {"update": [], "insert": []}
+        new_codes = []
+        for (data_id, data), code in zip(index_datas.items(), codes):
+            i = positions.get(data_id)
+            if i is None:
+                storage["data"].append(data)
+                new_codes.append(code)
+                report_return["insert"].append(data_id)
+            else:
+                storage["data"][i] = data
+                self._codes[i] = code
+                report_return["update"].append(data_id)
+        if new_codes:
+            self._codes = np.concatenate([self._codes, np.array(new_codes)])
+
+        # Codebooks trained on a small collection fit a grown one poorly
+        if len(storage["data"]) >= 2 * self._trained_on:
+            self._train(self._float_vectors(range(len(storage["data"]))))
+        return report_return
+
+    def delete(self, ids: list[str]):
+        ids = set(ids)
+        data = self._storage["data"]
+        keep = np.array([record[f_ID] not in ids for record in data], dtype=bool)
+        self._storage["data"] = [record for record, k in zip(data, keep) if k]
+        if self._codes is not None:
+            self._codes = self._codes[keep]
+
+    def save(self):
+        data = self._storage["data"]
+        if data:
+            matrix = self._float_vectors(range(len(data))).astype(np.float32)
+        else:
+            matrix = np.empty((0, self.embedding_dim), dtype=np.float32)
+        additional_data = {
+            k: v
+            for k, v in self._storage.get("additional_data", {}).items()
+            if k != QUANTIZATION_STATE_KEY
+        }
+        if self._codes is not None:
+            additional_data[QUANTIZATION_STATE_KEY] = {
+                "kind": self.quantizer.kind,
+                "trained_on": self._trained_on,
+                "state": {
+                    name: encode_array(value)
+                    for name, value in self.quantizer.get_state().items()
+                },
+                "codes": encode_array(self._codes),
+            }
+        storage = {
+            **self._storage,
+            "matrix": array_to_buffer_string(matrix),
+            "additional_data": additional_data,
+        }
+        with open(self.storage_file, "w", encoding="utf-8") as f:
+            json.dump(storage, f, ensure_ascii=False)
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        better_than_threshold: float | None = None,
+        mask: np.ndarray | None = None,
+    ) -> list[dict]:
+        """Search the codes, then re-score the best candidates at float precision
+
+        mask restricts the search to the records where it is True.
+        """
+        data = self._storage["data"]
+        if not data or self._codes is None:
+            return []
+        query = normalize(np.asarray(query, dtype=np.float32))
+        approx = self.quantizer.scores(self._codes, query)
+        available = len(data)
+        if mask is not None:
+            approx = np.where(mask, approx, -np.inf)
+            available = int(mask.sum())
+        n_candidates = min(available, top_k * self.rerank_factor)
+        if n_candidates == 0:
+            return []
+        candidates = np.argpartition(-approx, n_candidates - 1)[:n_candidates]
+        scores = self._float_vectors(candidates) @ query
+        results = []
+        for j in np.argsort(-scores)[:top_k]:
+            if better_than_threshold is not None and scores[j] < better_than_threshold:
+                break
+            results.append({**data[candidates[j]], f_METRICS: float(scores[j])})
+        return results
+
+    def _cosine_query(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        better_than_threshold: float,
+        filter_lambda=None,
+    ):
+        mask = None
+        if filter_lambda is not None:
+            mask = np.array([filter_lambda(d) for d in self._storage["data"]], bool)
+        return self.search(query, top_k, better_than_threshold, mask)
 
 
 @final
@@ -57,9 +307,32 @@ class NanoVectorDBStorage(BaseVectorStorage):
 
         self._max_batch_size = self.global_config["embedding_batch_num"]
 
-        self._client = NanoVectorDB(
+        # Metadata filter bitmasks, valid until the stored records change
+        self._filter_masks: dict[tuple, np.ndarray] = {}
+        # Normalized leading dimensions of the matrix for truncated first passes
+        self._truncated: tuple[np.ndarray, int, np.ndarray] | None = None
+
+        self._quantization = get_quantization_config(self.global_config, self.namespace)
+        self._client = self._new_client()
+
+    def _new_client(self) -> NanoVectorDB:
+        if not self._quantization:
+            client = NanoVectorDB(
+                self.embedding_func.embedding_dim,
+                storage_file=self._client_file_name,
+            )
+            # Saves of this client would leave the codes stale
+            client.get_additional_data().pop(QUANTIZATION_STATE_KEY, None)
+            return client
+        return QuantizedNanoVectorDB(
             self.embedding_func.embedding_dim,
             storage_file=self._client_file_name,
+            quantizer=create_quantizer(
+                self._quantization, self.embedding_func.embedding_dim
+            ),
+            rerank_factor=int(
+                self._quantization.get("rerank_factor", DEFAULT_RERANK_FACTOR)
+            ),
         )
 
     async def initialize(self):
@@ -79,10 +352,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
                     f"[{self.workspace}] Process {os.getpid()} reloading {self.namespace} due to update by another process"
                 )
                 # Reload data
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                self._client = self._new_client()
                 # Reset update flag
                 self.storage_updated.value = False
 
@@ -121,14 +391,12 @@ class NanoVectorDBStorage(BaseVectorStorage):
         embeddings = np.concatenate(embeddings_list)
         if len(embeddings) == len(list_data):
             for i, d in enumerate(list_data):
-                # Compress vector using Float16 + zlib + Base64 for storage optimization
-                vector_f16 = embeddings[i].astype(np.float16)
-                compressed_vector = zlib.compress(vector_f16.tobytes())
-                encoded_vector = base64.b64encode(compressed_vector).decode("utf-8")
-                d["vector"] = encoded_vector
+                d["vector"] = encode_vector(embeddings[i])
                 d["__vector__"] = embeddings[i]
             client = await self._get_client()
             results = client.upsert(datas=list_data)
+            self._filter_masks.clear()
+            self._truncated = None
             return results
         else:
             # sometimes the embedding is not returned correctly. just log it.
@@ -137,7 +405,11 @@ class NanoVectorDBStorage(BaseVectorStorage):
             )
 
     async def query(
-        self, query: str, top_k: int, query_embedding: list[float] = None
+        self,
+        query: str,
+        top_k: int,
+        query_embedding: list[float] = None,
+        query_param: QueryParam | None = None,
     ) -> list[dict[str, Any]]:
         # Use provided embedding or compute it
         if query_embedding is not None:
@@ -150,11 +422,31 @@ class NanoVectorDBStorage(BaseVectorStorage):
             embedding = embedding[0]
 
         client = await self._get_client()
-        results = client.query(
-            query=embedding,
-            top_k=top_k,
-            better_than_threshold=self.cosine_better_than_threshold,
+        conditions = metadata_filter_conditions(
+            query_param.metadata_filter if query_param else None
         )
+        mask = self._filter_mask(client, conditions) if conditions else None
+        truncate_dim = self._truncate_dim(query_param)
+        if isinstance(client, QuantizedNanoVectorDB):
+            # Already searches in two passes, over the codes then the float vectors
+            results = client.search(
+                embedding, top_k, self.cosine_better_than_threshold, mask
+            )
+        elif truncate_dim or mask is not None:
+            factor = (
+                query_param.truncate_rerank_factor
+                if query_param
+                else DEFAULT_TRUNCATE_RERANK_FACTOR
+            )
+            results = self._masked_query(
+                client, embedding, top_k, mask, truncate_dim, factor
+            )
+        else:
+            results = client.query(
+                query=embedding,
+                top_k=top_k,
+                better_than_threshold=self.cosine_better_than_threshold,
+            )
         results = [
             {
                 **{k: v for k, v in dp.items() if k != "vector"},
@@ -166,6 +458,77 @@ class NanoVectorDBStorage(BaseVectorStorage):
         ]
         return results
 
+    def _filter_mask(
+        self, client: NanoVectorDB, conditions: list[tuple[str, str, Any]]
+    ) -> np.ndarray:
+        """Bitmask of the records matching a metadata filter, computed once per filter"""
+        records = getattr(client, "_NanoVectorDB__storage")["data"]
+        # The list is replaced on delete and reload; upsert clears the cache
+        key = (id(records), len(records), repr(conditions))
+        mask = self._filter_masks.get(key)
+        if mask is None:
+            if len(self._filter_masks) >= MAX_CACHED_FILTERS:
+                self._filter_masks.clear()
+            mask = metadata_filter_mask(
+                records, conditions, {"created_at": "__created_at__"}
+            )
+            self._filter_masks[key] = mask
+        return mask
+
+    def _truncated_matrix(self, matrix: np.ndarray, dim: int) -> np.ndarray:
+        """Leading dimensions of the stored vectors, normalized again"""
+        # The matrix is replaced on insert, delete and reload; upsert clears the cache
+        cached = self._truncated
+        if cached is None or cached[0] is not matrix or cached[1] != dim:
+            truncated = np.ascontiguousarray(matrix[:, :dim])
+            norms = np.linalg.norm(truncated, axis=1, keepdims=True)
+            cached = (matrix, dim, truncated / np.maximum(norms, 1e-12))
+            self._truncated = cached
+        return cached[2]
+
+    def _masked_query(
+        self,
+        client: NanoVectorDB,
+        embedding: np.ndarray,
+        top_k: int,
+        mask: np.ndarray | None,
+        truncate_dim: int | None,
+        rerank_factor: int,
+    ) -> list[dict[str, Any]]:
+        """Cosine search restricted to a metadata filter mask and/or in two passes
+
+        Masked out records score -inf, so filtered searches scan the matrix like
+        unfiltered ones. With truncate_dim the whole matrix is only scored on its
+        leading dimensions, and the top_k * rerank_factor best records are re-scored
+        at full dimension.
+        """
+        storage = getattr(client, "_NanoVectorDB__storage")
+        records = storage["data"]
+        matrix = storage["matrix"]
+        candidates = len(records) if mask is None else int(mask.sum())
+        if candidates == 0:
+            return []
+        query = np.asarray(embedding, dtype=matrix.dtype)
+        query = query / np.linalg.norm(query)
+
+        if truncate_dim:
+            truncated_query = query[:truncate_dim]
+            truncated_query = truncated_query / np.linalg.norm(truncated_query)
+            scores = self._truncated_matrix(matrix, truncate_dim) @ truncated_query
+            n_candidates = min(candidates, top_k * rerank_factor)
+        else:
+            scores = matrix @ query
+            n_candidates = min(candidates, top_k)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        top = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+        top_scores = matrix[top] @ query if truncate_dim else scores[top]
+        return [
+            {**records[top[j]], "__metrics__": top_scores[j]}
+            for j in np.argsort(-top_scores)[:top_k]
+            if top_scores[j] >= self.cosine_better_than_threshold
+        ]
+
     @property
     async def client_storage(self):
         client = await self._get_client()
@@ -266,10 +629,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
                 logger.warning(
                     f"[{self.workspace}] Storage for {self.namespace} was updated by another process, reloading..."
                 )
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                self._client = self._new_client()
                 # Reset update flag
                 self.storage_updated.value = False
                 return False  # Return error
@@ -355,11 +715,9 @@ class NanoVectorDBStorage(BaseVectorStorage):
         for result in results:
             if result and "vector" in result and "__id__" in result:
                 # Decompress vector data (Base64 + zlib + Float16 compressed)
-                decoded = base64.b64decode(result["vector"])
-                decompressed = zlib.decompress(decoded)
-                vector_f16 = np.frombuffer(decompressed, dtype=np.float16)
-                vector_f32 = vector_f16.astype(np.float32).tolist()
-                vectors_dict[result["__id__"]] = vector_f32
+                vectors_dict[result["__id__"]] = decode_vector(
+                    result["vector"]
+                ).tolist()
 
         return vectors_dict
 
@@ -385,10 +743,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
                 if os.path.exists(self._client_file_name):
                     os.remove(self._client_file_name)
 
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                self._client = self._new_client()
 
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
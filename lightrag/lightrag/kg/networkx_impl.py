@@ -1,11 +1,14 @@
 import os
+import json
+import uuid
 from dataclasses import dataclass
-from typing import final
+from typing import Any, AsyncIterator, Iterator, final
 
+import numpy as np
 from lightrag.types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
 from lightrag.utils import logger
 from lightrag.base import BaseGraphStorage
-from lightrag.constants import GRAPH_FIELD_SEP
+from lightrag.constants import GRAPH_FIELD_SEP, DEFAULT_NETWORKX_CHANGELOG_MAX_BYTES
 import networkx as nx
 from .shared_storage import (
     get_storage_lock,
@@ -21,6 +24,177 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=".env", override=False)
 
 
+class GraphCSRSnapshot:
+    """Read-optimized compressed sparse row (CSR) snapshot of an undirected graph
+
+    Nodes are mapped to integer ids, the neighbors of node ``i`` are stored in
+    ``neighbors[offsets[i]:offsets[i + 1]]`` and node degrees follow networkx
+    semantics (a self-loop counts twice). The snapshot is immutable and must be
+    rebuilt after the graph is modified.
+    """
+
+    def __init__(self, graph: nx.Graph):
+        self.node_ids: list[str] = list(graph.nodes())
+        self.node_index: dict[str, int] = {
+            node_id: i for i, node_id in enumerate(self.node_ids)
+        }
+        num_nodes = len(self.node_ids)
+        num_edges = graph.number_of_edges()
+
+        index = self.node_index
+        pairs = np.fromiter(
+            (index[node] for edge in graph.edges() for node in edge),
+            dtype=np.int64,
+            count=2 * num_edges,
+        ).reshape(-1, 2)
+        src, tgt = pairs[:, 0], pairs[:, 1]
+
+        self.degrees = np.bincount(src, minlength=num_nodes) + np.bincount(
+            tgt, minlength=num_nodes
+        )
+        # Store both directions of every edge, self-loops only once
+        not_loop = src != tgt
+        rows = np.concatenate([src, tgt[not_loop]])
+        cols = np.concatenate([tgt, src[not_loop]])
+        self.neighbors = cols[np.argsort(rows, kind="stable")]
+        self.offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_nodes), out=self.offsets[1:])
+
+    def lookup(self, node_ids: list[str]) -> np.ndarray:
+        """Map node ids to integer ids, -1 for unknown nodes"""
+        return np.fromiter(
+            (self.node_index.get(node_id, -1) for node_id in node_ids),
+            dtype=np.int64,
+            count=len(node_ids),
+        )
+
+    def gather_neighbors(self, idx: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Expand all neighbors of the given integer ids at once
+
+        Returns:
+            (owners, neighbors) arrays of equal length, where neighbors[k] is adjacent
+            to owners[k]. Neighbors are grouped by owner in the order of ``idx``.
+        """
+        starts = self.offsets[idx]
+        counts = self.offsets[idx + 1] - starts
+        owners = np.repeat(idx, counts)
+        # Position of each neighbor in the CSR array: its owner's start offset plus
+        # its rank inside the owner's group
+        group_starts = np.cumsum(counts) - counts
+        positions = np.repeat(starts - group_starts, counts) + np.arange(counts.sum())
+        return owners, self.neighbors[positions]
+
+    def node_degrees(self, node_ids: list[str]) -> dict[str, int]:
+        """Degrees of the given nodes, 0 for unknown nodes"""
+        idx = self.lookup(node_ids)
+        found = idx >= 0
+        degrees = np.zeros(len(node_ids), dtype=np.int64)
+        degrees[found] = self.degrees[idx[found]]
+        return dict(zip(node_ids, degrees.tolist()))
+
+    def node_edges(self, node_ids: list[str]) -> dict[str, list[tuple[str, str]]]:
+        """Edges of the given nodes as (node, neighbor) tuples, [] for unknown nodes"""
+        result = {node_id: [] for node_id in node_ids}
+        idx = self.lookup(node_ids)
+        owners, neighbors = self.gather_neighbors(np.unique(idx[idx >= 0]))
+        names = self.node_ids
+        for owner, neighbor in zip(owners.tolist(), neighbors.tolist()):
+            result[names[owner]].append((names[owner], names[neighbor]))
+        return result
+
+    def top_nodes_by_degree(self, k: int) -> np.ndarray:
+        """Integer ids of the k highest-degree nodes (unordered)"""
+        if k >= len(self.node_ids):
+            return np.arange(len(self.node_ids))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        return np.argpartition(-self.degrees, k - 1)[:k]
+
+    def bfs_levels(
+        self, start: int, max_depth: int, max_nodes: int
+    ) -> Iterator[tuple[np.ndarray, bool]]:
+        """Bounded level-synchronous BFS keeping the highest-degree nodes of each level
+
+        The whole frontier is expanded at once per level. When a level holds more
+        unvisited nodes than the remaining node budget, only the top-K of them by
+        degree are kept and the search stops.
+
+        Args:
+            start: Integer id of the start node
+            max_depth: Maximum number of hops from the start node
+            max_nodes: Maximum number of nodes to return
+
+        Yields:
+            (integer ids of the nodes visited at each level starting with the start
+            node, True on the last level if max_nodes was reached while unvisited
+            nodes were still pending)
+        """
+        visited = np.zeros(len(self.node_ids), dtype=bool)
+        visited[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        num_visited = 1
+
+        for _ in range(max_depth):
+            _, candidates = self.gather_neighbors(frontier)
+            candidates = np.unique(candidates[~visited[candidates]])
+            if candidates.size == 0:
+                break
+
+            remaining = max_nodes - num_visited
+            if candidates.size > remaining:
+                if remaining > 0:
+                    yield frontier, False
+                    top = np.argpartition(-self.degrees[candidates], remaining - 1)
+                    frontier = candidates[top[:remaining]]
+                yield frontier, True
+                return
+
+            yield frontier, False
+            frontier = candidates
+            visited[frontier] = True
+            num_visited += frontier.size
+
+        yield frontier, False
+
+    def bfs(
+        self, start: int, max_depth: int, max_nodes: int
+    ) -> tuple[np.ndarray, bool]:
+        """Run bfs_levels to completion
+
+        Returns:
+            (integer ids of visited nodes, True if max_nodes was reached while
+            unvisited nodes were still pending)
+        """
+        levels = []
+        truncated = False
+        for level, truncated in self.bfs_levels(start, max_depth, max_nodes):
+            levels.append(level)
+        return np.concatenate(levels), truncated
+
+    def induced_edges(
+        self, idx: np.ndarray, member: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Edges between the given (unique) integer ids, each undirected edge once
+
+        Args:
+            idx: Integer ids whose edges are collected
+            member: Optional boolean mask of nodes already collected before ``idx``.
+                If given, edges from ``idx`` to those nodes are included as well and
+                the mask is updated to include ``idx``.
+
+        Returns:
+            (sources, targets) arrays of integer ids
+        """
+        if member is None:
+            member = np.zeros(len(self.node_ids), dtype=bool)
+        member[idx] = True
+        in_idx = np.zeros(len(self.node_ids), dtype=bool)
+        in_idx[idx] = True
+        owners, neighbors = self.gather_neighbors(idx)
+        keep = member[neighbors] & (~in_idx[neighbors] | (owners <= neighbors))
+        return owners[keep], neighbors[keep]
+
+
 @final
 @dataclass
 class NetworkXStorage(BaseGraphStorage):
@@ -37,6 +211,23 @@ class NetworkXStorage(BaseGraphStorage):
         )
         nx.write_graphml(graph, file_name)
 
+    @staticmethod
+    def apply_change(graph: nx.Graph, change: dict[str, Any]) -> None:
+        """Apply a single change log entry to the graph"""
+        op = change["op"]
+        if op == "upsert_node":
+            graph.add_node(change["id"], **change["data"])
+        elif op == "upsert_edge":
+            graph.add_edge(change["src"], change["tgt"], **change["data"])
+        elif op == "delete_node":
+            if graph.has_node(change["id"]):
+                graph.remove_node(change["id"])
+        elif op == "delete_edge":
+            if graph.has_edge(change["src"], change["tgt"]):
+                graph.remove_edge(change["src"], change["tgt"])
+        else:
+            logger.warning(f"Unknown graph change log operation: {op}")
+
     def __post_init__(self):
         working_dir = self.global_config["working_dir"]
         if self.workspace:
@@ -53,9 +244,34 @@ class NetworkXStorage(BaseGraphStorage):
         self._graphml_xml_file = os.path.join(
             workspace_dir, f"graph_{self.namespace}.graphml"
         )
+        # Append-only change log shared with other processes: the first line is a
+        # header holding the log generation, which changes whenever the log is compacted
+        self._changelog_file = os.path.join(
+            workspace_dir, f"graph_{self.namespace}.changelog"
+        )
+        self._changelog_max_bytes = int(
+            os.getenv(
+                "NETWORKX_CHANGELOG_MAX_BYTES", DEFAULT_NETWORKX_CHANGELOG_MAX_BYTES
+            )
+        )
         self._storage_lock = None
         self.storage_updated = None
         self._graph = None
+        # Changes made by this process which are not yet written to the change log
+        self._pending_changes: list[dict[str, Any]] = []
+        # CSR snapshot of the graph, rebuilt lazily after writes. It always serves
+        # get_knowledge_graph; batch query APIs only use it when explicitly enabled
+        # since the query path may interleave with writes during indexing
+        self._csr_enabled = (
+            os.getenv("NETWORKX_CSR_SNAPSHOT", "false").lower() == "true"
+        )
+        self._csr: GraphCSRSnapshot | None = None
+
+        # Record change log position before loading graph, so that changes made
+        # in between are replayed (replaying changes is idempotent)
+        self._changelog_generation, self._changelog_offset = (
+            self._get_changelog_position()
+        )
 
         # Load initial graph
         preloaded_graph = NetworkXStorage.load_nx_graph(self._graphml_xml_file)
@@ -76,24 +292,131 @@ class NetworkXStorage(BaseGraphStorage):
         # Get the storage lock for use in other methods
         self._storage_lock = get_storage_lock()
 
+    def _get_changelog_position(self) -> tuple[str | None, int]:
+        """Return (generation, end offset) of the change log file on disk"""
+        try:
+            with open(self._changelog_file, "rb") as f:
+                header = f.readline()
+                generation = json.loads(header).get("generation")
+                f.seek(0, os.SEEK_END)
+                return generation, f.tell()
+        except (OSError, ValueError, AttributeError):
+            return None, 0
+
+    def _replay_changelog(self) -> int:
+        """Apply change log entries appended by other processes since the last sync
+
+        Returns:
+            Number of entries replayed
+        """
+        replayed = 0
+        with open(self._changelog_file, "rb") as f:
+            f.seek(self._changelog_offset)
+            for line in f:
+                # Ignore a partially written trailing line
+                if not line.endswith(b"\n"):
+                    break
+                NetworkXStorage.apply_change(self._graph, json.loads(line))
+                self._changelog_offset += len(line)
+                replayed += 1
+        return replayed
+
+    def _reload_graph(self):
+        """Sync in-memory graph with modifications made by other processes (must hold storage lock)
+
+        Changes are replayed incrementally from the change log while it stays in the
+        same generation; a full GraphML reload only happens after log compaction.
+        Local changes not saved yet are discarded in both cases: a graph holding
+        unsaved changes is reloaded from GraphML instead of replaying the log.
+        """
+        self._csr = None
+        generation, _ = self._get_changelog_position()
+        if (
+            generation is not None
+            and generation == self._changelog_generation
+            and not self._pending_changes
+        ):
+            replayed = self._replay_changelog()
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} replayed {replayed} graph changes from {self._changelog_file}"
+            )
+            return
+
+        logger.info(
+            f"[{self.workspace}] Process {os.getpid()} reloading graph {self._graphml_xml_file} due to modifications by another process"
+        )
+        self._changelog_generation, self._changelog_offset = (
+            self._get_changelog_position()
+        )
+        self._graph = (
+            NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
+        )
+        # Local changes are discarded together with the graph they were applied to
+        self._pending_changes = []
+
+    def _write_changelog(self):
+        """Append pending changes to the change log, compacting it when it grows too large
+
+        Must be called with the storage lock held, right after the full graph has been
+        written to GraphML, so that a compacted (empty) log never loses changes.
+        """
+        generation, size = self._get_changelog_position()
+        if (
+            generation is None
+            or generation != self._changelog_generation
+            or size >= self._changelog_max_bytes
+        ):
+            # Start a new generation: other processes will do a full reload once
+            self._changelog_generation = uuid.uuid4().hex
+            tmp_file = f"{self._changelog_file}.tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(
+                    json.dumps({"generation": self._changelog_generation}).encode()
+                    + b"\n"
+                )
+            os.replace(tmp_file, self._changelog_file)
+            _, self._changelog_offset = self._get_changelog_position()
+            logger.debug(
+                f"[{self.workspace}] Graph change log compacted: {self._changelog_file}"
+            )
+        elif self._pending_changes:
+            data = b"".join(
+                json.dumps(change, ensure_ascii=False, default=str).encode("utf-8")
+                + b"\n"
+                for change in self._pending_changes
+            )
+            with open(self._changelog_file, "ab") as f:
+                f.write(data)
+            self._changelog_offset = size + len(data)
+
+        self._pending_changes = []
+
     async def _get_graph(self):
         """Check if the storage should be reloaded"""
         # Acquire lock to prevent concurrent read and write
         async with self._storage_lock:
             # Check if data needs to be reloaded
             if self.storage_updated.value:
-                logger.info(
-                    f"[{self.workspace}] Process {os.getpid()} reloading graph {self._graphml_xml_file} due to modifications by another process"
-                )
-                # Reload data
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
-                )
+                self._reload_graph()
                 # Reset update flag
                 self.storage_updated.value = False
 
             return self._graph
 
+    async def _get_csr(self) -> tuple[nx.Graph, GraphCSRSnapshot]:
+        """Return the graph and its CSR snapshot, rebuilding it if the graph changed
+
+        The pair is taken without awaiting in between, so the snapshot always matches
+        the returned graph even when a reload replaces the graph afterwards.
+        """
+        graph = await self._get_graph()
+        if self._csr is None:
+            self._csr = GraphCSRSnapshot(graph)
+            logger.debug(
+                f"[{self.workspace}] Rebuilt CSR snapshot with {len(self._csr.node_ids)} nodes, {len(self._csr.neighbors)} adjacency entries"
+            )
+        return graph, self._csr
+
     async def has_node(self, node_id: str) -> bool:
         graph = await self._get_graph()
         return graph.has_node(node_id)
@@ -128,6 +451,29 @@ class NetworkXStorage(BaseGraphStorage):
             return list(graph.edges(source_node_id))
         return None
 
+    async def node_degrees_batch(self, node_ids: list[str]) -> dict[str, int]:
+        if not self._csr_enabled:
+            return await super().node_degrees_batch(node_ids)
+        _, csr = await self._get_csr()
+        return csr.node_degrees(node_ids)
+
+    async def edge_degrees_batch(
+        self, edge_pairs: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], int]:
+        if not self._csr_enabled:
+            return await super().edge_degrees_batch(edge_pairs)
+        _, csr = await self._get_csr()
+        degrees = csr.node_degrees(list({n for pair in edge_pairs for n in pair}))
+        return {(src, tgt): degrees[src] + degrees[tgt] for src, tgt in edge_pairs}
+
+    async def get_nodes_edges_batch(
+        self, node_ids: list[str]
+    ) -> dict[str, list[tuple[str, str]]]:
+        if not self._csr_enabled:
+            return await super().get_nodes_edges_batch(node_ids)
+        _, csr = await self._get_csr()
+        return csr.node_edges(node_ids)
+
     async def upsert_node(self, node_id: str, node_data: dict[str, str]) -> None:
         """
         Importance notes:
@@ -136,7 +482,12 @@ class NetworkXStorage(BaseGraphStorage):
            KG-storage-log should be used to avoid data corruption
         """
         graph = await self._get_graph()
+        if not graph.has_node(node_id):
+            self._csr = None
         graph.add_node(node_id, **node_data)
+        self._pending_changes.append(
+            {"op": "upsert_node", "id": node_id, "data": dict(node_data)}
+        )
 
     async def upsert_edge(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
@@ -148,7 +499,17 @@ class NetworkXStorage(BaseGraphStorage):
            KG-storage-log should be used to avoid data corruption
         """
         graph = await self._get_graph()
+        if not graph.has_edge(source_node_id, target_node_id):
+            self._csr = None
         graph.add_edge(source_node_id, target_node_id, **edge_data)
+        self._pending_changes.append(
+            {
+                "op": "upsert_edge",
+                "src": source_node_id,
+                "tgt": target_node_id,
+                "data": dict(edge_data),
+            }
+        )
 
     async def delete_node(self, node_id: str) -> None:
         """
@@ -160,6 +521,8 @@ class NetworkXStorage(BaseGraphStorage):
         graph = await self._get_graph()
         if graph.has_node(node_id):
             graph.remove_node(node_id)
+            self._csr = None
+            self._pending_changes.append({"op": "delete_node", "id": node_id})
             logger.debug(f"[{self.workspace}] Node {node_id} deleted from the graph")
         else:
             logger.warning(
@@ -181,6 +544,8 @@ class NetworkXStorage(BaseGraphStorage):
         for node in nodes:
             if graph.has_node(node):
                 graph.remove_node(node)
+                self._csr = None
+                self._pending_changes.append({"op": "delete_node", "id": node})
 
     async def remove_edges(self, edges: list[tuple[str, str]]):
         """Delete multiple edges
@@ -197,6 +562,10 @@ class NetworkXStorage(BaseGraphStorage):
         for source, target in edges:
             if graph.has_edge(source, target):
                 graph.remove_edge(source, target)
+                self._csr = None
+                self._pending_changes.append(
+                    {"op": "delete_edge", "src": source, "tgt": target}
+                )
 
     async def get_all_labels(self) -> list[str]:
         """
@@ -293,6 +662,43 @@ class NetworkXStorage(BaseGraphStorage):
 
         return search_results
 
+    @staticmethod
+    def _add_subgraph_items(
+        result: KnowledgeGraph,
+        graph: nx.Graph,
+        csr: GraphCSRSnapshot,
+        nodes: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+    ) -> None:
+        """Append nodes and edges given as CSR integer ids to result, copying their properties"""
+        node_ids = csr.node_ids
+        for i in nodes.tolist():
+            node_id = node_ids[i]
+            result.nodes.append(
+                KnowledgeGraphNode(
+                    id=str(node_id),
+                    labels=[str(node_id)],
+                    properties=dict(graph.nodes[node_id]),
+                )
+            )
+
+        for s, t in zip(sources.tolist(), targets.tolist()):
+            edge_data = dict(graph.adj[node_ids[s]][node_ids[t]])
+            source, target = str(node_ids[s]), str(node_ids[t])
+            # Esure unique edge_id for undirect graph
+            if source > target:
+                source, target = target, source
+            result.edges.append(
+                KnowledgeGraphEdge(
+                    id=f"{source}-{target}",
+                    type="DIRECTED",
+                    source=source,
+                    target=target,
+                    properties=edge_data,
+                )
+            )
+
     async def get_knowledge_graph(
         self,
         node_label: str,
@@ -318,157 +724,89 @@ class NetworkXStorage(BaseGraphStorage):
             # Limit max_nodes to not exceed global_config max_graph_nodes
             max_nodes = min(max_nodes, self.global_config.get("max_graph_nodes", 1000))
 
-        graph = await self._get_graph()
+        graph, csr = await self._get_csr()
 
         result = KnowledgeGraph()
 
         # Handle special case for "*" label
         if node_label == "*":
-            # Get degrees of all nodes
-            degrees = dict(graph.degree())
-            # Sort nodes by degree in descending order and take top max_nodes
-            sorted_nodes = sorted(degrees.items(), key=lambda x: x[1], reverse=True)
-
             # Check if graph is truncated
-            if len(sorted_nodes) > max_nodes:
+            if len(csr.node_ids) > max_nodes:
                 result.is_truncated = True
                 logger.info(
-                    f"[{self.workspace}] Graph truncated: {len(sorted_nodes)} nodes found, limited to {max_nodes}"
+                    f"[{self.workspace}] Graph truncated: {len(csr.node_ids)} nodes found, limited to {max_nodes}"
                 )
-
-            limited_nodes = [node for node, _ in sorted_nodes[:max_nodes]]
-            # Create subgraph with the highest degree nodes
-            subgraph = graph.subgraph(limited_nodes)
+            # Take the highest degree nodes
+            selected = csr.top_nodes_by_degree(max_nodes)
         else:
             # Check if node exists
-            if node_label not in graph:
+            start = csr.node_index.get(node_label)
+            if start is None:
                 logger.warning(
                     f"[{self.workspace}] Node {node_label} not found in the graph"
                 )
                 return KnowledgeGraph()  # Return empty graph
 
-            # Use modified BFS to get nodes, prioritizing high-degree nodes at the same depth
-            bfs_nodes = []
-            visited = set()
-            # Store (node, depth, degree) in the queue
-            queue = [(node_label, 0, graph.degree(node_label))]
-
-            # Flag to track if there are unexplored neighbors due to depth limit
-            has_unexplored_neighbors = False
-
-            # Modified breadth-first search with degree-based prioritization
-            while queue and len(bfs_nodes) < max_nodes:
-                # Get the current depth from the first node in queue
-                current_depth = queue[0][1]
-
-                # Collect all nodes at the current depth
-                current_level_nodes = []
-                while queue and queue[0][1] == current_depth:
-                    current_level_nodes.append(queue.pop(0))
-
-                # Sort nodes at current depth by degree (highest first)
-                current_level_nodes.sort(key=lambda x: x[2], reverse=True)
-
-                # Process all nodes at current depth in order of degree
-                for current_node, depth, degree in current_level_nodes:
-                    if current_node not in visited:
-                        visited.add(current_node)
-                        bfs_nodes.append(current_node)
-
-                        # Only explore neighbors if we haven't reached max_depth
-                        if depth < max_depth:
-                            # Add neighbor nodes to queue with incremented depth
-                            neighbors = list(graph.neighbors(current_node))
-                            # Filter out already visited neighbors
-                            unvisited_neighbors = [
-                                n for n in neighbors if n not in visited
-                            ]
-                            # Add neighbors to the queue with their degrees
-                            for neighbor in unvisited_neighbors:
-                                neighbor_degree = graph.degree(neighbor)
-                                queue.append((neighbor, depth + 1, neighbor_degree))
-                        else:
-                            # Check if there are unexplored neighbors (skipped due to depth limit)
-                            neighbors = list(graph.neighbors(current_node))
-                            unvisited_neighbors = [
-                                n for n in neighbors if n not in visited
-                            ]
-                            if unvisited_neighbors:
-                                has_unexplored_neighbors = True
-
-                    # Check if we've reached max_nodes
-                    if len(bfs_nodes) >= max_nodes:
-                        break
-
-            # Check if graph is truncated - either due to max_nodes limit or depth limit
-            if (queue and len(bfs_nodes) >= max_nodes) or has_unexplored_neighbors:
-                if len(bfs_nodes) >= max_nodes:
-                    result.is_truncated = True
-                    logger.info(
-                        f"[{self.workspace}] Graph truncated: max_nodes limit {max_nodes} reached"
-                    )
-                else:
-                    logger.info(
-                        f"[{self.workspace}] Graph truncated: found {len(bfs_nodes)} nodes within max_depth {max_depth}"
-                    )
-
-            # Create subgraph with BFS discovered nodes
-            subgraph = graph.subgraph(bfs_nodes)
-
-        # Add nodes to result
-        seen_nodes = set()
-        seen_edges = set()
-        for node in subgraph.nodes():
-            if str(node) in seen_nodes:
-                continue
+            # Level-synchronous BFS, prioritizing high-degree nodes at the same depth
+            selected, truncated = csr.bfs(start, max_depth, max_nodes)
+            if truncated:
+                result.is_truncated = True
+                logger.info(
+                    f"[{self.workspace}] Graph truncated: max_nodes limit {max_nodes} reached"
+                )
 
-            node_data = dict(subgraph.nodes[node])
-            # Get entity_type as labels
-            labels = []
-            if "entity_type" in node_data:
-                if isinstance(node_data["entity_type"], list):
-                    labels.extend(node_data["entity_type"])
-                else:
-                    labels.append(node_data["entity_type"])
+        # Materialize properties only for the returned nodes and edges
+        self._add_subgraph_items(
+            result, graph, csr, selected, *csr.induced_edges(selected)
+        )
 
-            # Create node with properties
-            node_properties = {k: v for k, v in node_data.items()}
+        logger.info(
+            f"[{self.workspace}] Subgraph query successful | Node count: {len(result.nodes)} | Edge count: {len(result.edges)}"
+        )
+        return result
 
-            result.nodes.append(
-                KnowledgeGraphNode(
-                    id=str(node), labels=[str(node)], properties=node_properties
-                )
-            )
-            seen_nodes.add(str(node))
+    async def get_knowledge_graph_stream(
+        self,
+        node_label: str,
+        max_depth: int = 3,
+        max_nodes: int = None,
+    ) -> AsyncIterator[KnowledgeGraph]:
+        """
+        Retrieve the same subgraph as get_knowledge_graph level by level.
 
-        # Add edges to result
-        for edge in subgraph.edges():
-            source, target = edge
-            # Esure unique edge_id for undirect graph
-            if str(source) > str(target):
-                source, target = target, source
-            edge_id = f"{source}-{target}"
-            if edge_id in seen_edges:
-                continue
+        Each yielded KnowledgeGraph holds the nodes discovered at one BFS level and
+        the edges connecting them to nodes already yielded. The stream ends early if
+        the graph structure is modified while it is being consumed.
+        """
+        if node_label == "*":
+            yield await self.get_knowledge_graph(node_label, max_depth, max_nodes)
+            return
+
+        if max_nodes is None:
+            max_nodes = self.global_config.get("max_graph_nodes", 1000)
+        else:
+            max_nodes = min(max_nodes, self.global_config.get("max_graph_nodes", 1000))
 
-            edge_data = dict(subgraph.edges[edge])
+        graph, csr = await self._get_csr()
+        start = csr.node_index.get(node_label)
+        if start is None:
+            logger.warning(
+                f"[{self.workspace}] Node {node_label} not found in the graph"
+            )
+            return
 
-            # Create edge with complete information
-            result.edges.append(
-                KnowledgeGraphEdge(
-                    id=edge_id,
-                    type="DIRECTED",
-                    source=str(source),
-                    target=str(target),
-                    properties=edge_data,
+        emitted = np.zeros(len(csr.node_ids), dtype=bool)
+        for level, truncated in csr.bfs_levels(start, max_depth, max_nodes):
+            if self._csr is not csr:
+                logger.info(
+                    f"[{self.workspace}] Graph modified during subgraph streaming, stopping"
                 )
+                return
+            result = KnowledgeGraph(is_truncated=truncated)
+            self._add_subgraph_items(
+                result, graph, csr, level, *csr.induced_edges(level, emitted)
             )
-            seen_edges.add(edge_id)
-
-        logger.info(
-            f"[{self.workspace}] Subgraph query successful | Node count: {len(result.nodes)} | Edge count: {len(result.edges)}"
-        )
-        return result
+            yield result
 
     async def get_nodes_by_chunk_ids(self, chunk_ids: list[str]) -> list[dict]:
         chunk_ids_set = set(chunk_ids)
@@ -527,7 +865,11 @@ class NetworkXStorage(BaseGraphStorage):
         return all_edges
 
     async def index_done_callback(self) -> bool:
-        """Save data to disk"""
+        """Save data to disk
+
+        When another process updated the graph first, the graph is synced with its
+        changes and the unsaved local changes are discarded instead of saved.
+        """
         async with self._storage_lock:
             # Check if storage was updated by another process
             if self.storage_updated.value:
@@ -535,9 +877,7 @@ class NetworkXStorage(BaseGraphStorage):
                 logger.info(
                     f"[{self.workspace}] Graph was updated by another process, reloading..."
                 )
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
-                )
+                self._reload_graph()
                 # Reset update flag
                 self.storage_updated.value = False
                 return False  # Return error
@@ -549,6 +889,8 @@ class NetworkXStorage(BaseGraphStorage):
                 NetworkXStorage.write_nx_graph(
                     self._graph, self._graphml_xml_file, self.workspace
                 )
+                # Publish changes to other processes through the change log
+                self._write_changelog()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
                 # Reset own update flag to avoid self-reloading
@@ -579,7 +921,13 @@ class NetworkXStorage(BaseGraphStorage):
                 # delete _client_file_name
                 if os.path.exists(self._graphml_xml_file):
                     os.remove(self._graphml_xml_file)
+                # Removing the change log forces other processes to do a full reload
+                if os.path.exists(self._changelog_file):
+                    os.remove(self._changelog_file)
                 self._graph = nx.Graph()
+                self._csr = None
+                self._pending_changes = []
+                self._changelog_generation, self._changelog_offset = None, 0
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
                 # Reset own update flag to avoid self-reloading
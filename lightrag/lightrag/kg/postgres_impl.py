@@ -1,11 +1,12 @@
 import asyncio
+import copy
 import json
 import os
 import re
 import datetime
 from datetime import timezone
 from dataclasses import dataclass, field
-from typing import Any, Union, final
+from typing import Any, Awaitable, Callable, Union, final
 import numpy as np
 import configparser
 import ssl
@@ -27,9 +28,14 @@ from ..base import (
     DocProcessingStatus,
     DocStatus,
     DocStatusStorage,
+    QueryParam,
 )
 from ..namespace import NameSpace, is_namespace
-from ..utils import logger
+from ..utils import (
+    logger,
+    metadata_filter_conditions,
+    METADATA_FILTER_MULTI_VALUE_FIELDS,
+)
 from ..constants import GRAPH_FIELD_SEP
 from ..kg.shared_storage import get_data_init_lock, get_graph_db_lock, get_storage_lock
 
@@ -73,6 +79,19 @@ class PostgreSQLDB:
         self.hnsw_m = config.get("hnsw_m")
         self.hnsw_ef = config.get("hnsw_ef")
         self.ivfflat_lists = config.get("ivfflat_lists")
+        # Default search parameters, None keeps the server settings
+        self.hnsw_ef_search = config.get("hnsw_ef_search")
+        self.ivfflat_probes = config.get("ivfflat_probes")
+        # pgvector 0.8+ iterative index scans for metadata filtered searches
+        self.iterative_scan = config.get("iterative_scan")
+
+        # Rows sent per executemany round trip by bulk upserts
+        self.upsert_batch_size = int(config.get("upsert_batch_size") or 500)
+
+        # Prepared statements kept per pooled connection, keyed by SQL text.
+        # SQL templates pass all values as parameters so each is parsed and
+        # planned once per connection.
+        self.statement_cache_size = int(config.get("statement_cache_size") or 256)
 
         if self.user is None or self.password is None or self.database is None:
             raise ValueError("Missing database user, password, or database")
@@ -158,6 +177,7 @@ class PostgreSQLDB:
                 "port": self.port,
                 "min_size": 1,
                 "max_size": self.max,
+                "statement_cache_size": self.statement_cache_size,
             }
 
             # Add SSL configuration if provided
@@ -912,25 +932,19 @@ class PostgreSQLDB:
             logger.info(
                 f"PostgreSQL, Create vector indexs, type: {self.vector_index_type}"
             )
-            try:
-                if self.vector_index_type == "HNSW":
-                    await self._create_hnsw_vector_indexes()
-                elif self.vector_index_type == "IVFFLAT":
-                    await self._create_ivfflat_vector_indexes()
-                elif self.vector_index_type == "FLAT":
-                    logger.warning(
-                        "FLAT index type is not supported by pgvector. Skipping vector index creation. "
-                        "Please use 'HNSW' or 'IVFFLAT' instead."
-                    )
-                else:
-                    logger.warning(
-                        "Doesn't support this vector index type: {self.vector_index_type}. "
-                        "Supported types: HNSW, IVFFLAT"
-                    )
-            except Exception as e:
-                logger.error(
-                    f"PostgreSQL, Failed to create vector index, type: {self.vector_index_type}, Got: {e}"
+            if self.vector_index_type == "FLAT":
+                logger.warning(
+                    "FLAT index type is not supported by pgvector. Skipping vector index creation. "
+                    "Please use 'HNSW' or 'IVFFLAT' instead."
                 )
+            elif self.vector_index_type not in ("HNSW", "IVFFLAT"):
+                logger.warning(
+                    f"Doesn't support this vector index type: {self.vector_index_type}. "
+                    "Supported types: HNSW, IVFFLAT"
+                )
+            else:
+                for k in VECTOR_TABLES:
+                    await self.ensure_vector_index(k)
         # After all tables are created, attempt to migrate timestamp fields
         try:
             await self._migrate_timestamp_columns()
@@ -1132,86 +1146,163 @@ class PostgreSQLDB:
             except Exception as e:
                 logger.warning(f"Failed to create index {index['name']}: {e}")
 
-    async def _create_hnsw_vector_indexes(self):
-        vdb_tables = [
-            "LIGHTRAG_VDB_CHUNKS",
-            "LIGHTRAG_VDB_ENTITY",
-            "LIGHTRAG_VDB_RELATION",
-        ]
+    def vector_index_options(
+        self, index_type: str | None = None, overrides: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Resolve vector index type and build parameters
 
-        embedding_dim = int(os.environ.get("EMBEDDING_DIM", 1024))
+        Args:
+            index_type: HNSW or IVFFLAT, defaults to vector_index_type
+            overrides: Build parameters replacing the configured defaults
+                (m and ef_construction for HNSW, lists for IVFFLAT)
 
-        for k in vdb_tables:
-            vector_index_name = f"idx_{k.lower()}_hnsw_cosine"
-            check_vector_index_sql = f"""
-                    SELECT 1 FROM pg_indexes
-                    WHERE indexname = '{vector_index_name}'
-                      AND tablename = '{k.lower()}'
-                """
-            try:
-                vector_index_exists = await self.query(check_vector_index_sql)
-                if not vector_index_exists:
-                    # Only set vector dimension when index doesn't exist
-                    alter_sql = f"ALTER TABLE {k} ALTER COLUMN content_vector TYPE VECTOR({embedding_dim})"
-                    await self.execute(alter_sql)
-                    logger.debug(f"Ensured vector dimension for {k}")
-
-                    create_vector_index_sql = f"""
-                            CREATE INDEX {vector_index_name}
-                            ON {k} USING hnsw (content_vector vector_cosine_ops)
-                            WITH (m = {self.hnsw_m}, ef_construction = {self.hnsw_ef})
-                        """
-                    logger.info(f"Creating hnsw index {vector_index_name} on table {k}")
-                    await self.execute(create_vector_index_sql)
-                    logger.info(
-                        f"Successfully created vector index {vector_index_name} on table {k}"
-                    )
-                else:
-                    logger.info(
-                        f"HNSW vector index {vector_index_name} already exists on table {k}"
-                    )
-            except Exception as e:
-                logger.error(f"Failed to create vector index on table {k}, Got: {e}")
+        Returns:
+            dict with the upper-cased "type" and its build parameters
+        """
+        index_type = (index_type or self.vector_index_type or "HNSW").upper()
+        if index_type == "HNSW":
+            options = {"m": self.hnsw_m, "ef_construction": self.hnsw_ef}
+        elif index_type == "IVFFLAT":
+            options = {"lists": self.ivfflat_lists}
+        else:
+            raise ValueError(
+                f"Doesn't support this vector index type: {index_type}. "
+                "Supported types: HNSW, IVFFLAT"
+            )
+        options.update(
+            {k: int(v) for k, v in (overrides or {}).items() if k in options}
+        )
+        return {"type": index_type, **options}
 
-    async def _create_ivfflat_vector_indexes(self):
-        vdb_tables = [
-            "LIGHTRAG_VDB_CHUNKS",
-            "LIGHTRAG_VDB_ENTITY",
-            "LIGHTRAG_VDB_RELATION",
-        ]
+    @staticmethod
+    def vector_index_name(table_name: str, index_type: str) -> str:
+        return f"idx_{table_name.lower()}_{index_type.lower()}_cosine"
 
-        embedding_dim = int(os.environ.get("EMBEDDING_DIM", 1024))
+    def _vector_index_ddl(
+        self,
+        table_name: str,
+        index_name: str,
+        options: dict[str, Any],
+        concurrently: bool = False,
+    ) -> str:
+        if options["type"] == "HNSW":
+            method = "hnsw"
+            params = (
+                f"m = {options['m']}, ef_construction = {options['ef_construction']}"
+            )
+        else:
+            method = "ivfflat"
+            params = f"lists = {options['lists']}"
+        return f"""
+                CREATE INDEX {"CONCURRENTLY " if concurrently else ""}{index_name}
+                ON {table_name} USING {method} (content_vector vector_cosine_ops)
+                WITH ({params})
+            """
 
-        for k in vdb_tables:
-            index_name = f"idx_{k.lower()}_ivfflat_cosine"
-            check_index_sql = f"""
-                    SELECT 1 FROM pg_indexes
-                    WHERE indexname = '{index_name}' AND tablename = '{k.lower()}'
-                """
-            try:
-                exists = await self.query(check_index_sql)
-                if not exists:
-                    # Only set vector dimension when index doesn't exist
-                    alter_sql = f"ALTER TABLE {k} ALTER COLUMN content_vector TYPE VECTOR({embedding_dim})"
-                    await self.execute(alter_sql)
-                    logger.debug(f"Ensured vector dimension for {k}")
-
-                    create_sql = f"""
-                            CREATE INDEX {index_name}
-                            ON {k} USING ivfflat (content_vector vector_cosine_ops)
-                            WITH (lists = {self.ivfflat_lists})
-                        """
-                    logger.info(f"Creating ivfflat index {index_name} on table {k}")
-                    await self.execute(create_sql)
-                    logger.info(
-                        f"Successfully created ivfflat index {index_name} on table {k}"
+    async def _vector_index_exists(self, table_name: str, index_name: str) -> bool:
+        check_index_sql = f"""
+                SELECT 1 FROM pg_indexes
+                WHERE indexname = '{index_name}'
+                  AND tablename = '{table_name.lower()}'
+            """
+        return bool(await self.query(check_index_sql))
+
+    async def ensure_vector_index(
+        self,
+        table_name: str,
+        index_type: str | None = None,
+        overrides: dict[str, Any] | None = None,
+    ) -> None:
+        """Create the cosine vector index of a table if it does not exist yet
+
+        Build parameters of an existing index are left untouched and indexes of the
+        other vector index type are kept; use rebuild_vector_index to apply new
+        parameters and drop the index of the other type.
+        """
+        options = self.vector_index_options(index_type, overrides)
+        index_name = self.vector_index_name(table_name, options["type"])
+        try:
+            if await self._vector_index_exists(table_name, index_name):
+                logger.info(
+                    f"PostgreSQL, {options['type']} vector index {index_name} already exists on table {table_name}"
+                )
+                return
+
+            # Only set vector dimension when index doesn't exist
+            embedding_dim = int(os.environ.get("EMBEDDING_DIM", 1024))
+            alter_sql = f"ALTER TABLE {table_name} ALTER COLUMN content_vector TYPE VECTOR({embedding_dim})"
+            await self.execute(alter_sql)
+            logger.debug(f"Ensured vector dimension for {table_name}")
+
+            logger.info(
+                f"PostgreSQL, Creating {options['type']} vector index {index_name} on table {table_name}"
+            )
+            await self.execute(self._vector_index_ddl(table_name, index_name, options))
+            logger.info(
+                f"PostgreSQL, Successfully created vector index {index_name} on table {table_name}"
+            )
+        except Exception as e:
+            logger.error(
+                f"PostgreSQL, Failed to create vector index on table {table_name}, Got: {e}"
+            )
+
+    async def rebuild_vector_index(
+        self,
+        table_name: str,
+        index_type: str | None = None,
+        overrides: dict[str, Any] | None = None,
+    ) -> None:
+        """Rebuild the cosine vector index of a table without blocking writes
+
+        A new index is built concurrently with the current build parameters and then
+        swapped in for the old one; the index of the other vector index type is
+        dropped. Run it after bulk ingestion: IVFFlat lists are trained on the rows
+        present at build time, and HNSW builds faster in one pass than through
+        incremental inserts. Unlike execute(), errors of the DDL are raised.
+        """
+        options = self.vector_index_options(index_type, overrides)
+        index_name = self.vector_index_name(table_name, options["type"])
+        exists = await self._vector_index_exists(table_name, index_name)
+        new_index_name = f"{index_name}_rebuild" if exists else index_name
+        logger.info(
+            f"PostgreSQL, Rebuilding {options['type']} vector index {index_name} on table {table_name}"
+        )
+        try:
+            async with self.pool.acquire() as connection:  # type: ignore
+                if exists:
+                    # Left over by a failed rebuild
+                    await connection.execute(
+                        f"DROP INDEX CONCURRENTLY IF EXISTS {new_index_name}"
                     )
                 else:
-                    logger.info(
-                        f"Ivfflat vector index {index_name} already exists on table {k}"
+                    embedding_dim = int(os.environ.get("EMBEDDING_DIM", 1024))
+                    await connection.execute(
+                        f"ALTER TABLE {table_name} ALTER COLUMN content_vector TYPE VECTOR({embedding_dim})"
                     )
-            except Exception as e:
-                logger.error(f"Failed to create ivfflat index on {k}: {e}")
+                await connection.execute(
+                    self._vector_index_ddl(
+                        table_name, new_index_name, options, concurrently=True
+                    )
+                )
+                if exists:
+                    await connection.execute(f"DROP INDEX CONCURRENTLY {index_name}")
+                    await connection.execute(
+                        f"ALTER INDEX {new_index_name} RENAME TO {index_name}"
+                    )
+                for other_type in ("HNSW", "IVFFLAT"):
+                    if other_type != options["type"]:
+                        other_name = self.vector_index_name(table_name, other_type)
+                        await connection.execute(
+                            f"DROP INDEX CONCURRENTLY IF EXISTS {other_name}"
+                        )
+        except Exception as e:
+            logger.error(
+                f"PostgreSQL, Failed to rebuild vector index {index_name} on table {table_name}, Got: {e}"
+            )
+            raise
+        logger.info(
+            f"PostgreSQL, Successfully rebuilt vector index {index_name} on table {table_name}"
+        )
 
     async def query(
         self,
@@ -1220,6 +1311,7 @@ class PostgreSQLDB:
         multirows: bool = False,
         with_age: bool = False,
         graph_name: str | None = None,
+        settings: dict[str, Any] | None = None,
     ) -> dict[str, Any] | None | list[dict[str, Any]]:
         async with self.pool.acquire() as connection:  # type: ignore
             if with_age and graph_name:
@@ -1228,7 +1320,15 @@ class PostgreSQLDB:
                 raise ValueError("Graph name is required when with_age is True")
 
             try:
-                if params:
+                if settings:
+                    # Settings such as hnsw.ef_search only last for this transaction
+                    async with connection.transaction():
+                        for name, value in settings.items():
+                            await connection.execute(
+                                "SELECT set_config($1, $2, true)", name, str(value)
+                            )
+                        rows = await connection.fetch(sql, *(params or []))
+                elif params:
                     rows = await connection.fetch(sql, *params)
                 else:
                     rows = await connection.fetch(sql)
@@ -1288,6 +1388,94 @@ class PostgreSQLDB:
             logger.error(f"PostgreSQL database,\nsql:{sql},\ndata:{data},\nerror:{e}")
             raise
 
+    async def executemany(
+        self,
+        sql: str,
+        data: list[dict[str, Any]],
+        batch_size: int | None = None,
+    ) -> None:
+        """Execute one statement for many rows over a single connection
+
+        Rows are sent in batches of batch_size (default upsert_batch_size) with
+        asyncpg executemany, which pipelines the whole batch in one round trip and
+        applies it atomically. A batch that fails is not applied and is retried row
+        by row with execute(), so errors keep the semantics of execute(): duplicate
+        errors of single rows are logged and skipped, other errors are raised.
+
+        Args:
+            sql: Statement with positional parameters
+            data: Parameter dicts, one per row, ordered like the statement parameters
+            batch_size: Number of rows per round trip
+        """
+        if not data:
+            return
+        batch_size = batch_size or self.upsert_batch_size
+        failed_batches: list[list[dict[str, Any]]] = []
+        async with self.pool.acquire() as connection:  # type: ignore
+            for i in range(0, len(data), batch_size):
+                batch = data[i : i + batch_size]
+                try:
+                    await connection.executemany(
+                        sql, [tuple(row.values()) for row in batch]
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"PostgreSQL batch of {len(batch)} rows failed, retrying row by row: {e}"
+                    )
+                    failed_batches.append(batch)
+
+        for batch in failed_batches:
+            for row in batch:
+                await self.execute(sql, row)
+
+
+class ReadCoalescer:
+    """Merge concurrent single-key reads into one batched read
+
+    Keys requested while a batch is being collected (until the event loop runs the
+    scheduled flush) are fetched together with one call of fetch_many, so
+    concurrent lookups share one connection and one round trip instead of each
+    checking out a pooled connection. Callers of the same key each get their own
+    copy of the result, as with separate reads.
+    """
+
+    def __init__(
+        self, fetch_many: Callable[[list[str]], Awaitable[dict[str, Any]]]
+    ) -> None:
+        self._fetch_many = fetch_many
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        # Strong references to running flushes, the event loop only keeps weak ones
+        self._flushing: set[asyncio.Task] = set()
+
+    def _start_flush(self) -> None:
+        task = asyncio.ensure_future(self._flush())
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def get(self, key: str) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._start_flush)
+        self._pending.setdefault(key, []).append(future)
+        return await future
+
+    async def _flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        try:
+            results = await self._fetch_many(list(pending))
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for key, futures in pending.items():
+            result = results.get(key)
+            for i, future in enumerate(futures):
+                if not future.done():
+                    future.set_result(result if i == 0 else copy.deepcopy(result))
+
 
 class ClientManager:
     _instances: dict[str, Any] = {"db": None, "ref_count": 0}
@@ -1368,6 +1556,30 @@ class ClientManager:
                     config.get("postgres", "ivfflat_lists", fallback="100"),
                 )
             ),
+            "hnsw_ef_search": os.environ.get(
+                "POSTGRES_HNSW_EF_SEARCH",
+                config.get("postgres", "hnsw_ef_search", fallback=None),
+            ),
+            "ivfflat_probes": os.environ.get(
+                "POSTGRES_IVFFLAT_PROBES",
+                config.get("postgres", "ivfflat_probes", fallback=None),
+            ),
+            "iterative_scan": os.environ.get(
+                "POSTGRES_ITERATIVE_SCAN",
+                config.get("postgres", "iterative_scan", fallback=None),
+            ),
+            "statement_cache_size": int(
+                os.environ.get(
+                    "POSTGRES_STATEMENT_CACHE_SIZE",
+                    config.get("postgres", "statement_cache_size", fallback="256"),
+                )
+            ),
+            "upsert_batch_size": int(
+                os.environ.get(
+                    "POSTGRES_UPSERT_BATCH_SIZE",
+                    config.get("postgres", "upsert_batch_size", fallback="500"),
+                )
+            ),
         }
 
     @classmethod
@@ -1404,6 +1616,7 @@ class PGKVStorage(BaseKVStorage):
 
     def __post_init__(self):
         self._max_batch_size = self.global_config["embedding_batch_num"]
+        self._id_reader = ReadCoalescer(self._get_by_ids_map)
 
     async def initialize(self):
         async with get_data_init_lock():
@@ -1536,89 +1749,20 @@ class PGKVStorage(BaseKVStorage):
             return {}
 
     async def get_by_id(self, id: str) -> dict[str, Any] | None:
-        """Get data by id."""
-        sql = SQL_TEMPLATES["get_by_id_" + self.namespace]
-        params = {"workspace": self.workspace, "id": id}
-        response = await self.db.query(sql, list(params.values()))
-
-        if response and is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
-            # Parse llm_cache_list JSON string back to list
-            llm_cache_list = response.get("llm_cache_list", [])
-            if isinstance(llm_cache_list, str):
-                try:
-                    llm_cache_list = json.loads(llm_cache_list)
-                except json.JSONDecodeError:
-                    llm_cache_list = []
-            response["llm_cache_list"] = llm_cache_list
-            create_time = response.get("create_time", 0)
-            update_time = response.get("update_time", 0)
-            response["create_time"] = create_time
-            response["update_time"] = create_time if update_time == 0 else update_time
-
-        # Special handling for LLM cache to ensure compatibility with _get_cached_extraction_results
-        if response and is_namespace(
-            self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE
-        ):
-            create_time = response.get("create_time", 0)
-            update_time = response.get("update_time", 0)
-            # Parse queryparam JSON string back to dict
-            queryparam = response.get("queryparam")
-            if isinstance(queryparam, str):
-                try:
-                    queryparam = json.loads(queryparam)
-                except json.JSONDecodeError:
-                    queryparam = None
-            # Map field names for compatibility (mode field removed)
-            response = {
-                **response,
-                "return": response.get("return_value", ""),
-                "cache_type": response.get("cache_type"),
-                "original_prompt": response.get("original_prompt", ""),
-                "chunk_id": response.get("chunk_id"),
-                "queryparam": queryparam,
-                "create_time": create_time,
-                "update_time": create_time if update_time == 0 else update_time,
-            }
+        """Get data by id.
 
-        # Special handling for FULL_ENTITIES namespace
-        if response and is_namespace(self.namespace, NameSpace.KV_STORE_FULL_ENTITIES):
-            # Parse entity_names JSON string back to list
-            entity_names = response.get("entity_names", [])
-            if isinstance(entity_names, str):
-                try:
-                    entity_names = json.loads(entity_names)
-                except json.JSONDecodeError:
-                    entity_names = []
-            response["entity_names"] = entity_names
-            create_time = response.get("create_time", 0)
-            update_time = response.get("update_time", 0)
-            response["create_time"] = create_time
-            response["update_time"] = create_time if update_time == 0 else update_time
-
-        # Special handling for FULL_RELATIONS namespace
-        if response and is_namespace(self.namespace, NameSpace.KV_STORE_FULL_RELATIONS):
-            # Parse relation_pairs JSON string back to list
-            relation_pairs = response.get("relation_pairs", [])
-            if isinstance(relation_pairs, str):
-                try:
-                    relation_pairs = json.loads(relation_pairs)
-                except json.JSONDecodeError:
-                    relation_pairs = []
-            response["relation_pairs"] = relation_pairs
-            create_time = response.get("create_time", 0)
-            update_time = response.get("update_time", 0)
-            response["create_time"] = create_time
-            response["update_time"] = create_time if update_time == 0 else update_time
+        Concurrent calls are merged into a single get_by_ids query.
+        """
+        return await self._id_reader.get(id)
 
-        return response if response else None
+    async def _get_by_ids_map(self, ids: list[str]) -> dict[str, dict[str, Any]]:
+        return {row["id"]: row for row in await self.get_by_ids(ids)}
 
     # Query by id
     async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
         """Get data by ids"""
-        sql = SQL_TEMPLATES["get_by_ids_" + self.namespace].format(
-            ids=",".join([f"'{id}'" for id in ids])
-        )
-        params = {"workspace": self.workspace}
+        sql = SQL_TEMPLATES["get_by_ids_" + self.namespace]
+        params = {"workspace": self.workspace, "ids": ids}
         results = await self.db.query(sql, list(params.values()), multirows=True)
 
         if results and is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
@@ -1702,10 +1846,9 @@ class PGKVStorage(BaseKVStorage):
     async def filter_keys(self, keys: set[str]) -> set[str]:
         """Filter out duplicated content"""
         sql = SQL_TEMPLATES["filter_keys"].format(
-            table_name=namespace_to_table_name(self.namespace),
-            ids=",".join([f"'{id}'" for id in keys]),
+            table_name=namespace_to_table_name(self.namespace)
         )
-        params = {"workspace": self.workspace}
+        params = {"workspace": self.workspace, "ids": list(keys)}
         try:
             res = await self.db.query(sql, list(params.values()), multirows=True)
             if res:
@@ -1726,11 +1869,12 @@ class PGKVStorage(BaseKVStorage):
         if not data:
             return
 
+        rows: list[dict[str, Any]] = []
         if is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
             # Get current UTC time and convert to naive datetime for database storage
             current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+            upsert_sql = SQL_TEMPLATES["upsert_text_chunk"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_text_chunk"]
                 _data = {
                     "workspace": self.workspace,
                     "id": k,
@@ -1743,19 +1887,19 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
         elif is_namespace(self.namespace, NameSpace.KV_STORE_FULL_DOCS):
+            upsert_sql = SQL_TEMPLATES["upsert_doc_full"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_doc_full"]
                 _data = {
                     "id": k,
                     "content": v["content"],
                     "workspace": self.workspace,
                 }
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
         elif is_namespace(self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE):
+            upsert_sql = SQL_TEMPLATES["upsert_llm_response_cache"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_llm_response_cache"]
                 _data = {
                     "workspace": self.workspace,
                     "id": k,  # Use flattened key as id
@@ -1769,13 +1913,12 @@ class PGKVStorage(BaseKVStorage):
                     if v.get("queryparam")
                     else None,
                 }
-
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
         elif is_namespace(self.namespace, NameSpace.KV_STORE_FULL_ENTITIES):
             # Get current UTC time and convert to naive datetime for database storage
             current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+            upsert_sql = SQL_TEMPLATES["upsert_full_entities"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_full_entities"]
                 _data = {
                     "workspace": self.workspace,
                     "id": k,
@@ -1784,12 +1927,12 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
         elif is_namespace(self.namespace, NameSpace.KV_STORE_FULL_RELATIONS):
             # Get current UTC time and convert to naive datetime for database storage
             current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+            upsert_sql = SQL_TEMPLATES["upsert_full_relations"]
             for k, v in data.items():
-                upsert_sql = SQL_TEMPLATES["upsert_full_relations"]
                 _data = {
                     "workspace": self.workspace,
                     "id": k,
@@ -1798,7 +1941,10 @@ class PGKVStorage(BaseKVStorage):
                     "create_time": current_time,
                     "update_time": current_time,
                 }
-                await self.db.execute(upsert_sql, _data)
+                rows.append(_data)
+
+        if rows:
+            await self.db.executemany(upsert_sql, rows)
 
     async def index_done_callback(self) -> None:
         # PG handles persistence automatically
@@ -1870,6 +2016,14 @@ class PGVectorStorage(BaseVectorStorage):
             )
         self.cosine_better_than_threshold = cosine_threshold
 
+        # Optional per-namespace vector index settings, e.g.
+        # {"entities": {"type": "HNSW", "m": 32, "ef_construction": 128}}
+        index_config = config.get("vector_index", {})
+        self._vector_index_config: dict[str, Any] = next(
+            (v for k, v in index_config.items() if is_namespace(self.namespace, k)),
+            {},
+        )
+
     async def initialize(self):
         async with get_data_init_lock():
             if self.db is None:
@@ -1886,12 +2040,81 @@ class PGVectorStorage(BaseVectorStorage):
                 # Use "default" for compatibility (lowest priority)
                 self.workspace = "default"
 
+            if self._vector_index_config:
+                await self.db.ensure_vector_index(
+                    namespace_to_table_name(self.namespace),
+                    self._vector_index_config.get("type"),
+                    self._vector_index_config,
+                )
+
     async def finalize(self):
         async with get_storage_lock():
             if self.db is not None:
                 await ClientManager.release_client(self.db)
                 self.db = None
 
+    def _search_settings(self, query_param: QueryParam | None) -> dict[str, Any]:
+        """pgvector settings applied to the transaction of a vector search"""
+        index_type = self._vector_index_config.get("type", self.db.vector_index_type)
+        prefix = "ivfflat" if (index_type or "").upper() == "IVFFLAT" else "hnsw"
+        settings = {}
+        if prefix == "ivfflat":
+            probes = query_param.ivfflat_probes if query_param else None
+            probes = probes or self.db.ivfflat_probes
+            if probes:
+                settings["ivfflat.probes"] = probes
+        else:
+            ef_search = query_param.hnsw_ef_search if query_param else None
+            ef_search = ef_search or self.db.hnsw_ef_search
+            if ef_search:
+                settings["hnsw.ef_search"] = ef_search
+        # Keep scanning the index until enough rows pass the metadata filter
+        if query_param and query_param.metadata_filter and self.db.iterative_scan:
+            settings[f"{prefix}.iterative_scan"] = self.db.iterative_scan
+        return settings
+
+    def _metadata_filter_sql(
+        self, query_param: QueryParam | None, params: list[Any]
+    ) -> str:
+        """WHERE conditions of a metadata filter, appending their values to params"""
+        conditions = metadata_filter_conditions(
+            query_param.metadata_filter if query_param else None
+        )
+        columns = VECTOR_FILTER_COLUMNS[self.namespace]
+        sql = ""
+        for name, op, value in conditions:
+            column = columns.get(name)
+            if column is None:
+                raise ValueError(
+                    f"Metadata filter field '{name}' is not supported for {self.namespace}, "
+                    f"use one of: {', '.join(columns)}"
+                )
+            params.append(value)
+            if name in METADATA_FILTER_MULTI_VALUE_FIELDS and op in ("eq", "in"):
+                # Match any one of the joined values
+                values = f"string_to_array({column}, '{GRAPH_FIELD_SEP}')"
+                if op == "in":
+                    sql += f" AND {values} && ${len(params)}::text[]"
+                else:
+                    sql += f" AND ${len(params)}::text = ANY({values})"
+            elif op == "in":
+                sql += f" AND {column} = ANY(${len(params)})"
+            else:
+                sql += f" AND {column} {SQL_COMPARISON_OPS[op]} ${len(params)}"
+        return sql
+
+    async def rebuild_vector_index(self) -> None:
+        """Rebuild the vector index of this namespace concurrently
+
+        Call it after bulk ingestion, or after changing the index build parameters;
+        queries and writes keep working while the new index is built.
+        """
+        await self.db.rebuild_vector_index(
+            namespace_to_table_name(self.namespace),
+            self._vector_index_config.get("type"),
+            self._vector_index_config,
+        )
+
     def _upsert_chunks(
         self, item: dict[str, Any], current_time: datetime.datetime
     ) -> tuple[str, dict[str, Any]]:
@@ -1990,6 +2213,7 @@ class PGVectorStorage(BaseVectorStorage):
         embeddings = np.concatenate(embeddings_list)
         for i, d in enumerate(list_data):
             d["__vector__"] = embeddings[i]
+        rows = []
         for item in list_data:
             if is_namespace(self.namespace, NameSpace.VECTOR_STORE_CHUNKS):
                 upsert_sql, data = self._upsert_chunks(item, current_time)
@@ -1999,12 +2223,17 @@ class PGVectorStorage(BaseVectorStorage):
                 upsert_sql, data = self._upsert_relationships(item, current_time)
             else:
                 raise ValueError(f"{self.namespace} is not supported")
+            rows.append(data)
 
-            await self.db.execute(upsert_sql, data)
+        await self.db.executemany(upsert_sql, rows)
 
     #################### query method ###############
     async def query(
-        self, query: str, top_k: int, query_embedding: list[float] = None
+        self,
+        query: str,
+        top_k: int,
+        query_embedding: list[float] = None,
+        query_param: QueryParam | None = None,
     ) -> list[dict[str, Any]]:
         if query_embedding is not None:
             embedding = query_embedding
@@ -2014,15 +2243,24 @@ class PGVectorStorage(BaseVectorStorage):
             )  # higher priority for query
             embedding = embeddings[0]
 
-        embedding_string = ",".join(map(str, embedding))
+        embedding_string = f"[{','.join(map(str, embedding))}]"
 
-        sql = SQL_TEMPLATES[self.namespace].format(embedding_string=embedding_string)
         params = {
             "workspace": self.workspace,
             "closer_than_threshold": 1 - self.cosine_better_than_threshold,
             "top_k": top_k,
+            "embedding": embedding_string,
         }
-        results = await self.db.query(sql, params=list(params.values()), multirows=True)
+        params = list(params.values())
+        sql = SQL_TEMPLATES[self.namespace].format(
+            metadata_filter=self._metadata_filter_sql(query_param, params)
+        )
+        results = await self.db.query(
+            sql,
+            params=params,
+            multirows=True,
+            settings=self._search_settings(query_param),
+        )
         return results
 
     async def index_done_callback(self) -> None:
@@ -2148,9 +2386,8 @@ class PGVectorStorage(BaseVectorStorage):
             )
             return []
 
-        ids_str = ",".join([f"'{id}'" for id in ids])
-        query = f"SELECT *, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at FROM {table_name} WHERE workspace=$1 AND id IN ({ids_str})"
-        params = {"workspace": self.workspace}
+        query = f"SELECT *, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at FROM {table_name} WHERE workspace=$1 AND id = ANY($2)"
+        params = {"workspace": self.workspace, "ids": ids}
 
         try:
             results = await self.db.query(query, list(params.values()), multirows=True)
@@ -2161,6 +2398,49 @@ class PGVectorStorage(BaseVectorStorage):
             )
             return []
 
+    async def get_fields_by_id(
+        self, id: str, fields: list[str]
+    ) -> dict[str, Any] | None:
+        """Get selected metadata fields of a vector record without its vector
+
+        source_id of entities and relations is read from their chunk_ids column.
+        """
+        table_name = namespace_to_table_name(self.namespace)
+        if not table_name:
+            logger.error(
+                f"[{self.workspace}] Unknown namespace for ID lookup: {self.namespace}"
+            )
+            return None
+
+        split_source_id = "source_id" in fields and (
+            is_namespace(self.namespace, NameSpace.VECTOR_STORE_ENTITIES)
+            or is_namespace(self.namespace, NameSpace.VECTOR_STORE_RELATIONSHIPS)
+        )
+        columns = []
+        for name in fields:
+            if not name.isidentifier():
+                raise ValueError(f"Invalid field name: {name}")
+            columns.append(
+                "chunk_ids AS source_id"
+                if name == "source_id" and split_source_id
+                else name
+            )
+        query = f"SELECT {', '.join(columns)} FROM {table_name} WHERE workspace=$1 AND id=$2"
+
+        try:
+            result = await self.db.query(query, [self.workspace, id])
+        except Exception as e:
+            logger.error(
+                f"[{self.workspace}] Error retrieving vector fields for ID {id}: {e}"
+            )
+            return None
+        if not result:
+            return None
+        record = dict(result)
+        if split_source_id and record.get("source_id") is not None:
+            record["source_id"] = GRAPH_FIELD_SEP.join(record["source_id"])
+        return record
+
     async def get_vectors_by_ids(self, ids: list[str]) -> dict[str, list[float]]:
         """Get vectors by their IDs, returning only ID and vector data for efficiency
 
@@ -2181,9 +2461,8 @@ class PGVectorStorage(BaseVectorStorage):
             )
             return {}
 
-        ids_str = ",".join([f"'{id}'" for id in ids])
-        query = f"SELECT id, content_vector FROM {table_name} WHERE workspace=$1 AND id IN ({ids_str})"
-        params = {"workspace": self.workspace}
+        query = f"SELECT id, content_vector FROM {table_name} WHERE workspace=$1 AND id = ANY($2)"
+        params = {"workspace": self.workspace, "ids": ids}
 
         try:
             results = await self.db.query(query, list(params.values()), multirows=True)
@@ -2268,10 +2547,9 @@ class PGDocStatusStorage(DocStatusStorage):
     async def filter_keys(self, keys: set[str]) -> set[str]:
         """Filter out duplicated content"""
         sql = SQL_TEMPLATES["filter_keys"].format(
-            table_name=namespace_to_table_name(self.namespace),
-            ids=",".join([f"'{id}'" for id in keys]),
+            table_name=namespace_to_table_name(self.namespace)
         )
-        params = {"workspace": self.workspace}
+        params = {"workspace": self.workspace, "ids": list(keys)}
         try:
             res = await self.db.query(sql, list(params.values()), multirows=True)
             if res:
@@ -2777,14 +3055,14 @@ class PGDocStatusStorage(DocStatusStorage):
                   error_msg = EXCLUDED.error_msg,
                   created_at = EXCLUDED.created_at,
                   updated_at = EXCLUDED.updated_at"""
+        rows = []
         for k, v in data.items():
             # Remove timezone information, store utc time in db
             created_at = parse_datetime(v.get("created_at"))
             updated_at = parse_datetime(v.get("updated_at"))
 
             # chunks_count, chunks_list, track_id, metadata, and error_msg are optional
-            await self.db.execute(
-                sql,
+            rows.append(
                 {
                     "workspace": self.workspace,
                     "id": k,
@@ -2801,9 +3079,11 @@ class PGDocStatusStorage(DocStatusStorage):
                     "error_msg": v.get("error_msg"),  # Add error_msg support
                     "created_at": created_at,  # Use the converted datetime object
                     "updated_at": updated_at,  # Use the converted datetime object
-                },
+                }
             )
 
+        await self.db.executemany(sql, rows)
+
     async def drop(self) -> dict[str, str]:
         """Drop the storage"""
         async with get_storage_lock():
@@ -4438,6 +4718,38 @@ class PGGraphStorage(BaseGraphStorage):
 
 # Note: Order matters! More specific namespaces (e.g., "full_entities") must come before
 # more general ones (e.g., "entities") because is_namespace() uses endswith() matching
+VECTOR_TABLES = [
+    "LIGHTRAG_VDB_CHUNKS",
+    "LIGHTRAG_VDB_ENTITY",
+    "LIGHTRAG_VDB_RELATION",
+]
+
+# Metadata filter fields of each vector namespace and the columns they compare
+VECTOR_FILTER_COLUMNS = {
+    "entities": {
+        "id": "e.id",
+        "entity_name": "e.entity_name",
+        "file_path": "e.file_path",
+        "created_at": "EXTRACT(EPOCH FROM e.create_time)",
+    },
+    "relationships": {
+        "id": "r.id",
+        "src_id": "r.source_id",
+        "tgt_id": "r.target_id",
+        "file_path": "r.file_path",
+        "created_at": "EXTRACT(EPOCH FROM r.create_time)",
+    },
+    "chunks": {
+        "id": "c.id",
+        "full_doc_id": "c.full_doc_id",
+        "chunk_order_index": "c.chunk_order_index",
+        "file_path": "c.file_path",
+        "created_at": "EXTRACT(EPOCH FROM c.create_time)",
+    },
+}
+
+SQL_COMPARISON_OPS = {"eq": "=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
 NAMESPACE_TABLE_MAP = {
     NameSpace.KV_STORE_FULL_DOCS: "LIGHTRAG_DOC_FULL",
     NameSpace.KV_STORE_TEXT_CHUNKS: "LIGHTRAG_DOC_CHUNKS",
@@ -4588,57 +4900,32 @@ TABLES = {
 
 SQL_TEMPLATES = {
     # SQL for KVStorage
-    "get_by_id_full_docs": """SELECT id, COALESCE(content, '') as content
-                                FROM LIGHTRAG_DOC_FULL WHERE workspace=$1 AND id=$2
-                            """,
-    "get_by_id_text_chunks": """SELECT id, tokens, COALESCE(content, '') as content,
-                                chunk_order_index, full_doc_id, file_path,
-                                COALESCE(llm_cache_list, '[]'::jsonb) as llm_cache_list,
-                                EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
-                                EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
-                                FROM LIGHTRAG_DOC_CHUNKS WHERE workspace=$1 AND id=$2
-                            """,
-    "get_by_id_llm_response_cache": """SELECT id, original_prompt, return_value, chunk_id, cache_type, queryparam,
-                                EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
-                                EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
-                                FROM LIGHTRAG_LLM_CACHE WHERE workspace=$1 AND id=$2
-                               """,
     "get_by_ids_full_docs": """SELECT id, COALESCE(content, '') as content
-                                 FROM LIGHTRAG_DOC_FULL WHERE workspace=$1 AND id IN ({ids})
+                                 FROM LIGHTRAG_DOC_FULL WHERE workspace=$1 AND id = ANY($2)
                             """,
     "get_by_ids_text_chunks": """SELECT id, tokens, COALESCE(content, '') as content,
                                   chunk_order_index, full_doc_id, file_path,
                                   COALESCE(llm_cache_list, '[]'::jsonb) as llm_cache_list,
                                   EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
                                   EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
-                                   FROM LIGHTRAG_DOC_CHUNKS WHERE workspace=$1 AND id IN ({ids})
+                                   FROM LIGHTRAG_DOC_CHUNKS WHERE workspace=$1 AND id = ANY($2)
                                 """,
     "get_by_ids_llm_response_cache": """SELECT id, original_prompt, return_value, chunk_id, cache_type, queryparam,
                                  EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
                                  EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
-                                 FROM LIGHTRAG_LLM_CACHE WHERE workspace=$1 AND id IN ({ids})
+                                 FROM LIGHTRAG_LLM_CACHE WHERE workspace=$1 AND id = ANY($2)
                                 """,
-    "get_by_id_full_entities": """SELECT id, entity_names, count,
-                                EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
-                                EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
-                                FROM LIGHTRAG_FULL_ENTITIES WHERE workspace=$1 AND id=$2
-                               """,
-    "get_by_id_full_relations": """SELECT id, relation_pairs, count,
-                                EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
-                                EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
-                                FROM LIGHTRAG_FULL_RELATIONS WHERE workspace=$1 AND id=$2
-                               """,
     "get_by_ids_full_entities": """SELECT id, entity_names, count,
                                  EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
                                  EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
-                                 FROM LIGHTRAG_FULL_ENTITIES WHERE workspace=$1 AND id IN ({ids})
+                                 FROM LIGHTRAG_FULL_ENTITIES WHERE workspace=$1 AND id = ANY($2)
                                 """,
     "get_by_ids_full_relations": """SELECT id, relation_pairs, count,
                                  EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
                                  EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
-                                 FROM LIGHTRAG_FULL_RELATIONS WHERE workspace=$1 AND id IN ({ids})
+                                 FROM LIGHTRAG_FULL_RELATIONS WHERE workspace=$1 AND id = ANY($2)
                                 """,
-    "filter_keys": "SELECT id FROM {table_name} WHERE workspace=$1 AND id IN ({ids})",
+    "filter_keys": "SELECT id FROM {table_name} WHERE workspace=$1 AND id = ANY($2)",
     "upsert_doc_full": """INSERT INTO LIGHTRAG_DOC_FULL (id, content, workspace)
                         VALUES ($1, $2, $3)
                         ON CONFLICT (workspace,id) DO UPDATE
@@ -4725,18 +5012,18 @@ SQL_TEMPLATES = {
                             r.target_id AS tgt_id,
                             EXTRACT(EPOCH FROM r.create_time)::BIGINT AS created_at
                      FROM LIGHTRAG_VDB_RELATION r
-                     WHERE r.workspace = $1
-                       AND r.content_vector <=> '[{embedding_string}]'::vector < $2
-                     ORDER BY r.content_vector <=> '[{embedding_string}]'::vector
+                     WHERE r.workspace = $1{metadata_filter}
+                       AND r.content_vector <=> $4::vector < $2
+                     ORDER BY r.content_vector <=> $4::vector
                      LIMIT $3;
                      """,
     "entities": """
                 SELECT e.entity_name,
                        EXTRACT(EPOCH FROM e.create_time)::BIGINT AS created_at
                 FROM LIGHTRAG_VDB_ENTITY e
-                WHERE e.workspace = $1
-                  AND e.content_vector <=> '[{embedding_string}]'::vector < $2
-                ORDER BY e.content_vector <=> '[{embedding_string}]'::vector
+                WHERE e.workspace = $1{metadata_filter}
+                  AND e.content_vector <=> $4::vector < $2
+                ORDER BY e.content_vector <=> $4::vector
                 LIMIT $3;
                 """,
     "chunks": """
@@ -4745,9 +5032,9 @@ SQL_TEMPLATES = {
                      c.file_path,
                      EXTRACT(EPOCH FROM c.create_time)::BIGINT AS created_at
               FROM LIGHTRAG_VDB_CHUNKS c
-              WHERE c.workspace = $1
-                AND c.content_vector <=> '[{embedding_string}]'::vector < $2
-              ORDER BY c.content_vector <=> '[{embedding_string}]'::vector
+              WHERE c.workspace = $1{metadata_filter}
+                AND c.content_vector <=> $4::vector < $2
+              ORDER BY c.content_vector <=> $4::vector
               LIMIT $3;
               """,
     # DROP tables
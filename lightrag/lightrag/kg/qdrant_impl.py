@@ -5,8 +5,15 @@ from dataclasses import dataclass
 import numpy as np
 import hashlib
 import uuid
-from ..utils import logger
-from ..base import BaseVectorStorage
+from ..utils import (
+    logger,
+    metadata_filter_conditions,
+    match_metadata_filter,
+    multi_value_conditions,
+    METADATA_FILTER_MULTI_VALUE_FIELDS,
+)
+from ..constants import GRAPH_FIELD_SEP
+from ..base import BaseVectorStorage, QueryParam
 from ..kg.shared_storage import get_data_init_lock, get_storage_lock
 import configparser
 import pipmaster as pm
@@ -48,6 +55,45 @@ def compute_mdhash_id_for_qdrant(
         raise ValueError("Invalid style. Choose from 'simple', 'hyphenated', or 'urn'.")
 
 
+def build_payload_filter(
+    conditions: list[tuple[str, str, Any]],
+) -> models.Filter | None:
+    """Translate metadata filter conditions into a Qdrant payload filter"""
+    if not conditions:
+        return None
+    must = []
+    ranges: dict[str, dict[str, Any]] = {}
+    for name, op, value in conditions:
+        if name in METADATA_FILTER_MULTI_VALUE_FIELDS and op in ("eq", "in"):
+            # Exact value, or a substring bounded by GRAPH_FIELD_SEP (substring match
+            # without a full-text index); results are checked again afterwards
+            values = [str(v) for v in (value if op == "in" else [value])]
+            should = [
+                models.FieldCondition(key=name, match=models.MatchAny(any=values))
+            ]
+            for v in values:
+                for text in (f"{v}{GRAPH_FIELD_SEP}", f"{GRAPH_FIELD_SEP}{v}"):
+                    should.append(
+                        models.FieldCondition(
+                            key=name, match=models.MatchText(text=text)
+                        )
+                    )
+            must.append(models.Filter(should=should))
+        elif op == "eq":
+            must.append(
+                models.FieldCondition(key=name, match=models.MatchValue(value=value))
+            )
+        elif op == "in":
+            must.append(
+                models.FieldCondition(key=name, match=models.MatchAny(any=value))
+            )
+        else:
+            ranges.setdefault(name, {})[op] = value
+    for name, bounds in ranges.items():
+        must.append(models.FieldCondition(key=name, range=models.Range(**bounds)))
+    return models.Filter(must=must)
+
+
 @final
 @dataclass
 class QdrantVectorDBStorage(BaseVectorStorage):
@@ -158,6 +204,7 @@ class QdrantVectorDBStorage(BaseVectorStorage):
                         distance=models.Distance.COSINE,
                     ),
                 )
+                self._create_payload_indexes()
                 self._initialized = True
                 logger.info(
                     f"[{self.workspace}] Qdrant collection '{self.namespace}' initialized successfully"
@@ -168,6 +215,30 @@ class QdrantVectorDBStorage(BaseVectorStorage):
                 )
                 raise
 
+    def _create_payload_indexes(self):
+        """Index the payload fields used by metadata filters
+
+        With a payload index Qdrant filters while traversing the HNSW graph instead
+        of scanning candidates. Creating an existing index is a no-op.
+        """
+        fields = {
+            "file_path": models.PayloadSchemaType.KEYWORD,
+            "created_at": models.PayloadSchemaType.INTEGER,
+        }
+        if "full_doc_id" in self.meta_fields:
+            fields["full_doc_id"] = models.PayloadSchemaType.KEYWORD
+        for field_name, schema in fields.items():
+            try:
+                self._client.create_payload_index(
+                    collection_name=self.final_namespace,
+                    field_name=field_name,
+                    field_schema=schema,
+                )
+            except Exception as e:
+                logger.warning(
+                    f"[{self.workspace}] Failed to create payload index '{field_name}' for {self.namespace}: {e}"
+                )
+
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
         logger.debug(f"[{self.workspace}] Inserting {len(data)} to {self.namespace}")
         if not data:
@@ -212,33 +283,69 @@ class QdrantVectorDBStorage(BaseVectorStorage):
         return results
 
     async def query(
-        self, query: str, top_k: int, query_embedding: list[float] = None
+        self,
+        query: str,
+        top_k: int,
+        query_embedding: list[float] = None,
+        query_param: QueryParam | None = None,
     ) -> list[dict[str, Any]]:
-        if query_embedding is not None:
-            embedding = query_embedding
-        else:
-            embedding_result = await self.embedding_func(
-                [query], _priority=5
+        results = await self.query_many(
+            [query],
+            top_k,
+            query_embeddings=None if query_embedding is None else [query_embedding],
+            query_param=query_param,
+        )
+        return results[0]
+
+    async def query_many(
+        self,
+        queries: list[str],
+        top_k: int,
+        query_embeddings: list[list[float]] | None = None,
+        query_param: QueryParam | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        if not queries:
+            return []
+
+        if query_embeddings is None:
+            query_embeddings = await self.embedding_func(
+                queries, _priority=5
             )  # higher priority for query
-            embedding = embedding_result[0]
 
-        results = self._client.search(
+        conditions = metadata_filter_conditions(
+            query_param.metadata_filter if query_param else None
+        )
+        query_filter = build_payload_filter(conditions)
+        recheck = multi_value_conditions(conditions)
+
+        # All queries share one search_batch request
+        results = self._client.search_batch(
             collection_name=self.final_namespace,
-            query_vector=embedding,
-            limit=top_k,
-            with_payload=True,
-            score_threshold=self.cosine_better_than_threshold,
+            requests=[
+                models.SearchRequest(
+                    vector=[float(x) for x in embedding],
+                    filter=query_filter,
+                    limit=top_k,
+                    with_payload=True,
+                    score_threshold=self.cosine_better_than_threshold,
+                )
+                for embedding in query_embeddings
+            ],
         )
 
         # logger.debug(f"[{self.workspace}] query result: {results}")
 
         return [
-            {
-                **dp.payload,
-                "distance": dp.score,
-                "created_at": dp.payload.get("created_at"),
-            }
-            for dp in results
+            [
+                {
+                    **dp.payload,
+                    "distance": dp.score,
+                    "created_at": dp.payload.get("created_at"),
+                }
+                for dp in hits
+                if match_metadata_filter(dp.payload, recheck)
+            ]
+            for hits in results
         ]
 
     async def index_done_callback(self) -> None:
@@ -1,6 +1,8 @@
 import os
+import asyncio
 import logging
-from typing import Any, final, Union
+from collections import OrderedDict
+from typing import Any, Iterator, final, Union
 from dataclasses import dataclass
 import pipmaster as pm
 import configparser
@@ -9,6 +11,10 @@ import threading
 
 if not pm.is_installed("redis"):
     pm.install("redis")
+if not pm.is_installed("orjson"):
+    pm.install("orjson")
+
+import orjson
 
 # aioredis is a depricated library, replaced with redis
 from redis.asyncio import Redis, ConnectionPool  # type: ignore
@@ -41,6 +47,15 @@ MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "200"))
 SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "30.0"))
 SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "10.0"))
 RETRY_ATTEMPTS = int(os.getenv("REDIS_RETRY_ATTEMPTS", "3"))
+# Keys sent per MGET/MSET/DEL command by batch operations
+BATCH_SIZE = int(os.getenv("REDIS_BATCH_SIZE", "1000"))
+# Namespaces cached in process with server-assisted invalidation (Redis 6+)
+CLIENT_CACHE_NAMESPACES = {
+    ns.strip()
+    for ns in os.getenv("REDIS_CLIENT_CACHE_NAMESPACES", "").split(",")
+    if ns.strip()
+}
+CLIENT_CACHE_SIZE = int(os.getenv("REDIS_CLIENT_CACHE_SIZE", "10000"))
 
 # Tenacity retry decorator for Redis operations
 redis_retry = retry(
@@ -55,6 +70,155 @@ redis_retry = retry(
 )
 
 
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(
+        value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+def _chunks(items: list, size: int = BATCH_SIZE) -> Iterator[list]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class RedisClientCache:
+    """In-process cache of raw values under one key prefix, invalidated by Redis
+
+    Client tracking in broadcasting mode makes the server publish every key written
+    under the prefix, by any client, on __redis__:invalidate. A dedicated listener
+    connection receives those messages and evicts the keys, so cached values never
+    outlive a write for longer than the invalidation message takes to arrive.
+    Requires Redis 6 or later; on any listener failure the cache is cleared and
+    disabled so reads fall back to Redis.
+    """
+
+    def __init__(self, pool: ConnectionPool, prefix: str, max_size: int):
+        self._pool = pool
+        self._prefix = prefix
+        self._max_size = max_size
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        # Incremented on every invalidation, values read before it changed are dropped
+        self._epoch = 0
+        self._active = False
+        self._listener = None
+        self._tracker = None
+        self._listener_task: asyncio.Task | None = None
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def _make_connection(self):
+        # Invalidation messages may be hours apart, reads must not time out
+        return self._pool.connection_class(
+            **{**self._pool.connection_kwargs, "socket_timeout": None}
+        )
+
+    async def start(self) -> bool:
+        """Enable tracking and start listening, returns False when unsupported"""
+        try:
+            self._listener = self._make_connection()
+            await self._listener.connect()
+            await self._listener.send_command("CLIENT", "ID")
+            client_id = await self._listener.read_response()
+            await self._listener.send_command("SUBSCRIBE", "__redis__:invalidate")
+            await self._listener.read_response()
+
+            # Tracking lasts as long as the connection that enabled it
+            self._tracker = self._make_connection()
+            await self._tracker.connect()
+            await self._tracker.send_command(
+                "CLIENT",
+                "TRACKING",
+                "ON",
+                "REDIRECT",
+                client_id,
+                "BCAST",
+                "PREFIX",
+                self._prefix,
+            )
+            await self._tracker.read_response()
+        except Exception as e:
+            logger.warning(
+                f"Redis client-side cache disabled for prefix {self._prefix}: {e}"
+            )
+            await self.close()
+            return False
+
+        self._active = True
+        self._listener_task = asyncio.create_task(self._listen())
+        return True
+
+    async def _listen(self) -> None:
+        try:
+            while True:
+                message = await self._listener.read_response()
+                if not isinstance(message, list) or len(message) < 3:
+                    continue
+                if message[0] != "message":
+                    continue
+                self._epoch += 1
+                keys = message[2]
+                if keys is None:
+                    # Server flushed its tracking table, e.g. after FLUSHALL
+                    self._entries.clear()
+                else:
+                    for key in keys:
+                        self._entries.pop(key, None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(
+                f"Redis client-side cache invalidation stopped for prefix {self._prefix}: {e}"
+            )
+        self._active = False
+        self._entries.clear()
+
+    def get(self, key: str) -> str | None:
+        if not self._active:
+            return None
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: str, epoch: int) -> None:
+        """Cache a value read from Redis when no invalidation arrived since epoch"""
+        if not self._active or epoch != self._epoch:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, keys: list[str] | None = None) -> None:
+        self._epoch += 1
+        if keys is None:
+            self._entries.clear()
+        else:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    async def close(self) -> None:
+        self._active = False
+        self._entries.clear()
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener_task = None
+        for connection in (self._tracker, self._listener):
+            if connection is not None:
+                try:
+                    await connection.disconnect()
+                except Exception:
+                    pass
+        self._tracker = None
+        self._listener = None
+
+
 class RedisConnectionManager:
     """Shared Redis connection pool manager to avoid creating multiple pools for the same Redis URI"""
 
@@ -161,6 +325,7 @@ class RedisKVStorage(BaseKVStorage):
         )
         self._pool = None
         self._redis = None
+        self._client_cache: RedisClientCache | None = None
         self._initialized = False
 
         try:
@@ -199,6 +364,17 @@ class RedisKVStorage(BaseKVStorage):
                 await self.close()
                 raise
 
+            # Cache read-mostly namespaces in process, kept fresh by Redis invalidation
+            if any(self.namespace.endswith(ns) for ns in CLIENT_CACHE_NAMESPACES):
+                cache = RedisClientCache(
+                    self._pool, f"{self.final_namespace}:", CLIENT_CACHE_SIZE
+                )
+                if await cache.start():
+                    self._client_cache = cache
+                    logger.info(
+                        f"[{self.workspace}] Enabled client-side cache for {self.namespace}"
+                    )
+
             # Migrate legacy cache structure if this is a cache namespace
             if self.namespace.endswith("_cache"):
                 try:
@@ -236,6 +412,10 @@ class RedisKVStorage(BaseKVStorage):
 
     async def close(self):
         """Close the Redis connection and release pool reference to prevent resource leaks."""
+        if getattr(self, "_client_cache", None) is not None:
+            await self._client_cache.close()
+            self._client_cache = None
+
         if hasattr(self, "_redis") and self._redis:
             try:
                 await self._redis.close()
@@ -263,46 +443,56 @@ class RedisKVStorage(BaseKVStorage):
         """Ensure Redis resources are cleaned up when exiting context."""
         await self.close()
 
+    def _decode(self, value: str | None) -> dict[str, Any] | None:
+        if not value:
+            return None
+        data = orjson.loads(value)
+        # Ensure time fields are present, provide default values for old data
+        data.setdefault("create_time", 0)
+        data.setdefault("update_time", 0)
+        return data
+
+    async def _mget(self, keys: list[str]) -> list[str | None]:
+        """Fetch raw values with chunked MGET, serving cached keys locally"""
+        cache = self._client_cache
+        values: list[str | None] = [None] * len(keys)
+        missing = list(range(len(keys)))
+        if cache is not None:
+            missing = []
+            for i, key in enumerate(keys):
+                values[i] = cache.get(key)
+                if values[i] is None:
+                    missing.append(i)
+            if not missing:
+                return values
+            epoch = cache.epoch
+
+        async with self._get_redis_connection() as redis:
+            for chunk in _chunks(missing):
+                results = await redis.mget([keys[i] for i in chunk])
+                for i, value in zip(chunk, results):
+                    values[i] = value
+                    if cache is not None and value is not None:
+                        cache.put(keys[i], value, epoch)
+        return values
+
     @redis_retry
     async def get_by_id(self, id: str) -> dict[str, Any] | None:
-        async with self._get_redis_connection() as redis:
-            try:
-                data = await redis.get(f"{self.final_namespace}:{id}")
-                if data:
-                    result = json.loads(data)
-                    # Ensure time fields are present, provide default values for old data
-                    result.setdefault("create_time", 0)
-                    result.setdefault("update_time", 0)
-                    return result
-                return None
-            except json.JSONDecodeError as e:
-                logger.error(f"[{self.workspace}] JSON decode error for id {id}: {e}")
-                return None
+        try:
+            values = await self._mget([f"{self.final_namespace}:{id}"])
+            return self._decode(values[0])
+        except orjson.JSONDecodeError as e:
+            logger.error(f"[{self.workspace}] JSON decode error for id {id}: {e}")
+            return None
 
     @redis_retry
     async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
-        async with self._get_redis_connection() as redis:
-            try:
-                pipe = redis.pipeline()
-                for id in ids:
-                    pipe.get(f"{self.final_namespace}:{id}")
-                results = await pipe.execute()
-
-                processed_results = []
-                for result in results:
-                    if result:
-                        data = json.loads(result)
-                        # Ensure time fields are present for all documents
-                        data.setdefault("create_time", 0)
-                        data.setdefault("update_time", 0)
-                        processed_results.append(data)
-                    else:
-                        processed_results.append(None)
-
-                return processed_results
-            except json.JSONDecodeError as e:
-                logger.error(f"[{self.workspace}] JSON decode error in batch get: {e}")
-                return [None] * len(ids)
+        try:
+            values = await self._mget([f"{self.final_namespace}:{id}" for id in ids])
+            return [self._decode(value) for value in values]
+        except orjson.JSONDecodeError as e:
+            logger.error(f"[{self.workspace}] JSON decode error in batch get: {e}")
+            return [None] * len(ids)
 
     async def get_all(self) -> dict[str, Any]:
         """Get all data from storage
@@ -318,25 +508,18 @@ class RedisKVStorage(BaseKVStorage):
                 if not keys:
                     return {}
 
-                # Get all values in batch
-                pipe = redis.pipeline()
-                for key in keys:
-                    pipe.get(key)
-                values = await pipe.execute()
-
                 # Build result dictionary
                 result = {}
-                for key, value in zip(keys, values):
-                    if value:
+                for chunk in _chunks(keys):
+                    values = await redis.mget(chunk)
+                    for key, value in zip(chunk, values):
+                        if not value:
+                            continue
                         # Extract the ID part (after namespace:)
                         key_id = key.split(":", 1)[1]
                         try:
-                            data = json.loads(value)
-                            # Ensure time fields are present for all documents
-                            data.setdefault("create_time", 0)
-                            data.setdefault("update_time", 0)
-                            result[key_id] = data
-                        except json.JSONDecodeError as e:
+                            result[key_id] = self._decode(value)
+                        except orjson.JSONDecodeError as e:
                             logger.error(
                                 f"[{self.workspace}] JSON decode error for key {key}: {e}"
                             )
@@ -349,16 +532,22 @@ class RedisKVStorage(BaseKVStorage):
                 )
                 return {}
 
-    async def filter_keys(self, keys: set[str]) -> set[str]:
+    async def _exists(self, keys: list[str]) -> list[bool]:
+        """Check existence of many keys with chunked pipelines"""
+        results = []
         async with self._get_redis_connection() as redis:
-            pipe = redis.pipeline()
-            keys_list = list(keys)  # Convert set to list for indexing
-            for key in keys_list:
-                pipe.exists(f"{self.final_namespace}:{key}")
-            results = await pipe.execute()
+            for chunk in _chunks(keys):
+                pipe = redis.pipeline(transaction=False)
+                for key in chunk:
+                    pipe.exists(key)
+                results.extend(bool(exists) for exists in await pipe.execute())
+        return results
 
-            existing_ids = {keys_list[i] for i, exists in enumerate(results) if exists}
-            return set(keys) - existing_ids
+    async def filter_keys(self, keys: set[str]) -> set[str]:
+        keys_list = list(keys)  # Convert set to list for indexing
+        results = await self._exists([f"{self.final_namespace}:{k}" for k in keys_list])
+        existing_ids = {keys_list[i] for i, exists in enumerate(results) if exists}
+        return set(keys) - existing_ids
 
     @redis_retry
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
@@ -369,39 +558,33 @@ class RedisKVStorage(BaseKVStorage):
 
         current_time = int(time.time())  # Get current Unix timestamp
 
-        async with self._get_redis_connection() as redis:
-            try:
-                # Check which keys already exist to determine create vs update
-                pipe = redis.pipeline()
-                for k in data.keys():
-                    pipe.exists(f"{self.final_namespace}:{k}")
-                exists_results = await pipe.execute()
-
-                # Add timestamps to data
-                for i, (k, v) in enumerate(data.items()):
-                    # For text_chunks namespace, ensure llm_cache_list field exists
-                    if self.namespace.endswith("text_chunks"):
-                        if "llm_cache_list" not in v:
-                            v["llm_cache_list"] = []
-
-                    # Add timestamps based on whether key exists
-                    if exists_results[i]:  # Key exists, only update update_time
-                        v["update_time"] = current_time
-                    else:  # New key, set both create_time and update_time
-                        v["create_time"] = current_time
-                        v["update_time"] = current_time
-
-                    v["_id"] = k
-
-                # Store the data
-                pipe = redis.pipeline()
-                for k, v in data.items():
-                    pipe.set(f"{self.final_namespace}:{k}", json.dumps(v))
-                await pipe.execute()
+        # Check which keys already exist to determine create vs update
+        full_keys = [f"{self.final_namespace}:{k}" for k in data.keys()]
+        exists_results = await self._exists(full_keys)
 
-            except json.JSONDecodeError as e:
-                logger.error(f"[{self.workspace}] JSON decode error during upsert: {e}")
-                raise
+        # Add timestamps to data
+        for i, (k, v) in enumerate(data.items()):
+            # For text_chunks namespace, ensure llm_cache_list field exists
+            if self.namespace.endswith("text_chunks"):
+                if "llm_cache_list" not in v:
+                    v["llm_cache_list"] = []
+
+            # Add timestamps based on whether key exists
+            if exists_results[i]:  # Key exists, only update update_time
+                v["update_time"] = current_time
+            else:  # New key, set both create_time and update_time
+                v["create_time"] = current_time
+                v["update_time"] = current_time
+
+            v["_id"] = k
+
+        # Store the data
+        items = [(key, _dumps(v)) for key, v in zip(full_keys, data.values())]
+        async with self._get_redis_connection() as redis:
+            for chunk in _chunks(items):
+                await redis.mset(dict(chunk))
+        if self._client_cache is not None:
+            self._client_cache.invalidate(full_keys)
 
     async def index_done_callback(self) -> None:
         # Redis handles persistence automatically
@@ -412,16 +595,16 @@ class RedisKVStorage(BaseKVStorage):
         if not ids:
             return
 
+        full_keys = [f"{self.final_namespace}:{id}" for id in ids]
+        deleted_count = 0
         async with self._get_redis_connection() as redis:
-            pipe = redis.pipeline()
-            for id in ids:
-                pipe.delete(f"{self.final_namespace}:{id}")
-
-            results = await pipe.execute()
-            deleted_count = sum(results)
-            logger.info(
-                f"[{self.workspace}] Deleted {deleted_count} of {len(ids)} entries from {self.namespace}"
-            )
+            for chunk in _chunks(full_keys):
+                deleted_count += await redis.delete(*chunk)
+        if self._client_cache is not None:
+            self._client_cache.invalidate(full_keys)
+        logger.info(
+            f"[{self.workspace}] Deleted {deleted_count} of {len(ids)} entries from {self.namespace}"
+        )
 
     async def drop(self) -> dict[str, str]:
         """Drop the storage by removing all keys under the current namespace.
@@ -443,15 +626,13 @@ class RedisKVStorage(BaseKVStorage):
                         )
                         if keys:
                             # Delete keys in batches
-                            pipe = redis.pipeline()
-                            for key in keys:
-                                pipe.delete(key)
-                            results = await pipe.execute()
-                            deleted_count += sum(results)
+                            deleted_count += await redis.delete(*keys)
 
                         if cursor == 0:
                             break
 
+                    if self._client_cache is not None:
+                        self._client_cache.invalidate()
                     logger.info(
                         f"[{self.workspace}] Dropped {deleted_count} keys from {self.namespace}"
                     )
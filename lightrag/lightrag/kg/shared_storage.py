@@ -78,6 +78,7 @@ _initialized = None
 _shared_dicts: Optional[Dict[str, Any]] = None
 _init_flags: Optional[Dict[str, bool]] = None  # namespace -> initialized
 _update_flags: Optional[Dict[str, bool]] = None  # namespace -> updated
+_data_versions: Optional[Dict[str, int]] = None  # namespace -> committed data version
 
 # locks for mutex access
 _storage_lock: Optional[LockType] = None
@@ -987,6 +988,7 @@ def initialize_share_data(workers: int = 1):
         _init_flags, \
         _initialized, \
         _update_flags, \
+        _data_versions, \
         _async_locks, \
         _storage_keyed_lock, \
         _earliest_mp_cleanup_time, \
@@ -1016,6 +1018,7 @@ def initialize_share_data(workers: int = 1):
         _shared_dicts = _manager.dict()
         _init_flags = _manager.dict()
         _update_flags = _manager.dict()
+        _data_versions = _manager.dict()
 
         _storage_keyed_lock = KeyedUnifiedLock()
 
@@ -1041,6 +1044,7 @@ def initialize_share_data(workers: int = 1):
         _shared_dicts = {}
         _init_flags = {}
         _update_flags = {}
+        _data_versions = {}
         _async_locks = None  # No need for async locks in single process mode
 
         _storage_keyed_lock = KeyedUnifiedLock()
@@ -1170,6 +1174,28 @@ async def get_all_update_flags_status() -> Dict[str, list]:
     return result
 
 
+async def get_data_version(namespace: str) -> int:
+    """
+    Get the committed data version of a namespace shared by all workers.
+    Returns 0 if the namespace has never been bumped.
+    """
+    if _data_versions is None:
+        raise ValueError("Try to get data version before Shared-Data is initialized")
+    return _data_versions.get(namespace, 0)
+
+
+async def bump_data_version(namespace: str) -> int:
+    """Increase the data version of a namespace after its data changed, return the new version"""
+    global _data_versions
+    if _data_versions is None:
+        raise ValueError("Try to bump data version before Shared-Data is initialized")
+
+    async with get_internal_lock():
+        version = _data_versions.get(namespace, 0) + 1
+        _data_versions[namespace] = version
+        return version
+
+
 async def try_initialize_namespace(namespace: str) -> bool:
     """
     Returns True if the current worker(process) gets initialization permission for loading data later.
@@ -1250,6 +1276,7 @@ def finalize_share_data():
         _init_flags, \
         _initialized, \
         _update_flags, \
+        _data_versions, \
         _async_locks
 
     # Check if already initialized
@@ -1294,6 +1321,8 @@ def finalize_share_data():
                 except Exception:
                     pass  # Ignore any errors during update flags cleanup
                 _update_flags.clear()
+            if _data_versions is not None:
+                _data_versions.clear()
 
             # Shut down the Manager - this will automatically clean up all shared resources
             _manager.shutdown()
@@ -1315,6 +1344,7 @@ def finalize_share_data():
     _graph_db_lock = None
     _data_init_lock = None
     _update_flags = None
+    _data_versions = None
     _async_locks = None
 
     direct_log(f"Process {os.getpid()} storage data finalization complete")
@@ -0,0 +1,219 @@
+"""
+Vector quantization for the in-process vector storages.
+
+A quantized storage keeps compact codes of its vectors in memory and scores them in
+a first search pass; the best top_k * rerank_factor candidates are then re-scored
+with their float vectors. Two quantizers are available:
+
+- int8: scalar quantization with a per-dimension scale, 4x smaller than float32
+- pq: product quantization with 256 centroids per sub-vector of dim / m dimensions,
+  dim * 4 / m times smaller than float32
+
+Quantization is configured per namespace through vector_db_storage_cls_kwargs:
+
+    vector_db_storage_cls_kwargs={
+        "cosine_better_than_threshold": 0.2,
+        "quantization": {
+            "chunks": {"type": "pq", "m": 96, "rerank_factor": 8},
+            "entities": {"type": "int8"},
+        },
+    }
+
+Use lightrag/tools/check_vector_recall.py to measure the recall of a configuration
+against exact search before enabling it.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from ..namespace import is_namespace
+
+DEFAULT_RERANK_FACTOR = 4
+# Rows scored at once, bounds the float32 temporaries of a search pass
+SCORE_BLOCK_SIZE = 65536
+
+
+def get_quantization_config(
+    global_config: dict[str, Any], namespace: str
+) -> dict[str, Any]:
+    """Quantization settings of a namespace, empty when it is not quantized"""
+    kwargs = global_config.get("vector_db_storage_cls_kwargs", {})
+    for base_namespace, config in kwargs.get("quantization", {}).items():
+        if is_namespace(namespace, base_namespace):
+            return config or {}
+    return {}
+
+
+class ScalarQuantizer:
+    """int8 codes with a per-dimension scale"""
+
+    kind = "int8"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.scale: np.ndarray | None = None
+
+    @property
+    def is_trained(self) -> bool:
+        return self.scale is not None
+
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector"""
+        return self.dim
+
+    def train(self, vectors: np.ndarray) -> None:
+        # Values beyond the trained range are clipped when encoding
+        max_abs = np.abs(vectors).max(axis=0) if len(vectors) else np.ones(self.dim)
+        self.scale = (np.maximum(max_abs, 1e-6) / 127).astype(np.float32)
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        """Trained parameters, restored with set_state"""
+        return {"scale": self.scale}
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        scale = np.asarray(state["scale"], dtype=np.float32)
+        if scale.shape != (self.dim,):
+            raise ValueError(
+                f"int8 scale of shape {scale.shape} for dimension {self.dim}"
+            )
+        self.scale = scale
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        if len(vectors) == 0:
+            return np.empty((0, self.dim), dtype=np.int8)
+        return np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Approximate inner products of the encoded vectors with a query"""
+        scaled_query = (query * self.scale).astype(np.float32)
+        result = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK_SIZE):
+            block = codes[start : start + SCORE_BLOCK_SIZE]
+            result[start : start + len(block)] = block.astype(np.float32) @ scaled_query
+        return result
+
+
+class ProductQuantizer:
+    """Product quantization with 256 centroids per sub-vector"""
+
+    kind = "pq"
+
+    def __init__(
+        self,
+        dim: int,
+        m: int,
+        iterations: int = 10,
+        sample_size: int = 20000,
+        seed: int = 42,
+    ):
+        if dim % m:
+            raise ValueError(f"PQ sub-vector count {m} must divide dimension {dim}")
+        self.dim = dim
+        self.m = m
+        self.sub_dim = dim // m
+        self.iterations = iterations
+        self.sample_size = sample_size
+        self.seed = seed
+        self.centroids: np.ndarray | None = None  # (m, k, sub_dim)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def code_size(self) -> int:
+        return self.m
+
+    def _sub_vectors(self, vectors: np.ndarray, j: int) -> np.ndarray:
+        return vectors[:, j * self.sub_dim : (j + 1) * self.sub_dim]
+
+    @staticmethod
+    def _nearest(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        distances = (
+            -2 * x @ centroids.T + (centroids * centroids).sum(axis=1)[np.newaxis, :]
+        )
+        return distances.argmin(axis=1)
+
+    def train(self, vectors: np.ndarray) -> None:
+        rng = np.random.default_rng(self.seed)
+        if len(vectors) > self.sample_size:
+            vectors = vectors[rng.choice(len(vectors), self.sample_size, replace=False)]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # Fewer centroids than 256 when there are fewer training vectors
+        k = max(1, min(256, len(vectors)))
+        centroids = np.zeros((self.m, k, self.sub_dim), dtype=np.float32)
+        for j in range(self.m):
+            x = self._sub_vectors(vectors, j)
+            c = x[rng.choice(len(x), k, replace=False)].copy()
+            for _ in range(self.iterations):
+                assign = self._nearest(x, c)
+                counts = np.bincount(assign, minlength=k)
+                sums = np.zeros_like(c)
+                np.add.at(sums, assign, x)
+                filled = counts > 0
+                c[filled] = sums[filled] / counts[filled, np.newaxis]
+            centroids[j] = c
+        self.centroids = centroids
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        """Trained parameters, restored with set_state"""
+        return {"centroids": self.centroids}
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        centroids = np.asarray(state["centroids"], dtype=np.float32)
+        if centroids.ndim != 3 or (centroids.shape[0], centroids.shape[2]) != (
+            self.m,
+            self.sub_dim,
+        ):
+            raise ValueError(
+                f"PQ centroids of shape {centroids.shape} for m={self.m}, dimension {self.dim}"
+            )
+        self.centroids = centroids
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for start in range(0, len(vectors), SCORE_BLOCK_SIZE):
+            block = np.asarray(vectors[start : start + SCORE_BLOCK_SIZE], np.float32)
+            for j in range(self.m):
+                codes[start : start + len(block), j] = self._nearest(
+                    self._sub_vectors(block, j), self.centroids[j]
+                )
+        return codes
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        # Inner product of the query with every centroid, looked up per code
+        table = np.einsum(
+            "mkd,md->mk", self.centroids, query.reshape(self.m, self.sub_dim)
+        ).astype(np.float32)
+        result = np.zeros(len(codes), dtype=np.float32)
+        for j in range(self.m):
+            result += table[j][codes[:, j]]
+        return result
+
+
+def pq_subvector_count(config: dict[str, Any], dim: int) -> int:
+    """Number of PQ sub-vectors, m, which has to divide the dimension
+
+    Defaults to the largest divisor of dim giving sub-vectors of at least 16
+    dimensions: 1 byte instead of 64 per sub-vector.
+    """
+    if "m" in config:
+        m = int(config["m"])
+        if m < 1 or dim % m:
+            raise ValueError(f"PQ sub-vector count {m} must divide dimension {dim}")
+        return m
+    return next(m for m in range(max(1, dim // 16), 0, -1) if dim % m == 0)
+
+
+def create_quantizer(config: dict[str, Any], dim: int):
+    """Build the quantizer described by a namespace quantization config"""
+    kind = str(config.get("type", "int8")).lower()
+    if kind == "int8":
+        return ScalarQuantizer(dim)
+    if kind == "pq":
+        return ProductQuantizer(dim, pq_subvector_count(config, dim))
+    raise ValueError(f"Unsupported vector quantization type: {kind}")
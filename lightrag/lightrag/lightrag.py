@@ -33,12 +33,18 @@ from lightrag.constants import (
     DEFAULT_RELATED_CHUNK_NUMBER,
     DEFAULT_KG_CHUNK_PICK_METHOD,
     DEFAULT_MIN_RERANK_SCORE,
+    DEFAULT_RERANK_CACHE_SIZE,
     DEFAULT_SUMMARY_MAX_TOKENS,
     DEFAULT_SUMMARY_CONTEXT_SIZE,
     DEFAULT_SUMMARY_LENGTH_RECOMMENDED,
     DEFAULT_MAX_ASYNC,
+    DEFAULT_ADAPTIVE_MIN_ASYNC,
+    DEFAULT_RATE_LIMIT_COMPLETION_TOKENS,
+    DEFAULT_EMBEDDING_DEDUP_CACHE_SIZE,
     DEFAULT_MAX_PARALLEL_INSERT,
     DEFAULT_MAX_GRAPH_NODES,
+    DEFAULT_GRAPH_OVERVIEW_RESOLUTION,
+    DEFAULT_GRAPH_OVERVIEW_REDETECT_RATIO,
     DEFAULT_ENTITY_TYPES,
     DEFAULT_SUMMARY_LANGUAGE,
     DEFAULT_LLM_TIMEOUT,
@@ -91,6 +97,11 @@ from lightrag.utils import (
     compute_mdhash_id,
     lazy_external_import,
     priority_limit_async_func_call,
+    micro_batched,
+    EmbeddingStore,
+    content_hash_cached,
+    RerankScoreCache,
+    rerank_score_cached,
     get_content_summary,
     sanitize_text_for_encoding,
     check_storage_env_vars,
@@ -99,6 +110,15 @@ from lightrag.utils import (
     logger,
 )
 from lightrag.types import KnowledgeGraph
+from lightrag.http_clients import close_http_clients
+from lightrag.rate_limit import (
+    embedding_texts,
+    get_rate_limiter,
+    llm_prompt_texts,
+    rate_limited,
+)
+from lightrag.graph_overview import GraphOverview, build_graph_overview
+from lightrag.utils_graph import get_graph_version, bump_graph_version
 from dotenv import load_dotenv
 
 # use the .env that is inside the current folder
@@ -263,6 +283,20 @@ class LightRAG:
     embedding_batch_num: int = field(default=int(os.getenv("EMBEDDING_BATCH_NUM", 10)))
     """Batch size for embedding computations."""
 
+    embedding_batch_wait_ms: float = field(
+        default=get_env_value("EMBEDDING_BATCH_WAIT_MS", 0.0, float)
+    )
+    """Time small embedding calls wait to be coalesced with concurrent calls into
+    batches of up to embedding_batch_num texts. 0 disables coalescing."""
+
+    embedding_dedup_cache_size: int = field(
+        default=get_env_value(
+            "EMBEDDING_DEDUP_CACHE_SIZE", DEFAULT_EMBEDDING_DEDUP_CACHE_SIZE, int
+        )
+    )
+    """Number of embeddings kept by content hash and reused by all vector storages,
+    so that a text is embedded once per instance. 0 disables the store."""
+
     embedding_func_max_async: int = field(
         default=int(os.getenv("EMBEDDING_FUNC_MAX_ASYNC", 8))
     )
@@ -316,6 +350,44 @@ class LightRAG:
     )
     """Maximum number of concurrent LLM calls."""
 
+    adaptive_concurrency: bool = field(
+        default=get_env_value("ADAPTIVE_CONCURRENCY", False, bool)
+    )
+    """Adjust LLM and embedding concurrency to latency, errors and rate limits, up to
+    llm_model_max_async and embedding_func_max_async."""
+
+    adaptive_min_async: int = field(
+        default=get_env_value("ADAPTIVE_MIN_ASYNC", DEFAULT_ADAPTIVE_MIN_ASYNC, int)
+    )
+    """Lowest concurrency the adaptive LLM and embedding queues may decrease to."""
+
+    query_reserved_async: int = field(
+        default=get_env_value("QUERY_RESERVED_ASYNC", 0, int)
+    )
+    """Concurrent LLM and embedding calls reserved for queries, so that queries keep
+    a bounded latency while documents are being indexed. 0 disables query lanes."""
+
+    llm_model_rpm: int = field(default=get_env_value("LLM_RPM", 0, int))
+    """Requests per minute quota of the LLM, 0 for no limit. Shared by all instances
+    of the process using the same llm_model_name."""
+
+    llm_model_tpm: int = field(default=get_env_value("LLM_TPM", 0, int))
+    """Tokens per minute quota of the LLM (prompt and completion), 0 for no limit."""
+
+    rate_limit_completion_tokens: int = field(
+        default=get_env_value(
+            "RATE_LIMIT_COMPLETION_TOKENS", DEFAULT_RATE_LIMIT_COMPLETION_TOKENS, int
+        )
+    )
+    """Completion tokens expected from LLM calls without max_tokens, charged to the
+    TPM quota before the call and corrected with the response."""
+
+    embedding_func_rpm: int = field(default=get_env_value("EMBEDDING_RPM", 0, int))
+    """Requests per minute quota of the embedding model, 0 for no limit."""
+
+    embedding_func_tpm: int = field(default=get_env_value("EMBEDDING_TPM", 0, int))
+    """Tokens per minute quota of the embedding model, 0 for no limit."""
+
     llm_model_kwargs: dict[str, Any] = field(default_factory=dict)
     """Additional keyword arguments passed to the LLM model function."""
 
@@ -334,6 +406,12 @@ class LightRAG:
     )
     """Minimum rerank score threshold for filtering chunks after reranking."""
 
+    rerank_cache_size: int = field(
+        default=get_env_value("RERANK_CACHE_SIZE", DEFAULT_RERANK_CACHE_SIZE, int)
+    )
+    """Number of rerank scores kept by model, query and chunk, so that repeated
+    queries only rerank new candidates. 0 disables the cache."""
+
     # Storage
     # ---
 
@@ -359,6 +437,22 @@ class LightRAG:
     )
     """Maximum number of graph nodes to return in knowledge graph queries."""
 
+    graph_overview_resolution: float = field(
+        default=get_env_value(
+            "GRAPH_OVERVIEW_RESOLUTION", DEFAULT_GRAPH_OVERVIEW_RESOLUTION, float
+        )
+    )
+    """Community detection resolution of the graph overview, higher values give smaller clusters."""
+
+    graph_overview_redetect_ratio: float = field(
+        default=get_env_value(
+            "GRAPH_OVERVIEW_REDETECT_RATIO",
+            DEFAULT_GRAPH_OVERVIEW_REDETECT_RATIO,
+            float,
+        )
+    )
+    """Fraction of added or removed entities after which overview communities are detected again."""
+
     addon_params: dict[str, Any] = field(
         default_factory=lambda: {
             "language": get_env_value(
@@ -384,6 +478,16 @@ class LightRAG:
 
     _storages_status: StoragesStatus = field(default=StoragesStatus.NOT_CREATED)
 
+    _graph_overview: Optional[GraphOverview] = field(
+        default=None, init=False, repr=False
+    )
+    _graph_overview_lock: asyncio.Lock = field(
+        default_factory=asyncio.Lock, init=False, repr=False
+    )
+    _graph_overview_task: Optional[asyncio.Task] = field(
+        default=None, init=False, repr=False
+    )
+
     def __post_init__(self):
         from lightrag.kg.shared_storage import (
             initialize_share_data,
@@ -468,11 +572,44 @@ class LightRAG:
         logger.debug(f"LightRAG init with param:\n  {_print_config}\n")
 
         # Init Embedding
+        embedding_rate_limiter = get_rate_limiter(
+            f"embedding:{getattr(self.embedding_func, 'model_name', None) or 'default'}",
+            self.embedding_func_rpm,
+            self.embedding_func_tpm,
+        )
+        if embedding_rate_limiter is not None:
+            self.embedding_func = rate_limited(
+                self.embedding_func,
+                embedding_rate_limiter,
+                self.tokenizer,
+                embedding_texts,
+            )
         self.embedding_func = priority_limit_async_func_call(
             self.embedding_func_max_async,
             llm_timeout=self.default_embedding_timeout,
             queue_name="Embedding func",
+            adaptive=self.adaptive_concurrency,
+            min_size=self.adaptive_min_async,
+            reserved_query_size=self.query_reserved_async,
         )(self.embedding_func)
+        if self.embedding_batch_wait_ms > 0:
+            self.embedding_func = micro_batched(
+                self.embedding_func,
+                self.embedding_batch_num,
+                self.embedding_batch_wait_ms / 1000,
+            )
+        self.embedding_store = None
+        if self.embedding_dedup_cache_size > 0:
+            self.embedding_store = EmbeddingStore(self.embedding_dedup_cache_size)
+            self.embedding_func = content_hash_cached(
+                self.embedding_func, self.embedding_store
+            )
+        self.rerank_score_cache = None
+        if self.rerank_model_func and self.rerank_cache_size > 0:
+            self.rerank_score_cache = RerankScoreCache(self.rerank_cache_size)
+            self.rerank_model_func = rerank_score_cached(
+                self.rerank_model_func, self.rerank_score_cache
+            )
 
         # Initialize all storages
         self.key_string_value_json_storage_cls: type[BaseKVStorage] = (
@@ -564,18 +701,32 @@ class LightRAG:
         # Directly use llm_response_cache, don't create a new object
         hashing_kv = self.llm_response_cache
 
+        llm_func = partial(
+            self.llm_model_func,  # type: ignore
+            hashing_kv=hashing_kv,
+            **self.llm_model_kwargs,
+        )
+        llm_rate_limiter = get_rate_limiter(
+            f"llm:{self.llm_model_name}", self.llm_model_rpm, self.llm_model_tpm
+        )
+        if llm_rate_limiter is not None:
+            llm_func = rate_limited(
+                llm_func,
+                llm_rate_limiter,
+                self.tokenizer,
+                llm_prompt_texts,
+                completion_tokens=self.rate_limit_completion_tokens,
+            )
+
         # Get timeout from LLM model kwargs for dynamic timeout calculation
         self.llm_model_func = priority_limit_async_func_call(
             self.llm_model_max_async,
             llm_timeout=self.default_llm_timeout,
             queue_name="LLM func",
-        )(
-            partial(
-                self.llm_model_func,  # type: ignore
-                hashing_kv=hashing_kv,
-                **self.llm_model_kwargs,
-            )
-        )
+            adaptive=self.adaptive_concurrency,
+            min_size=self.adaptive_min_async,
+            reserved_query_size=self.query_reserved_async,
+        )(llm_func)
 
         self._storages_status = StoragesStatus.CREATED
 
@@ -645,6 +796,9 @@ class LightRAG:
             else:
                 logger.debug("All storages finalized successfully")
 
+            # Close the shared HTTP clients of the LLM, embedding and rerank bindings
+            await close_http_clients()
+
             self._storages_status = StoragesStatus.FINALIZED
 
     async def check_and_migrate_data(self):
@@ -838,6 +992,83 @@ class LightRAG:
             node_label, max_depth, max_nodes
         )
 
+    async def get_knowledge_graph_stream(
+        self,
+        node_label: str,
+        max_depth: int = 3,
+        max_nodes: int = None,
+    ) -> AsyncIterator[KnowledgeGraph]:
+        """Get knowledge graph for a given label as a stream of partial graphs
+
+        Args:
+            node_label (str): Label to get knowledge graph for
+            max_depth (int): Maximum depth of graph
+            max_nodes (int, optional): Maximum number of nodes to return. Defaults to self.max_graph_nodes.
+
+        Yields:
+            KnowledgeGraph: Nodes of one BFS level with the edges linking them to nodes already yielded
+        """
+        if max_nodes is None:
+            max_nodes = self.max_graph_nodes
+        else:
+            max_nodes = min(max_nodes, self.max_graph_nodes)
+
+        graph = self.chunk_entity_relation_graph
+        async for subgraph in graph.get_knowledge_graph_stream(
+            node_label, max_depth, max_nodes
+        ):
+            yield subgraph
+
+    async def get_graph_overview(self) -> GraphOverview:
+        """Get the multi-resolution community overview of the whole knowledge graph
+
+        The overview is rebuilt when the graph version changes, updating the previous
+        communities incrementally unless enough entities changed to detect them again.
+
+        Returns:
+            GraphOverview: Cluster graphs per zoom level, level 0 being the coarsest
+        """
+        async with self._graph_overview_lock:
+            version = await self.get_graph_version()
+            overview = self._graph_overview
+            if overview is not None and overview.version == version:
+                return overview
+
+            graph = self.chunk_entity_relation_graph
+            nodes = await graph.get_all_nodes()
+            edges = await graph.get_all_edges()
+            overview = await asyncio.to_thread(
+                build_graph_overview,
+                nodes,
+                edges,
+                version,
+                self.max_graph_nodes,
+                previous=overview,
+                resolution=self.graph_overview_resolution,
+                redetect_ratio=self.graph_overview_redetect_ratio,
+            )
+            self._graph_overview = overview
+            logger.info(
+                f"Graph overview built | Version: {version} | Levels: {len(overview.levels)}"
+            )
+            return overview
+
+    @staticmethod
+    def _log_graph_overview_failure(task: asyncio.Task) -> None:
+        """Report a failed background overview rebuild, which nobody awaits"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"Background graph overview rebuild failed: {task.exception()}"
+            )
+
+    async def get_graph_version(self) -> int:
+        """Get the version of the knowledge graph
+
+        The version is shared by all workers and increases each time graph changes
+        are committed, so it can be used to invalidate data derived from the graph.
+        """
+        return await get_graph_version(self.chunk_entity_relation_graph)
+
     def _get_storage_class(self, storage_name: str) -> Callable[..., Any]:
         # Direct imports for default storage implementations
         if storage_name == "JsonKVStorage":
@@ -1844,6 +2075,16 @@ class LightRAG:
             if storage_inst is not None
         ]
         await asyncio.gather(*tasks)
+        await bump_graph_version(self.chunk_entity_relation_graph)
+
+        # Keep an overview that is already in use up to date in the background
+        if self._graph_overview is not None and (
+            self._graph_overview_task is None or self._graph_overview_task.done()
+        ):
+            self._graph_overview_task = asyncio.create_task(self.get_graph_overview())
+            self._graph_overview_task.add_done_callback(
+                self._log_graph_overview_failure
+            )
 
         log_message = "In memory DB persist to disk"
         logger.info(log_message)
@@ -1904,6 +2145,7 @@ class LightRAG:
 
             # Insert entities into knowledge graph
             all_entities_data: list[dict[str, str]] = []
+            graph_nodes: dict[str, dict[str, str]] = {}
             for entity_data in custom_kg.get("entities", []):
                 entity_name = entity_data["entity_name"]
                 entity_type = entity_data.get("entity_type", "UNKNOWN")
@@ -1927,16 +2169,17 @@ class LightRAG:
                     "file_path": file_path,
                     "created_at": int(time.time()),
                 }
-                # Insert node data into the knowledge graph
-                await self.chunk_entity_relation_graph.upsert_node(
-                    entity_name, node_data=node_data
-                )
-                node_data["entity_name"] = entity_name
-                all_entities_data.append(node_data)
+                graph_nodes[entity_name] = node_data
+                all_entities_data.append({**node_data, "entity_name": entity_name})
                 update_storage = True
 
+            # Insert node data into the knowledge graph
+            await self.chunk_entity_relation_graph.upsert_nodes_batch(graph_nodes)
+
             # Insert relationships into knowledge graph
             all_relationships_data: list[dict[str, str]] = []
+            missing_nodes: dict[str, dict[str, str]] = {}
+            graph_edges: list[tuple[str, str, dict[str, str]]] = []
             for relationship_data in custom_kg.get("relationships", []):
                 src_id = relationship_data["src_id"]
                 tgt_id = relationship_data["tgt_id"]
@@ -1955,33 +2198,33 @@ class LightRAG:
 
                 # Check if nodes exist in the knowledge graph
                 for need_insert_id in [src_id, tgt_id]:
+                    if need_insert_id in missing_nodes:
+                        continue
                     if not (
                         await self.chunk_entity_relation_graph.has_node(need_insert_id)
                     ):
-                        await self.chunk_entity_relation_graph.upsert_node(
-                            need_insert_id,
-                            node_data={
-                                "entity_id": need_insert_id,
-                                "source_id": source_id,
-                                "description": "UNKNOWN",
-                                "entity_type": "UNKNOWN",
-                                "file_path": file_path,
-                                "created_at": int(time.time()),
-                            },
-                        )
+                        missing_nodes[need_insert_id] = {
+                            "entity_id": need_insert_id,
+                            "source_id": source_id,
+                            "description": "UNKNOWN",
+                            "entity_type": "UNKNOWN",
+                            "file_path": file_path,
+                            "created_at": int(time.time()),
+                        }
 
-                # Insert edge into the knowledge graph
-                await self.chunk_entity_relation_graph.upsert_edge(
-                    src_id,
-                    tgt_id,
-                    edge_data={
-                        "weight": weight,
-                        "description": description,
-                        "keywords": keywords,
-                        "source_id": source_id,
-                        "file_path": file_path,
-                        "created_at": int(time.time()),
-                    },
+                graph_edges.append(
+                    (
+                        src_id,
+                        tgt_id,
+                        {
+                            "weight": weight,
+                            "description": description,
+                            "keywords": keywords,
+                            "source_id": source_id,
+                            "file_path": file_path,
+                            "created_at": int(time.time()),
+                        },
+                    )
                 )
 
                 edge_data: dict[str, str] = {
@@ -1997,6 +2240,10 @@ class LightRAG:
                 all_relationships_data.append(edge_data)
                 update_storage = True
 
+            # Insert missing nodes and edges into the knowledge graph
+            await self.chunk_entity_relation_graph.upsert_nodes_batch(missing_nodes)
+            await self.chunk_entity_relation_graph.upsert_edges_batch(graph_edges)
+
             # Insert entities into vector storage with consistent format
             data_for_vdb = {
                 compute_mdhash_id(dp["entity_name"], prefix="ent-"): {
@@ -8,6 +8,8 @@ if not pm.is_installed("openai"):
 
 from openai import (
     AsyncAzureOpenAI,
+    DefaultAsyncHttpxClient,
+    NOT_GIVEN,
     APIConnectionError,
     RateLimitError,
     APITimeoutError,
@@ -26,10 +28,35 @@ from lightrag.utils import (
     safe_unicode_decode,
     logger,
 )
+from lightrag.http_clients import get_http_client, httpx_limits
 
 import numpy as np
 
 
+def get_azure_openai_client(
+    base_url: str | None,
+    deployment: str | None,
+    api_key: str | None,
+    api_version: str | None,
+    timeout: float | None = NOT_GIVEN,
+) -> AsyncAzureOpenAI:
+    """Get the shared Azure OpenAI client of a deployment, see lightrag.http_clients"""
+    return get_http_client(
+        "azure_openai",
+        base_url,
+        api_key,
+        {"deployment": deployment, "api_version": api_version, "timeout": timeout},
+        lambda: AsyncAzureOpenAI(
+            azure_endpoint=base_url,
+            azure_deployment=deployment,
+            api_key=api_key,
+            api_version=api_version,
+            timeout=timeout,
+            http_client=DefaultAsyncHttpxClient(limits=httpx_limits()),
+        ),
+    )
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -69,12 +96,8 @@ async def azure_openai_complete_if_cache(
     kwargs.pop("keyword_extraction", None)
     timeout = kwargs.pop("timeout", None)
 
-    openai_async_client = AsyncAzureOpenAI(
-        azure_endpoint=base_url,
-        azure_deployment=deployment,
-        api_key=api_key,
-        api_version=api_version,
-        timeout=timeout,
+    openai_async_client = get_azure_openai_client(
+        base_url, deployment, api_key, api_version, timeout
     )
     messages = []
     if system_prompt:
@@ -164,11 +187,8 @@ async def azure_openai_embed(
         or os.getenv("OPENAI_API_VERSION")
     )
 
-    openai_async_client = AsyncAzureOpenAI(
-        azure_endpoint=base_url,
-        azure_deployment=deployment,
-        api_key=api_key,
-        api_version=api_version,
+    openai_async_client = get_azure_openai_client(
+        base_url, deployment, api_key, api_version
     )
 
     response = await openai_async_client.embeddings.create(
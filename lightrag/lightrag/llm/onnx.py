@@ -0,0 +1,387 @@
+"""
+Local CPU embedding and reranking with ONNX Runtime.
+
+Runs an exported (optionally int8 quantized) sentence embedding or cross-encoder
+rerank model in process, without an embedding or rerank server. Texts are sorted by token length and batched, each
+batch is padded only to its longest text rounded up to a multiple of
+PADDING_MULTIPLE, so short texts do not pay for the padding of long ones. Model
+loading, tokenization and batches run on a thread pool (ONNX Runtime releases the
+GIL), keeping the event loop free.
+
+Export and quantize a model once, e.g. with optimum:
+
+    optimum-cli export onnx --model BAAI/bge-small-en-v1.5 ./bge-small-onnx
+    python -c "from lightrag.llm.onnx import quantize_onnx_model; \\
+        quantize_onnx_model('./bge-small-onnx/model.onnx', './bge-small-onnx/model_quantized.onnx')"
+
+and point EMBEDDING_MODEL at the model directory (EMBEDDING_BINDING=onnx). The
+directory must hold the tokenizer files next to the .onnx file; model_quantized.onnx
+is used when present. Embeddings are pooled as the sentence-transformers
+1_Pooling/config.json of the model directory says (CLS for bge models), mean
+pooling when it has none; ONNX_POOLING overrides it in the server. Compare speed
+and agreement with hf_embed using lightrag/tools/benchmark_local_embedding.py.
+
+Cross-encoders are exported the same way with --task text-classification, e.g.
+BAAI/bge-reranker-base, and used with RERANK_BINDING=local and RERANK_MODEL set to
+the model directory (see lightrag.rerank.local_rerank).
+
+Check an exported model end to end with:
+
+    EMBEDDING_MODEL=./bge-small-onnx RERANK_MODEL=./bge-reranker-onnx python -m lightrag.llm.onnx
+"""
+
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import pipmaster as pm  # Pipmaster for dynamic library install
+
+# install specific modules
+if not pm.is_installed("onnxruntime"):
+    pm.install("onnxruntime")
+if not pm.is_installed("transformers"):
+    pm.install("transformers")
+
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoTokenizer
+
+from lightrag.utils import logger
+
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+# Batches are padded to a multiple of this many tokens, limiting the distinct input
+# shapes ONNX Runtime sees
+PADDING_MULTIPLE = 8
+DEFAULT_ONNX_BATCH_SIZE = 32
+DEFAULT_ONNX_MAX_LENGTH = 512
+
+_executor: ThreadPoolExecutor | None = None
+# Fast tokenizers fail with "Already borrowed" when used from two threads at once
+_tokenizer_lock = threading.Lock()
+
+
+def get_onnx_executor() -> ThreadPoolExecutor:
+    """Thread pool running the ONNX sessions, ONNX_WORKERS threads (default 1)
+
+    Each session already runs its operators on ONNX_INTRA_OP_THREADS threads, more
+    workers only help when batches are small.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("ONNX_WORKERS", 1)),
+            thread_name_prefix="lightrag-onnx",
+        )
+    return _executor
+
+
+def resolve_onnx_model(model: str) -> tuple[str, str]:
+    """(onnx file, tokenizer directory or name) of a model directory or .onnx file"""
+    if os.path.isdir(model):
+        for name in ("model_quantized.onnx", "model.onnx"):
+            path = os.path.join(model, name)
+            if os.path.exists(path):
+                return path, model
+        raise FileNotFoundError(f"No model.onnx or model_quantized.onnx in {model}")
+    return model, os.path.dirname(model) or "."
+
+
+@lru_cache(maxsize=4)
+def load_onnx_model(model: str, tokenizer_name: str | None = None):
+    """Load and cache the ONNX Runtime session and tokenizer of a model"""
+    model_path, tokenizer_dir = resolve_onnx_model(model)
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    intra_op_threads = int(os.getenv("ONNX_INTRA_OP_THREADS", 0))
+    if intra_op_threads > 0:
+        options.intra_op_num_threads = intra_op_threads
+    session = ort.InferenceSession(
+        model_path, sess_options=options, providers=["CPUExecutionProvider"]
+    )
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_name or tokenizer_dir)
+    logger.info(f"Loaded ONNX model {model_path}")
+    return session, tokenizer
+
+
+@lru_cache(maxsize=16)
+def model_pooling(model: str) -> str:
+    """Pooling of a sentence-transformers model directory, "mean" if not declared"""
+    model_dir = model if os.path.isdir(model) else os.path.dirname(model) or "."
+    config_path = os.path.join(model_dir, "1_Pooling", "config.json")
+    if not os.path.exists(config_path):
+        return "mean"
+    with open(config_path, encoding="utf-8") as f:
+        config = json.load(f)
+    if config.get("pooling_mode_cls_token"):
+        return "cls"
+    if not config.get("pooling_mode_mean_tokens", True):
+        logger.warning(f"Unsupported pooling in {config_path}, using mean pooling")
+    return "mean"
+
+
+def _prepare_inputs(
+    model: str,
+    tokenizer_name: str | None,
+    max_length: int,
+    texts: list[str],
+    text_pairs: list[str] | None = None,
+):
+    """Session, encodings and pad token id of a model's inputs
+
+    Runs on the ONNX executor: loading a model takes seconds on first use.
+    """
+    session, tokenizer = load_onnx_model(model, tokenizer_name)
+    with _tokenizer_lock:
+        if text_pairs is None:
+            encodings = tokenizer(texts, truncation=True, max_length=max_length)
+        else:
+            encodings = tokenizer(
+                texts, text_pairs, truncation=True, max_length=max_length
+            )
+    return session, encodings, tokenizer.pad_token_id or 0
+
+
+def quantize_onnx_model(model_path: str, output_path: str) -> None:
+    """Write a dynamically int8 quantized copy of an ONNX model"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(model_path, output_path, weight_type=QuantType.QInt8)
+
+
+def length_buckets(lengths: list[int], batch_size: int) -> list[list[int]]:
+    """Indices of the inputs grouped in batches of similar length"""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    return [order[i : i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def pad_batch(
+    encodings: list[list[int]], pad_token_id: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """input_ids and attention_mask of a batch padded to a multiple of PADDING_MULTIPLE"""
+    longest = max(len(ids) for ids in encodings)
+    width = -(-longest // PADDING_MULTIPLE) * PADDING_MULTIPLE
+    input_ids = np.full((len(encodings), width), pad_token_id, dtype=np.int64)
+    attention_mask = np.zeros((len(encodings), width), dtype=np.int64)
+    for row, ids in enumerate(encodings):
+        input_ids[row, : len(ids)] = ids
+        attention_mask[row, : len(ids)] = 1
+    return input_ids, attention_mask
+
+
+def run_onnx_session(
+    session,
+    input_ids: np.ndarray,
+    attention_mask: np.ndarray,
+    token_type_ids: np.ndarray | None = None,
+):
+    """First output of a session for a padded batch"""
+    feed = {}
+    for model_input in session.get_inputs():
+        if model_input.name == "input_ids":
+            feed["input_ids"] = input_ids
+        elif model_input.name == "attention_mask":
+            feed["attention_mask"] = attention_mask
+        elif model_input.name == "token_type_ids":
+            feed["token_type_ids"] = (
+                token_type_ids
+                if token_type_ids is not None
+                else np.zeros_like(input_ids)
+            )
+    return session.run(None, feed)[0]
+
+
+def _embed_batch(
+    session, input_ids: np.ndarray, attention_mask: np.ndarray, pooling: str
+) -> np.ndarray:
+    output = run_onnx_session(session, input_ids, attention_mask)
+    if output.ndim == 2:
+        # Model exported with its pooling layer
+        return output.astype(np.float32)
+    if pooling == "cls":
+        return output[:, 0].astype(np.float32)
+    mask = attention_mask[:, :, np.newaxis].astype(np.float32)
+    return (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+async def onnx_embed(
+    texts: list[str],
+    model: str,
+    tokenizer_name: str | None = None,
+    batch_size: int = DEFAULT_ONNX_BATCH_SIZE,
+    max_length: int = DEFAULT_ONNX_MAX_LENGTH,
+    pooling: str | None = None,
+    normalize: bool = True,
+) -> np.ndarray:
+    """Embed texts with a local ONNX model on CPU
+
+    Args:
+        texts: Texts to embed
+        model: Model directory (with tokenizer files) or .onnx file
+        tokenizer_name: Tokenizer directory or Hugging Face name, defaults to the
+            directory of the model
+        batch_size: Texts per session run
+        max_length: Texts are truncated to this many tokens
+        pooling: "mean" over the attention mask or "cls", for models exported
+            without their pooling layer; defaults to the pooling declared in the
+            model directory, see model_pooling
+        normalize: Return unit length vectors
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    loop = asyncio.get_running_loop()
+    executor = get_onnx_executor()
+    if pooling is None:
+        pooling = await loop.run_in_executor(executor, model_pooling, model)
+    session, encodings, pad_token_id = await loop.run_in_executor(
+        executor, _prepare_inputs, model, tokenizer_name, max_length, list(texts)
+    )
+    encodings = encodings["input_ids"]
+
+    buckets = length_buckets([len(ids) for ids in encodings], batch_size)
+    results = await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                executor,
+                _embed_batch,
+                session,
+                *pad_batch([encodings[i] for i in bucket], pad_token_id),
+                pooling,
+            )
+            for bucket in buckets
+        ]
+    )
+
+    embeddings = np.empty((len(texts), results[0].shape[1]), dtype=np.float32)
+    for bucket, result in zip(buckets, results):
+        embeddings[bucket] = result
+    if normalize:
+        embeddings /= np.maximum(
+            np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12
+        )
+    return embeddings
+
+
+def _score_batch(
+    session,
+    input_ids: np.ndarray,
+    attention_mask: np.ndarray,
+    token_type_ids: np.ndarray,
+) -> np.ndarray:
+    logits = run_onnx_session(session, input_ids, attention_mask, token_type_ids)
+    logits = logits.astype(np.float32).reshape(len(input_ids), -1)
+    if logits.shape[1] == 1:
+        return 1 / (1 + np.exp(-logits[:, 0]))
+    # Two class models: probability of the relevant class
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp[:, -1] / exp.sum(axis=1)
+
+
+async def onnx_rerank(
+    query: str,
+    documents: list[str],
+    model: str,
+    tokenizer_name: str | None = None,
+    top_n: int | None = None,
+    batch_size: int = DEFAULT_ONNX_BATCH_SIZE,
+    max_length: int = DEFAULT_ONNX_MAX_LENGTH,
+) -> list[dict]:
+    """Score (query, document) pairs with a local ONNX cross-encoder on CPU
+
+    Args:
+        query: The search query
+        documents: Documents to rerank
+        model: Model directory (with tokenizer files) or .onnx file
+        tokenizer_name: Tokenizer directory or Hugging Face name, defaults to the
+            directory of the model
+        top_n: Number of top results to return, all when None
+        batch_size: Pairs per session run
+        max_length: Pairs are truncated to this many tokens
+
+    Returns:
+        List of dictionary of ["index": int, "relevance_score": float] sorted by
+        score, scores are the sigmoid of single logit models
+    """
+    if not documents:
+        return []
+    loop = asyncio.get_running_loop()
+    executor = get_onnx_executor()
+    session, encodings, pad_token_id = await loop.run_in_executor(
+        executor,
+        _prepare_inputs,
+        model,
+        tokenizer_name,
+        max_length,
+        [query] * len(documents),
+        list(documents),
+    )
+    input_ids = encodings["input_ids"]
+    type_ids = encodings.get("token_type_ids") or [[0] * len(ids) for ids in input_ids]
+
+    buckets = length_buckets([len(ids) for ids in input_ids], batch_size)
+    results = await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                executor,
+                _score_batch,
+                session,
+                *pad_batch([input_ids[i] for i in bucket], pad_token_id),
+                pad_batch([type_ids[i] for i in bucket], 0)[0],
+            )
+            for bucket in buckets
+        ]
+    )
+
+    scores = np.empty(len(documents), dtype=np.float32)
+    for bucket, result in zip(buckets, results):
+        scores[bucket] = result
+    ranked = [
+        {"index": int(index), "relevance_score": float(scores[index])}
+        for index in np.argsort(-scores, kind="stable")
+    ]
+    return ranked[:top_n] if top_n else ranked
+
+
+"""Please run this check as a module, with EMBEDDING_MODEL and/or RERANK_MODEL set
+to exported model directories:
+python -m lightrag.llm.onnx
+"""
+if __name__ == "__main__":
+
+    async def main():
+        texts = [
+            "The capital of France is Paris.",
+            "Tokyo is the capital of Japan.",
+            "London is the capital of England, on the river Thames.",
+        ]
+        query = "What is the capital of France?"
+        ticks = 0
+
+        async def heartbeat():
+            # Counts while the event loop is free during loading and inference
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        heartbeat_task = asyncio.create_task(heartbeat())
+        embedding_model = os.getenv("EMBEDDING_MODEL")
+        if embedding_model:
+            print(f"=== onnx_embed ({model_pooling(embedding_model)} pooling) ===")
+            embeddings = await onnx_embed(texts, model=embedding_model)
+            # Batched and single text runs must agree despite the padding
+            single = await onnx_embed(texts[-1:], model=embedding_model)
+            print(f"Shape: {embeddings.shape}")
+            print(f"Cosine of batched and single run: {embeddings[-1] @ single[0]:.6f}")
+        reranker_model = os.getenv("RERANK_MODEL")
+        if reranker_model:
+            print("=== onnx_rerank ===")
+            for item in await onnx_rerank(query, texts, model=reranker_model):
+                print(f"Index: {item['index']}, Score: {item['relevance_score']:.4f}")
+        heartbeat_task.cancel()
+        print(f"Event loop ticks while running: {ticks}")
+
+    asyncio.run(main())
@@ -1287,6 +1287,105 @@ async def _rebuild_single_relationship(
         raise  # Re-raise exception
 
 
+class _GraphUpsertBatcher:
+    """Coalesce the graph upserts of concurrent merges into batch upserts
+
+    Upserts requested until the event loop runs the scheduled flush are written
+    with one upsert_nodes_batch and one upsert_edges_batch call. Every caller waits
+    for the write of its upsert, so merges still hold their keyed lock until their
+    entity or relation is stored. A failed batch is retried one upsert at a time,
+    so only the callers whose own write fails get the error.
+    """
+
+    def __init__(self, graph: BaseGraphStorage):
+        self._graph = graph
+        self._nodes: list[tuple[str, dict, asyncio.Future]] = []
+        self._edges: list[tuple[str, str, dict, asyncio.Future]] = []
+        # Strong references to running flushes, the event loop only keeps weak ones
+        self._flushing: set[asyncio.Task] = set()
+
+    @staticmethod
+    def supported(graph: BaseGraphStorage) -> bool:
+        """Whether the storage implements its own batch upserts
+
+        The default implementations upsert one by one and would only serialize
+        the concurrent writes.
+        """
+        return (
+            type(graph).upsert_nodes_batch is not BaseGraphStorage.upsert_nodes_batch
+            and type(graph).upsert_edges_batch
+            is not BaseGraphStorage.upsert_edges_batch
+        )
+
+    async def upsert_node(self, node_id: str, node_data: dict[str, str]) -> None:
+        future = self._schedule()
+        self._nodes.append((node_id, node_data, future))
+        await future
+
+    async def upsert_edge(
+        self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
+    ) -> None:
+        future = self._schedule()
+        self._edges.append((source_node_id, target_node_id, edge_data, future))
+        await future
+
+    def _schedule(self) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if not self._nodes and not self._edges:
+            loop.call_soon(self._start_flush)
+        return loop.create_future()
+
+    def _start_flush(self) -> None:
+        task = asyncio.ensure_future(self._flush())
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self) -> None:
+        nodes, self._nodes = self._nodes, []
+        edges, self._edges = self._edges, []
+        if nodes:
+            await self._write(
+                nodes,
+                lambda: self._graph.upsert_nodes_batch(
+                    {node_id: node_data for node_id, node_data, _ in nodes}
+                ),
+                self._graph.upsert_node,
+            )
+        if edges:
+            await self._write(
+                edges,
+                lambda: self._graph.upsert_edges_batch(
+                    [(src, tgt, edge_data) for src, tgt, edge_data, _ in edges]
+                ),
+                self._graph.upsert_edge,
+            )
+
+    @staticmethod
+    async def _write(items: list[tuple], write_batch, write_one) -> None:
+        """Write items with one batch call, one by one if the batch fails"""
+        try:
+            await write_batch()
+        except Exception as e:
+            logger.warning(
+                f"Graph batch upsert of {len(items)} items failed, retrying one by one: {e}"
+            )
+        else:
+            for *_, future in items:
+                if not future.done():
+                    future.set_result(None)
+            return
+
+        for *args, future in items:
+            try:
+                await write_one(*args)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(None)
+
+
 async def _merge_nodes_then_upsert(
     entity_name: str,
     nodes_data: list[dict],
@@ -1295,6 +1394,7 @@ async def _merge_nodes_then_upsert(
     pipeline_status: dict = None,
     pipeline_status_lock=None,
     llm_response_cache: BaseKVStorage | None = None,
+    graph_writer: _GraphUpsertBatcher | None = None,
 ):
     """Get existing nodes from knowledge graph use name,if exists, merge data, else create, then upsert."""
     already_entity_types = []
@@ -1384,7 +1484,7 @@ async def _merge_nodes_then_upsert(
         file_path=file_path,
         created_at=int(time.time()),
     )
-    await knowledge_graph_inst.upsert_node(
+    await (graph_writer or knowledge_graph_inst).upsert_node(
         entity_name,
         node_data=node_data,
     )
@@ -1402,6 +1502,7 @@ async def _merge_edges_then_upsert(
     pipeline_status_lock=None,
     llm_response_cache: BaseKVStorage | None = None,
     added_entities: list = None,  # New parameter to track entities added during edge processing
+    graph_writer: _GraphUpsertBatcher | None = None,
 ):
     if src_id == tgt_id:
         return None
@@ -1536,7 +1637,9 @@ async def _merge_edges_then_upsert(
                 "file_path": file_path,
                 "created_at": int(time.time()),
             }
-            await knowledge_graph_inst.upsert_node(need_insert_id, node_data=node_data)
+            await (graph_writer or knowledge_graph_inst).upsert_node(
+                need_insert_id, node_data=node_data
+            )
 
             # Track entities added during edge processing
             if added_entities is not None:
@@ -1550,7 +1653,7 @@ async def _merge_edges_then_upsert(
                 }
                 added_entities.append(entity_data)
 
-    await knowledge_graph_inst.upsert_edge(
+    await (graph_writer or knowledge_graph_inst).upsert_edge(
         src_id,
         tgt_id,
         edge_data=dict(
@@ -1576,6 +1679,33 @@ async def _merge_edges_then_upsert(
     return edge_data
 
 
+async def _vdb_record_unchanged(
+    vdb: BaseVectorStorage, record_id: str, record: dict[str, Any]
+) -> bool:
+    """Whether a vector storage already holds a merged entity or relation record
+
+    Compares the embedded content, then the stored source ids and file paths (as
+    sets, their order is not stable). An unchanged record needs no upsert, and no
+    embedding call: merges that only repeat known descriptions, such as re-indexing
+    a document, leave the vector storage untouched.
+    """
+    try:
+        stored = await vdb.get_fields_by_id(
+            record_id, ["content", "source_id", "file_path"]
+        )
+    except Exception as e:
+        logger.debug(f"Could not read vector record {record_id}: {e}")
+        return False
+    if not stored or stored.get("content") != record["content"]:
+        return False
+    for field_name in ("source_id", "file_path"):
+        if field_name in stored and set(
+            str(stored[field_name]).split(GRAPH_FIELD_SEP)
+        ) != set(str(record.get(field_name, "")).split(GRAPH_FIELD_SEP)):
+            return False
+    return True
+
+
 async def merge_nodes_and_edges(
     chunk_results: list,
     knowledge_graph_inst: BaseGraphStorage,
@@ -1643,6 +1773,13 @@ async def merge_nodes_and_edges(
     graph_max_async = global_config.get("llm_model_max_async", 4) * 2
     semaphore = asyncio.Semaphore(graph_max_async)
 
+    # Write the graph upserts of concurrent merges together when the storage can
+    graph_writer = (
+        _GraphUpsertBatcher(knowledge_graph_inst)
+        if _GraphUpsertBatcher.supported(knowledge_graph_inst)
+        else None
+    )
+
     # ===== Phase 1: Process all entities concurrently =====
     log_message = f"Phase 1: Processing {total_entities_count} entities from {doc_id} (async: {graph_max_async})"
     logger.info(log_message)
@@ -1667,14 +1804,16 @@ async def merge_nodes_and_edges(
                         pipeline_status,
                         pipeline_status_lock,
                         llm_response_cache,
+                        graph_writer=graph_writer,
                     )
 
                     # Vector database operation (equally critical, must succeed)
                     if entity_vdb is not None and entity_data:
+                        entity_vdb_id = compute_mdhash_id(
+                            entity_data["entity_name"], prefix="ent-"
+                        )
                         data_for_vdb = {
-                            compute_mdhash_id(
-                                entity_data["entity_name"], prefix="ent-"
-                            ): {
+                            entity_vdb_id: {
                                 "entity_name": entity_data["entity_name"],
                                 "entity_type": entity_data["entity_type"],
                                 "content": f"{entity_data['entity_name']}\n{entity_data['description']}",
@@ -1686,13 +1825,16 @@ async def merge_nodes_and_edges(
                         }
 
                         # Use safe operation wrapper - VDB failure must throw exception
-                        await safe_vdb_operation_with_exception(
-                            operation=lambda: entity_vdb.upsert(data_for_vdb),
-                            operation_name="entity_upsert",
-                            entity_name=entity_name,
-                            max_retries=3,
-                            retry_delay=0.1,
-                        )
+                        if not await _vdb_record_unchanged(
+                            entity_vdb, entity_vdb_id, data_for_vdb[entity_vdb_id]
+                        ):
+                            await safe_vdb_operation_with_exception(
+                                operation=lambda: entity_vdb.upsert(data_for_vdb),
+                                operation_name="entity_upsert",
+                                entity_name=entity_name,
+                                max_retries=3,
+                                retry_delay=0.1,
+                            )
 
                     return entity_data
 
@@ -1798,6 +1940,7 @@ async def merge_nodes_and_edges(
                         pipeline_status_lock,
                         llm_response_cache,
                         added_entities,  # Pass list to collect added entities
+                        graph_writer=graph_writer,
                     )
 
                     if edge_data is None:
@@ -1805,10 +1948,11 @@ async def merge_nodes_and_edges(
 
                     # Vector database operation (equally critical, must succeed)
                     if relationships_vdb is not None:
+                        rel_vdb_id = compute_mdhash_id(
+                            edge_data["src_id"] + edge_data["tgt_id"], prefix="rel-"
+                        )
                         data_for_vdb = {
-                            compute_mdhash_id(
-                                edge_data["src_id"] + edge_data["tgt_id"], prefix="rel-"
-                            ): {
+                            rel_vdb_id: {
                                 "src_id": edge_data["src_id"],
                                 "tgt_id": edge_data["tgt_id"],
                                 "keywords": edge_data["keywords"],
@@ -1822,13 +1966,18 @@ async def merge_nodes_and_edges(
                         }
 
                         # Use safe operation wrapper - VDB failure must throw exception
-                        await safe_vdb_operation_with_exception(
-                            operation=lambda: relationships_vdb.upsert(data_for_vdb),
-                            operation_name="relationship_upsert",
-                            entity_name=f"{edge_data['src_id']}-{edge_data['tgt_id']}",
-                            max_retries=3,
-                            retry_delay=0.1,
-                        )
+                        if not await _vdb_record_unchanged(
+                            relationships_vdb, rel_vdb_id, data_for_vdb[rel_vdb_id]
+                        ):
+                            await safe_vdb_operation_with_exception(
+                                operation=lambda: relationships_vdb.upsert(
+                                    data_for_vdb
+                                ),
+                                operation_name="relationship_upsert",
+                                entity_name=f"{edge_data['src_id']}-{edge_data['tgt_id']}",
+                                max_retries=3,
+                                retry_delay=0.1,
+                            )
 
                     # Update added_entities to entity vector database using safe operation wrapper
                     if added_entities and entity_vdb is not None:
@@ -2372,6 +2521,12 @@ async def kg_query(
         ll_keywords_str,
         query_param.user_prompt or "",
         query_param.enable_rerank,
+        # Retrieval settings changing which records are found
+        json.dumps(query_param.metadata_filter, sort_keys=True, default=str),
+        query_param.hnsw_ef_search,
+        query_param.ivfflat_probes,
+        query_param.truncate_dim,
+        query_param.truncate_rerank_factor,
     )
 
     cached_result = await handle_cache(
@@ -2611,7 +2766,10 @@ async def _get_vector_context(
         cosine_threshold = chunks_vdb.cosine_better_than_threshold
 
         results = await chunks_vdb.query(
-            query, top_k=search_top_k, query_embedding=query_embedding
+            query,
+            top_k=search_top_k,
+            query_embedding=query_embedding,
+            query_param=query_param,
         )
         if not results:
             logger.info(
@@ -2670,23 +2828,32 @@ async def _perform_kg_search(
     # Track chunk sources and metadata for final logging
     chunk_tracking = {}  # chunk_id -> {source, frequency, order}
 
-    # Pre-compute query embedding once for all vector operations
+    # Pre-compute the query and keyword embeddings with one embedding call
     kg_chunk_pick_method = text_chunks_db.global_config.get(
         "kg_chunk_pick_method", DEFAULT_KG_CHUNK_PICK_METHOD
     )
-    query_embedding = None
+    embedding_texts = {}
     if query and (kg_chunk_pick_method == "VECTOR" or chunks_vdb):
-        embedding_func_config = text_chunks_db.embedding_func
-        if embedding_func_config and embedding_func_config.func:
-            try:
-                query_embedding = await embedding_func_config.func([query])
-                query_embedding = query_embedding[
-                    0
-                ]  # Extract first embedding from batch result
-                logger.debug("Pre-computed query embedding for all vector operations")
-            except Exception as e:
-                logger.warning(f"Failed to pre-compute query embedding: {e}")
-                query_embedding = None
+        embedding_texts["query"] = query
+    if query_param.mode != "global" and len(ll_keywords) > 0:
+        embedding_texts["ll_keywords"] = ll_keywords
+    if query_param.mode != "local" and len(hl_keywords) > 0:
+        embedding_texts["hl_keywords"] = hl_keywords
+    embeddings = {}
+    embedding_func_config = text_chunks_db.embedding_func
+    if embedding_texts and embedding_func_config:
+        try:
+            # Through the wrapped function: query priority, limits and caches apply
+            results = await embedding_func_config(
+                list(embedding_texts.values()), _priority=5
+            )
+            embeddings = dict(zip(embedding_texts, results))
+            logger.debug(
+                f"Pre-computed {len(embeddings)} embeddings for all vector operations"
+            )
+        except Exception as e:
+            logger.warning(f"Failed to pre-compute query embeddings: {e}")
+    query_embedding = embeddings.get("query")
 
     # Handle local and global modes
     if query_param.mode == "local" and len(ll_keywords) > 0:
@@ -2695,6 +2862,7 @@ async def _perform_kg_search(
             knowledge_graph_inst,
             entities_vdb,
             query_param,
+            embeddings.get("ll_keywords"),
         )
 
     elif query_param.mode == "global" and len(hl_keywords) > 0:
@@ -2703,32 +2871,44 @@ async def _perform_kg_search(
             knowledge_graph_inst,
             relationships_vdb,
             query_param,
+            embeddings.get("hl_keywords"),
         )
 
     else:  # hybrid or mix mode
+        # Entity, relation and chunk searches use different collections, run them concurrently
+        searches = {}
         if len(ll_keywords) > 0:
-            local_entities, local_relations = await _get_node_data(
+            searches["local"] = _get_node_data(
                 ll_keywords,
                 knowledge_graph_inst,
                 entities_vdb,
                 query_param,
+                embeddings.get("ll_keywords"),
             )
         if len(hl_keywords) > 0:
-            global_relations, global_entities = await _get_edge_data(
+            searches["global"] = _get_edge_data(
                 hl_keywords,
                 knowledge_graph_inst,
                 relationships_vdb,
                 query_param,
+                embeddings.get("hl_keywords"),
             )
-
         # Get vector chunks for mix mode
         if query_param.mode == "mix" and chunks_vdb:
-            vector_chunks = await _get_vector_context(
+            searches["vector"] = _get_vector_context(
                 query,
                 chunks_vdb,
                 query_param,
                 query_embedding,
             )
+        search_results = dict(zip(searches, await asyncio.gather(*searches.values())))
+        if "local" in search_results:
+            local_entities, local_relations = search_results["local"]
+        if "global" in search_results:
+            global_relations, global_entities = search_results["global"]
+
+        if "vector" in search_results:
+            vector_chunks = search_results["vector"]
             # Track vector chunks with source metadata
             for i, chunk in enumerate(vector_chunks):
                 chunk_id = chunk.get("chunk_id") or chunk.get("id")
@@ -3387,13 +3567,19 @@ async def _get_node_data(
     knowledge_graph_inst: BaseGraphStorage,
     entities_vdb: BaseVectorStorage,
     query_param: QueryParam,
+    query_embedding: list[float] = None,
 ):
     # get similar entities
     logger.info(
         f"Query nodes: {query} (top_k:{query_param.top_k}, cosine:{entities_vdb.cosine_better_than_threshold})"
     )
 
-    results = await entities_vdb.query(query, top_k=query_param.top_k)
+    results = await entities_vdb.query(
+        query,
+        top_k=query_param.top_k,
+        query_embedding=query_embedding,
+        query_param=query_param,
+    )
 
     if not len(results):
         return [], []
@@ -3664,12 +3850,18 @@ async def _get_edge_data(
     knowledge_graph_inst: BaseGraphStorage,
     relationships_vdb: BaseVectorStorage,
     query_param: QueryParam,
+    query_embedding: list[float] = None,
 ):
     logger.info(
         f"Query edges: {keywords} (top_k:{query_param.top_k}, cosine:{relationships_vdb.cosine_better_than_threshold})"
     )
 
-    results = await relationships_vdb.query(keywords, top_k=query_param.top_k)
+    results = await relationships_vdb.query(
+        keywords,
+        top_k=query_param.top_k,
+        query_embedding=query_embedding,
+        query_param=query_param,
+    )
 
     if not len(results):
         return [], []
@@ -4163,6 +4355,12 @@ async def naive_query(
         query_param.max_total_tokens,
         query_param.user_prompt or "",
         query_param.enable_rerank,
+        # Retrieval settings changing which records are found
+        json.dumps(query_param.metadata_filter, sort_keys=True, default=str),
+        query_param.hnsw_ef_search,
+        query_param.ivfflat_probes,
+        query_param.truncate_dim,
+        query_param.truncate_rerank_factor,
     )
     cached_result = await handle_cache(
         hashing_kv, args_hash, user_query, query_param.mode, cache_type="query"
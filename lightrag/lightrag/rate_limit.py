@@ -0,0 +1,202 @@
+"""
+Per-process token-bucket limiter for provider requests-per-minute (RPM) and
+tokens-per-minute (TPM) quotas.
+
+The LLM and embedding functions of LightRAG are wrapped with rate_limited() when
+LLM_RPM / LLM_TPM or EMBEDDING_RPM / EMBEDDING_TPM are set. Before a call is sent,
+its prompt tokens are counted with the configured Tokenizer and its completion
+tokens are estimated from max_tokens; the call then waits until both buckets hold
+enough budget. When an LLM call returns its text, the estimate is replaced by the
+actual count so later calls are scheduled on real usage.
+
+Limiters are registered per process and keyed by name (binding and model), so all
+LightRAG instances calling the same model share one budget instead of each
+spending the full quota and collecting 429s.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from functools import wraps
+from typing import Any, Callable
+
+from .utils import logger
+
+# name -> RateLimiter
+_limiters: dict[str, "RateLimiter"] = {}
+
+
+class TokenBucket:
+    """Bucket holding up to one minute of quota, refilled continuously"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until the bucket holds amount, 0 when it already does"""
+        return max(0.0, (amount - self.level) / self.rate)
+
+
+class RateLimiter:
+    """Schedules calls to stay under a requests and a tokens per minute quota
+
+    Either quota may be 0 (unlimited). Calls are admitted in the order they ask,
+    a call needing more tokens than the whole TPM quota waits for a full bucket.
+    Tokens may be charged after the fact with settle(), a bucket overdrawn by an
+    underestimate delays the next calls until it has refilled.
+    """
+
+    def __init__(self, name: str, rpm: int = 0, tpm: int = 0):
+        self.name = name
+        self.requests: TokenBucket | None = None
+        self.tokens: TokenBucket | None = None
+        self.set_quotas(rpm, tpm)
+        # One lock per event loop, asyncio locks can not be shared between loops
+        self._locks: dict[int, tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = {}
+        self.waited = 0.0
+        self.admitted = 0
+
+    def set_quotas(self, rpm: int, tpm: int) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        entry = self._locks.get(id(loop))
+        if entry is None or entry[0] is not loop:
+            self._locks = {k: v for k, v in self._locks.items() if not v[0].is_closed()}
+            entry = self._locks[id(loop)] = (loop, asyncio.Lock())
+        return entry[1]
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until a request of the given number of tokens fits in the quotas"""
+        async with self._lock():
+            start = time.monotonic()
+            while True:
+                now = time.monotonic()
+                wait = 0.0
+                if self.requests is not None:
+                    self.requests.refill(now)
+                    wait = self.requests.wait_time(1)
+                if self.tokens is not None:
+                    self.tokens.refill(now)
+                    wait = max(
+                        wait, self.tokens.wait_time(min(tokens, self.tokens.capacity))
+                    )
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+            if self.requests is not None:
+                self.requests.level -= 1
+            if self.tokens is not None:
+                self.tokens.level -= tokens
+            waited = time.monotonic() - start
+            self.waited += waited
+            self.admitted += 1
+            if waited > 1:
+                logger.debug(f"{self.name}: Rate limit delayed call by {waited:.1f}s")
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Charge the difference between the actual and the estimated tokens"""
+        if self.tokens is not None:
+            self.tokens.level = min(
+                self.tokens.capacity, self.tokens.level - (actual - estimated)
+            )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "admitted": self.admitted,
+            "waited_seconds": round(self.waited, 3),
+        }
+
+
+def get_rate_limiter(name: str, rpm: int = 0, tpm: int = 0) -> RateLimiter | None:
+    """Shared limiter of a model, None when neither quota is set
+
+    Instances configured with other quotas for the same name update the shared
+    limiter, the last configuration wins.
+    """
+    if rpm <= 0 and tpm <= 0:
+        return None
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = _limiters[name] = RateLimiter(name, rpm, tpm)
+        logger.info(
+            f"Rate limiter {name}: RPM {rpm or 'unlimited'}, TPM {tpm or 'unlimited'}"
+        )
+    elif (limiter.rpm, limiter.tpm) != (rpm, tpm):
+        logger.warning(
+            f"Rate limiter {name}: quotas changed from RPM {limiter.rpm} / TPM {limiter.tpm} "
+            f"to RPM {rpm} / TPM {tpm}"
+        )
+        limiter.set_quotas(rpm, tpm)
+    return limiter
+
+
+def rate_limited(
+    func: Callable,
+    limiter: RateLimiter,
+    tokenizer,
+    prompt_texts: Callable[..., list[str]],
+    completion_tokens: int = 0,
+) -> Callable:
+    """Wrap an async function so that its calls wait for the limiter
+
+    Args:
+        func: Function to wrap
+        limiter: Limiter the calls are charged to
+        tokenizer: Tokenizer counting the prompt and completion tokens
+        prompt_texts: Texts sent by a call, from the arguments of the call
+        completion_tokens: Expected completion tokens of calls without max_tokens,
+            0 for functions without completion (embeddings)
+    """
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        prompt_tokens = sum(
+            len(tokenizer.encode(text)) for text in prompt_texts(*args, **kwargs)
+        )
+        expected = 0
+        if completion_tokens:
+            expected = (
+                kwargs.get("max_tokens")
+                or kwargs.get("max_completion_tokens")
+                or completion_tokens
+            )
+        await limiter.acquire(prompt_tokens + expected)
+        result = await func(*args, **kwargs)
+        # Streamed responses are charged with the estimate
+        if completion_tokens and isinstance(result, str):
+            limiter.settle(expected, len(tokenizer.encode(result)))
+        return result
+
+    return wrapper
+
+
+def llm_prompt_texts(*args, **kwargs) -> list[str]:
+    """Prompt, system prompt and history texts of an LLM function call"""
+    texts = [args[0] if args else kwargs.get("prompt", "")]
+    texts.append(kwargs.get("system_prompt") or "")
+    for message in kwargs.get("history_messages") or []:
+        texts.append(str(message.get("content", "")))
+    return [text for text in texts if text]
+
+
+def embedding_texts(*args, **kwargs) -> list[str]:
+    """Texts of an embedding function call"""
+    texts = args[0] if args else kwargs.get("texts", [])
+    return [texts] if isinstance(texts, str) else list(texts)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import aiohttp
 from typing import Any, List, Dict, Optional
@@ -9,7 +10,9 @@ from tenacity import (
     wait_exponential,
     retry_if_exception_type,
 )
-from .utils import logger
+from .utils import get_env_value, logger
+from .http_clients import get_aiohttp_session
+from .constants import DEFAULT_RERANK_MAX_CANDIDATES, DEFAULT_RERANK_SHARD_SIZE
 
 from dotenv import load_dotenv
 
@@ -27,7 +30,7 @@ load_dotenv(dotenv_path=".env", override=False)
         | retry_if_exception_type(aiohttp.ClientResponseError)
     ),
 )
-async def generic_rerank_api(
+async def _rerank_request(
     query: str,
     documents: List[str],
     model: str,
@@ -40,7 +43,7 @@ async def generic_rerank_api(
     request_format: str = "standard",  # "standard" (Jina/Cohere) or "aliyun"
 ) -> List[Dict[str, Any]]:
     """
-    Generic rerank API call for Jina/Cohere/Aliyun models.
+    Single rerank API request for Jina/Cohere/Aliyun models.
 
     Args:
         query: The search query
@@ -109,64 +112,139 @@ async def generic_rerank_api(
         f"Rerank request: {len(documents)} documents, model: {model}, format: {response_format}"
     )
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(base_url, headers=headers, json=payload) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                content_type = response.headers.get("content-type", "").lower()
-                is_html_error = (
-                    error_text.strip().startswith("<!DOCTYPE html>")
-                    or "text/html" in content_type
-                )
-                if is_html_error:
-                    if response.status == 502:
-                        clean_error = "Bad Gateway (502) - Rerank service temporarily unavailable. Please try again in a few minutes."
-                    elif response.status == 503:
-                        clean_error = "Service Unavailable (503) - Rerank service is temporarily overloaded. Please try again later."
-                    elif response.status == 504:
-                        clean_error = "Gateway Timeout (504) - Rerank service request timed out. Please try again."
-                    else:
-                        clean_error = f"HTTP {response.status} - Rerank service error. Please try again later."
+    session = get_aiohttp_session("rerank", base_url, api_key)
+    async with session.post(base_url, headers=headers, json=payload) as response:
+        if response.status != 200:
+            error_text = await response.text()
+            content_type = response.headers.get("content-type", "").lower()
+            is_html_error = (
+                error_text.strip().startswith("<!DOCTYPE html>")
+                or "text/html" in content_type
+            )
+            if is_html_error:
+                if response.status == 502:
+                    clean_error = "Bad Gateway (502) - Rerank service temporarily unavailable. Please try again in a few minutes."
+                elif response.status == 503:
+                    clean_error = "Service Unavailable (503) - Rerank service is temporarily overloaded. Please try again later."
+                elif response.status == 504:
+                    clean_error = "Gateway Timeout (504) - Rerank service request timed out. Please try again."
                 else:
-                    clean_error = error_text
-                logger.error(f"Rerank API error {response.status}: {clean_error}")
-                raise aiohttp.ClientResponseError(
-                    request_info=response.request_info,
-                    history=response.history,
-                    status=response.status,
-                    message=f"Rerank API error: {clean_error}",
+                    clean_error = f"HTTP {response.status} - Rerank service error. Please try again later."
+            else:
+                clean_error = error_text
+            logger.error(f"Rerank API error {response.status}: {clean_error}")
+            raise aiohttp.ClientResponseError(
+                request_info=response.request_info,
+                history=response.history,
+                status=response.status,
+                message=f"Rerank API error: {clean_error}",
+            )
+
+        response_json = await response.json()
+
+        if response_format == "aliyun":
+            # Aliyun format: {"output": {"results": [...]}}
+            results = response_json.get("output", {}).get("results", [])
+            if not isinstance(results, list):
+                logger.warning(
+                    f"Expected 'output.results' to be list, got {type(results)}: {results}"
                 )
+                results = []
+
+        elif response_format == "standard":
+            # Standard format: {"results": [...]}
+            results = response_json.get("results", [])
+            if not isinstance(results, list):
+                logger.warning(
+                    f"Expected 'results' to be list, got {type(results)}: {results}"
+                )
+                results = []
+        else:
+            raise ValueError(f"Unsupported response format: {response_format}")
+        if not results:
+            logger.warning("Rerank API returned empty results")
+            return []
+
+        # Standardize return format
+        return [
+            {"index": result["index"], "relevance_score": result["relevance_score"]}
+            for result in results
+        ]
 
-            response_json = await response.json()
-
-            if response_format == "aliyun":
-                # Aliyun format: {"output": {"results": [...]}}
-                results = response_json.get("output", {}).get("results", [])
-                if not isinstance(results, list):
-                    logger.warning(
-                        f"Expected 'output.results' to be list, got {type(results)}: {results}"
-                    )
-                    results = []
-
-            elif response_format == "standard":
-                # Standard format: {"results": [...]}
-                results = response_json.get("results", [])
-                if not isinstance(results, list):
-                    logger.warning(
-                        f"Expected 'results' to be list, got {type(results)}: {results}"
-                    )
-                    results = []
-            else:
-                raise ValueError(f"Unsupported response format: {response_format}")
-            if not results:
-                logger.warning("Rerank API returned empty results")
-                return []
 
-            # Standardize return format
-            return [
-                {"index": result["index"], "relevance_score": result["relevance_score"]}
-                for result in results
-            ]
+async def generic_rerank_api(
+    query: str,
+    documents: List[str],
+    model: str,
+    base_url: str,
+    api_key: Optional[str],
+    top_n: Optional[int] = None,
+    return_documents: Optional[bool] = None,
+    extra_body: Optional[Dict[str, Any]] = None,
+    response_format: str = "standard",  # "standard" (Jina/Cohere) or "aliyun"
+    request_format: str = "standard",  # "standard" (Jina/Cohere) or "aliyun"
+    shard_size: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Generic rerank API call for Jina/Cohere/Aliyun models.
+
+    Candidate sets larger than shard_size are split into shards reranked by
+    concurrent requests; the shard results are merged by relevance score. Scores of
+    cross-encoder rerankers do not depend on the other documents of a request, so
+    the merged ranking matches a single request.
+
+    Args:
+        query: The search query
+        documents: List of strings to rerank
+        model: Model name to use
+        base_url: API endpoint URL
+        api_key: API key for authentication
+        top_n: Number of top results to return
+        return_documents: Whether to return document text (Jina only)
+        extra_body: Additional body parameters
+        response_format: Response format type ("standard" for Jina/Cohere, "aliyun" for Aliyun)
+        request_format: Request format type ("standard" for Jina/Cohere, "aliyun" for Aliyun)
+        shard_size: Documents per request, defaults to RERANK_SHARD_SIZE (0: no sharding)
+
+    Returns:
+        List of dictionary of ["index": int, "relevance_score": float]
+    """
+    if shard_size is None:
+        shard_size = get_env_value("RERANK_SHARD_SIZE", DEFAULT_RERANK_SHARD_SIZE, int)
+    request = dict(
+        model=model,
+        base_url=base_url,
+        api_key=api_key,
+        top_n=top_n,
+        return_documents=return_documents,
+        extra_body=extra_body,
+        response_format=response_format,
+        request_format=request_format,
+    )
+    if not shard_size or len(documents) <= shard_size:
+        return await _rerank_request(query, documents, **request)
+
+    # The global top_n is among the top_n of the shards
+    offsets = range(0, len(documents), shard_size)
+    shard_results = await asyncio.gather(
+        *[
+            _rerank_request(query, documents[offset : offset + shard_size], **request)
+            for offset in offsets
+        ]
+    )
+    merged = [
+        {
+            "index": offset + result["index"],
+            "relevance_score": result["relevance_score"],
+        }
+        for offset, results in zip(offsets, shard_results)
+        for result in results
+    ]
+    merged.sort(key=lambda result: result["relevance_score"], reverse=True)
+    logger.debug(
+        f"Rerank: {len(documents)} documents in {len(offsets)} shards of {shard_size}"
+    )
+    return merged[:top_n] if top_n else merged
 
 
 async def cohere_rerank(
@@ -290,6 +368,70 @@ async def ali_rerank(
     )
 
 
+async def local_rerank(
+    query: str,
+    documents: List[str],
+    top_n: Optional[int] = None,
+    model: Optional[str] = None,
+    max_candidates: Optional[int] = None,
+    batch_size: int = 32,
+    max_length: int = 512,
+    **kwargs,
+) -> List[Dict[str, Any]]:
+    """
+    Rerank documents with a local cross-encoder on CPU (ONNX Runtime).
+
+    Pairs are batched by length and scored on a thread pool, so reranking works
+    offline and its latency only depends on the number of candidates, which is
+    capped at max_candidates: candidates beyond the cap (in retrieval order) are
+    not scored and dropped from the results.
+
+    Args:
+        query: The search query
+        documents: List of strings to rerank
+        top_n: Number of top results to return
+        model: Directory of the exported cross-encoder, see lightrag/llm/onnx.py
+        max_candidates: Maximum documents scored, defaults to RERANK_MAX_CANDIDATES
+            (0: no cap)
+        batch_size: Pairs per ONNX session run
+        max_length: Pairs are truncated to this many tokens
+        **kwargs: Remote binding parameters (api_key, base_url, extra_body), ignored
+
+    Returns:
+        List of dictionary of ["index": int, "relevance_score": float]
+    """
+    from lightrag.llm.onnx import onnx_rerank
+
+    model = model or os.getenv("RERANK_MODEL")
+    if not model:
+        raise ValueError("RERANK_MODEL must point to a local cross-encoder model")
+    if max_candidates is None:
+        max_candidates = get_env_value(
+            "RERANK_MAX_CANDIDATES", DEFAULT_RERANK_MAX_CANDIDATES, int
+        )
+    if max_candidates and len(documents) > max_candidates:
+        logger.debug(
+            f"Local rerank: scoring {max_candidates} of {len(documents)} candidates"
+        )
+        documents = documents[:max_candidates]
+
+    return await onnx_rerank(
+        query=query,
+        documents=documents,
+        model=model,
+        top_n=top_n,
+        batch_size=batch_size,
+        max_length=max_length,
+    )
+
+
+# Read by apply_rerank_if_enabled, which caps the candidates before the rerank
+# score cache so that cache hits cannot let more candidates through
+local_rerank.max_candidates = get_env_value(
+    "RERANK_MAX_CANDIDATES", DEFAULT_RERANK_MAX_CANDIDATES, int
+)
+
+
 """Please run this test as a module:
 python -m lightrag.rerank
 """
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark local CPU embedding: ONNX Runtime (onnx_embed) against hf_embed.
+
+Embeds the same texts with a Hugging Face model through hf_embed (PyTorch) and
+with its ONNX export through onnx_embed, and reports texts per second of each and
+the cosine similarity between their embeddings. Texts are synthetic chunks of
+mixed lengths, or the lines of a file.
+
+Both sides mean-pool: onnx_embed over the attention mask, hf_embed also over the
+padding tokens, so their vectors only match closely for batches of texts of similar
+length; run with --batch-size 1 to check agreement.
+
+Usage:
+    python -m lightrag.tools.benchmark_local_embedding --hf-model BAAI/bge-small-en-v1.5 --onnx-model ./bge-small-onnx
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+WORDS = (
+    "graph entity relation chunk document query vector index embedding retrieval "
+    "knowledge model token batch latency storage workspace keyword summary context"
+).split()
+
+
+def make_texts(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    # Mix of short keywords, entity descriptions and full chunks
+    lengths = [rng.choice([4, 30, 120, 400]) for _ in range(count)]
+    return [" ".join(rng.choices(WORDS, k=length)) for length in lengths]
+
+
+async def timed(embed, texts: list[str], batch_size: int) -> tuple[np.ndarray, float]:
+    start = time.perf_counter()
+    parts = [
+        await embed(texts[i : i + batch_size]) for i in range(0, len(texts), batch_size)
+    ]
+    return np.vstack(parts), time.perf_counter() - start
+
+
+def normalized(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+async def run_benchmark(
+    hf_model: str, onnx_model: str, texts: list[str], batch_size: int
+) -> None:
+    from transformers import AutoModel, AutoTokenizer
+
+    from lightrag.llm.hf import hf_embed
+    from lightrag.llm.onnx import onnx_embed
+
+    tokenizer = AutoTokenizer.from_pretrained(hf_model)
+    model = AutoModel.from_pretrained(hf_model)
+
+    async def hf(batch):
+        return await hf_embed(batch, tokenizer=tokenizer, embed_model=model)
+
+    async def onnx(batch):
+        return await onnx_embed(
+            batch, model=onnx_model, batch_size=batch_size, pooling="mean"
+        )
+
+    # Warm up both models
+    await hf(texts[:2])
+    await onnx(texts[:2])
+
+    print(f"{len(texts)} texts, batch size {batch_size}")
+    hf_vectors, hf_time = await timed(hf, texts, batch_size)
+    print(f"  hf_embed    {hf_time:8.2f}s  {len(texts) / hf_time:10.1f} texts/s")
+    onnx_vectors, onnx_time = await timed(onnx, texts, batch_size)
+    print(f"  onnx_embed  {onnx_time:8.2f}s  {len(texts) / onnx_time:10.1f} texts/s")
+    print(f"  speedup     {hf_time / onnx_time:8.2f}x")
+
+    similarity = (normalized(hf_vectors) * normalized(onnx_vectors)).sum(axis=1)
+    print(
+        f"  cosine(hf, onnx)  mean {similarity.mean():.4f}  min {similarity.min():.4f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark ONNX Runtime embedding against hf_embed on CPU"
+    )
+    parser.add_argument("--hf-model", required=True, help="Hugging Face model name")
+    parser.add_argument(
+        "--onnx-model", required=True, help="ONNX export directory or .onnx file"
+    )
+    parser.add_argument("--texts", type=int, default=256, help="Synthetic texts")
+    parser.add_argument("--file", help="Embed the lines of this file instead")
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = make_texts(args.texts)
+    asyncio.run(run_benchmark(args.hf_model, args.onnx_model, texts, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
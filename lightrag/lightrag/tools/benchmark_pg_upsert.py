@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark PostgreSQL upsert throughput for LightRAG tables.
+
+Compares row-by-row upserts with batched executemany upserts at several batch
+sizes, using the same SQL templates as PGKVStorage and PGVectorStorage. Use it to
+pick POSTGRES_UPSERT_BATCH_SIZE for your database and network latency.
+
+Connection settings are read like the PostgreSQL storages do (POSTGRES_* env
+vars or config.ini). Rows are written to a dedicated workspace that is deleted
+when the benchmark finishes.
+
+Usage:
+    python -m lightrag.tools.benchmark_pg_upsert --rows 2000 --batch-sizes 50,200,500,1000
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import time
+from datetime import timezone
+
+import numpy as np
+
+from lightrag.kg.postgres_impl import ClientManager, SQL_TEMPLATES
+
+BENCHMARK_WORKSPACE = "lightrag_upsert_benchmark"
+
+
+def make_rows(table: str, count: int, run: str) -> list[dict]:
+    current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+    embedding_dim = int(os.environ.get("EMBEDDING_DIM", 1024))
+    rows = []
+    for i in range(count):
+        row = {
+            "workspace": BENCHMARK_WORKSPACE,
+            "id": f"{run}-{i}",
+            "tokens": 1200,
+            "chunk_order_index": i,
+            "full_doc_id": f"doc-{run}",
+            "content": "lorem ipsum " * 400,
+        }
+        if table == "chunks":
+            row["content_vector"] = json.dumps(
+                np.random.rand(embedding_dim).astype(np.float32).tolist()
+            )
+            row["file_path"] = "benchmark.txt"
+        else:
+            row["file_path"] = "benchmark.txt"
+            row["llm_cache_list"] = "[]"
+        row["create_time"] = current_time
+        row["update_time"] = current_time
+        rows.append(row)
+    return rows
+
+
+async def run_benchmark(rows: int, batch_sizes: list[int]) -> None:
+    db = await ClientManager.get_client()
+    templates = {
+        "text_chunks": ("upsert_text_chunk", "LIGHTRAG_DOC_CHUNKS"),
+        "chunks": ("upsert_chunk", "LIGHTRAG_VDB_CHUNKS"),
+    }
+    try:
+        for table, (template, table_name) in templates.items():
+            sql = SQL_TEMPLATES[template]
+            print(f"\n{table_name}: {rows} rows")
+
+            data = make_rows(table, rows, "row")
+            start = time.perf_counter()
+            for row in data:
+                await db.execute(sql, row)
+            elapsed = time.perf_counter() - start
+            print(f"  row by row        {elapsed:8.2f}s  {rows / elapsed:10.0f} rows/s")
+
+            for batch_size in batch_sizes:
+                data = make_rows(table, rows, f"batch{batch_size}")
+                start = time.perf_counter()
+                await db.executemany(sql, data, batch_size=batch_size)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"  batch size {batch_size:<6} {elapsed:8.2f}s  {rows / elapsed:10.0f} rows/s"
+                )
+
+            await db.execute(
+                SQL_TEMPLATES["drop_specifiy_table_workspace"].format(
+                    table_name=table_name
+                ),
+                {"workspace": BENCHMARK_WORKSPACE},
+            )
+    finally:
+        await ClientManager.release_client(db)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark PostgreSQL upsert throughput for LightRAG tables"
+    )
+    parser.add_argument("--rows", type=int, default=2000, help="Rows per run")
+    parser.add_argument(
+        "--batch-sizes",
+        default="50,200,500,1000",
+        help="Comma separated executemany batch sizes to compare",
+    )
+    args = parser.parse_args()
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+    asyncio.run(run_benchmark(args.rows, batch_sizes))
+
+
+if __name__ == "__main__":
+    main()
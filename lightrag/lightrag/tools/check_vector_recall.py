@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Check the recall of vector quantization on an existing NanoVectorDB file.
+
+Loads a vdb_*.json file written by NanoVectorDBStorage, searches it exactly and
+with a quantized copy, and reports recall@k of the quantized scores alone and
+after re-ranking the top_k * rerank_factor candidates at float precision, next to
+the memory used by the float32 matrix and by the codes. Queries are stored
+vectors with a little noise added. The file is only read.
+
+Use it to pick the quantization settings of a namespace before enabling them in
+vector_db_storage_cls_kwargs (see lightrag/kg/vector_quantization.py).
+
+Usage:
+    python -m lightrag.tools.check_vector_recall ./rag_storage/vdb_chunks.json --type pq --m 64 --rerank-factor 8
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+from nano_vectordb import NanoVectorDB
+
+from lightrag.kg.nano_vector_db_impl import QuantizedNanoVectorDB
+from lightrag.kg.vector_quantization import create_quantizer
+
+
+def recall(found: list[np.ndarray], expected: list[np.ndarray]) -> float:
+    hits = sum(len(np.intersect1d(f, e)) for f, e in zip(found, expected))
+    return hits / max(1, sum(len(e) for e in expected))
+
+
+def check_recall(
+    file: str,
+    kind: str,
+    m: int | None,
+    rerank_factor: int,
+    num_queries: int,
+    top_k: int,
+    noise: float,
+) -> None:
+    with open(file, encoding="utf-8") as f:
+        embedding_dim = json.load(f)["embedding_dim"]
+
+    exact = NanoVectorDB(embedding_dim, storage_file=file)
+    storage = getattr(exact, "_NanoVectorDB__storage")
+    matrix = storage["matrix"]
+    config = {"type": kind, "rerank_factor": rerank_factor}
+    if m is not None:
+        config["m"] = m
+    start = time.perf_counter()
+    quantized = QuantizedNanoVectorDB(
+        embedding_dim,
+        storage_file=file,
+        quantizer=create_quantizer(config, embedding_dim),
+        rerank_factor=rerank_factor,
+    )
+    print(
+        f"{len(matrix)} vectors of dimension {embedding_dim}, "
+        f"{kind} quantizer trained in {time.perf_counter() - start:.2f}s"
+    )
+    if len(matrix) == 0:
+        return
+
+    rng = np.random.default_rng(0)
+    picks = rng.choice(len(matrix), min(num_queries, len(matrix)), replace=False)
+    queries = matrix[picks] + rng.normal(0, noise, (len(picks), embedding_dim))
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(
+        np.float32
+    )
+    k = min(top_k, len(matrix))
+
+    expected = [np.argpartition(-(matrix @ q), k - 1)[:k] for q in queries]
+
+    ids = {record["__id__"]: i for i, record in enumerate(storage["data"])}
+    codes_only = []
+    reranked = []
+    elapsed = 0.0
+    for q in queries:
+        approx = quantized.quantizer.scores(quantized._codes, q)
+        codes_only.append(np.argpartition(-approx, k - 1)[:k])
+        start = time.perf_counter()
+        results = quantized.search(q, k)
+        elapsed += time.perf_counter() - start
+        reranked.append(np.array([ids[r["__id__"]] for r in results]))
+
+    print(f"float32 matrix       {matrix.nbytes / 2**20:10.2f} MiB")
+    print(f"{kind} codes          {quantized.code_bytes / 2**20:10.2f} MiB")
+    print(f"recall@{k} codes only  {recall(codes_only, expected):10.4f}")
+    print(f"recall@{k} re-ranked   {recall(reranked, expected):10.4f}")
+    print(f"re-ranked search     {elapsed / len(queries) * 1000:10.2f} ms/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the recall of vector quantization on a NanoVectorDB file"
+    )
+    parser.add_argument("file", help="vdb_*.json file written by NanoVectorDBStorage")
+    parser.add_argument("--type", choices=["int8", "pq"], default="int8")
+    parser.add_argument(
+        "--m", type=int, default=None, help="PQ sub-vectors, defaults to dim / 16"
+    )
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--noise", type=float, default=0.01, help="Noise added to the query vectors"
+    )
+    args = parser.parse_args()
+    check_recall(
+        args.file,
+        args.type,
+        args.m,
+        args.rerank_factor,
+        args.queries,
+        args.top_k,
+        args.noise,
+    )
+
+
+if __name__ == "__main__":
+    main()
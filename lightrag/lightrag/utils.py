@@ -11,6 +11,7 @@ import os
 import re
 import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from functools import wraps
@@ -341,11 +342,190 @@ class EmbeddingFunc:
     embedding_dim: int
     func: callable
     max_token_size: int | None = None  # deprecated keep it for compatible only
+    # Leading dimensions searched in a first pass by vector storages supporting it,
+    # for models trained to allow truncation (Matryoshka); None searches all dimensions
+    truncate_dim: int | None = None
+    # Model identity, shared by the instances embedding with the same model
+    model_name: str | None = None
 
     async def __call__(self, *args, **kwargs) -> np.ndarray:
         return await self.func(*args, **kwargs)
 
 
+def micro_batched(func, batch_size: int, max_wait: float):
+    """Coalesce concurrent embedding calls into batches of up to batch_size texts
+
+    Calls with fewer than batch_size texts wait up to max_wait seconds for other
+    calls with the same keyword arguments (priority included); their texts are then
+    embedded in a single call and the result rows are scattered back to the callers.
+    Larger calls are passed through. An error of the batch call is raised to every
+    caller of the batch.
+    """
+    # (loop id, kwargs key) -> pending batch
+    pending: dict[tuple, dict[str, Any]] = {}
+    # Strong references to the running batch calls
+    running: set[asyncio.Task] = set()
+
+    async def run_batch(batch: dict[str, Any]) -> None:
+        waiters = [w for w in batch["waiters"] if not w[0].done()]
+        if not waiters:
+            return
+        texts = [text for _, chunk in waiters for text in chunk]
+        try:
+            embeddings = await func(texts, **batch["kwargs"])
+            if len(embeddings) != len(texts):
+                raise ValueError(
+                    f"Embedding batch returned {len(embeddings)} vectors for {len(texts)} texts"
+                )
+        except Exception as e:
+            for future, _ in waiters:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        start = 0
+        for future, chunk in waiters:
+            if not future.done():
+                future.set_result(embeddings[start : start + len(chunk)])
+            start += len(chunk)
+
+    def flush(key: tuple) -> None:
+        batch = pending.pop(key, None)
+        if batch is None:
+            return
+        if batch["timer"] is not None:
+            batch["timer"].cancel()
+        task = asyncio.create_task(run_batch(batch))
+        running.add(task)
+        task.add_done_callback(running.discard)
+
+    @wraps(func)
+    async def wrapper(texts, **kwargs):
+        texts = list(texts)
+        if len(texts) >= batch_size:
+            return await func(texts, **kwargs)
+        loop = asyncio.get_running_loop()
+        key = (id(loop), repr(sorted(kwargs.items())))
+        batch = pending.get(key)
+        if batch is not None and batch["size"] + len(texts) > batch_size:
+            flush(key)
+            batch = None
+        if batch is None:
+            batch = pending[key] = {
+                "kwargs": kwargs,
+                "waiters": [],
+                "size": 0,
+                "timer": loop.call_later(max_wait, flush, key),
+            }
+        future = loop.create_future()
+        batch["waiters"].append((future, texts))
+        batch["size"] += len(texts)
+        if batch["size"] >= batch_size:
+            flush(key)
+        return await future
+
+    return wrapper
+
+
+class EmbeddingStore:
+    """Bounded LRU store of embeddings keyed by the hash of the embedded text
+
+    Shared by all vector storages of a LightRAG instance, so that a text embedded
+    for one namespace (an entity description, a relation keyword) or embedded again
+    on merge is served from memory. Texts being embedded are tracked in in_flight:
+    a concurrent call for the same text waits for that result instead of sending it
+    to the provider a second time.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._vectors: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.in_flight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> np.ndarray | None:
+        vector = self._vectors.get(key)
+        if vector is not None:
+            self._vectors.move_to_end(key)
+        return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        self._vectors[key] = vector
+        self._vectors.move_to_end(key)
+        while len(self._vectors) > self.max_entries:
+            self._vectors.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._vectors), "hits": self.hits, "misses": self.misses}
+
+
+def content_hash_cached(func, store: EmbeddingStore):
+    """Serve the texts of embedding calls found in the store, embed only the others
+
+    Texts are keyed by their content hash and the keyword arguments of the call
+    other than the queue controls (_priority, _timeout), duplicates within a call
+    are embedded once.
+    """
+
+    async def embed(missing: dict[str, str], kwargs) -> dict[str, np.ndarray]:
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in missing}
+        store.in_flight.update(futures)
+        try:
+            embeddings = await func(list(missing.values()), **kwargs)
+            vectors = {}
+            for key, vector in zip(missing, embeddings):
+                vectors[key] = np.asarray(vector, dtype=np.float32)
+                store.put(key, vectors[key])
+                futures[key].set_result(vectors[key])
+            return vectors
+        finally:
+            for key, future in futures.items():
+                store.in_flight.pop(key, None)
+                # Concurrent callers waiting for a failed call embed the text themselves
+                if not future.done():
+                    future.cancel()
+
+    @wraps(func)
+    async def wrapper(texts, **kwargs):
+        texts = list(texts)
+        options = repr(
+            sorted((k, v) for k, v in kwargs.items() if not k.startswith("_"))
+        )
+        keys = [compute_args_hash(options, text) for text in texts]
+        vectors: dict[str, np.ndarray] = {}
+        waiting: dict[str, asyncio.Future] = {}
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in waiting or key in missing:
+                continue
+            vector = store.get(key)
+            if vector is not None:
+                vectors[key] = vector
+            elif key in store.in_flight:
+                waiting[key] = store.in_flight[key]
+            else:
+                missing[key] = text
+        store.hits += len(texts) - len(missing)
+        store.misses += len(missing)
+
+        if missing:
+            vectors.update(await embed(missing, kwargs))
+        retry: dict[str, str] = {}
+        for key, future in waiting.items():
+            try:
+                vectors[key] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                retry[key] = texts[keys.index(key)]
+        if retry:
+            vectors.update(await embed(retry, kwargs))
+        return np.array([vectors[key] for key in keys])
+
+    return wrapper
+
+
 def compute_args_hash(*args: Any) -> str:
     """Compute a hash for the given arguments with safe Unicode handling.
 
@@ -432,6 +612,112 @@ class HealthCheckTimeoutError(Exception):
         )
 
 
+# Calls with this priority or a lower value are made while answering queries
+QUERY_PRIORITY = 5
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an exception reports HTTP 429 / a provider rate limit"""
+    if type(error).__name__ == "RateLimitError":
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    return status == 429
+
+
+def get_retry_after(error: BaseException) -> float | None:
+    """Seconds to wait before retrying, from the Retry-After headers of an error"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class AdaptiveConcurrencyLimit:
+    """AIMD concurrency limit of a priority_limit_async_func_call queue
+
+    The limit grows by one after each limit's worth of successful calls, and is
+    multiplied by backoff_ratio when a call fails, is rate limited, or when the
+    recent latency exceeds latency_tolerance times the long-run latency. The limit
+    is decreased at most once per recent latency, so that the failures of calls
+    started under the previous limit do not decrease it again. A Retry-After hint of
+    a rate limited call also holds back new calls until it expires.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        backoff_ratio: float = 0.7,
+        latency_tolerance: float = 2.0,
+    ):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        # Start in the middle and probe upwards
+        self._limit = float(max(self.min_limit, (self.max_limit + 1) // 2))
+        self._successes = 0
+        self.latency_warmup = 20
+        self._samples = 0
+        self._recent_latency: float | None = None
+        self._baseline_latency: float | None = None
+        self._last_decrease = float("-inf")
+        self.paused_until = 0.0
+        self.rate_limited_count = 0
+        self.error_count = 0
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    def on_success(self, latency: float, now: float) -> None:
+        self._samples += 1
+        if self._recent_latency is None:
+            self._recent_latency = self._baseline_latency = latency
+        elif self._samples <= self.latency_warmup:
+            # Calls differ in size (query and background lanes), average a few first
+            self._recent_latency = 0.7 * self._recent_latency + 0.3 * latency
+            self._baseline_latency += (latency - self._baseline_latency) / self._samples
+        else:
+            self._recent_latency = 0.7 * self._recent_latency + 0.3 * latency
+            self._baseline_latency = 0.98 * self._baseline_latency + 0.02 * latency
+        if (
+            self._samples > self.latency_warmup
+            and self._recent_latency > self.latency_tolerance * self._baseline_latency
+        ):
+            self._decrease(now)
+            return
+        self._successes += 1
+        if self._successes >= self.limit:
+            self._successes = 0
+            self._limit = min(float(self.max_limit), self._limit + 1)
+
+    def on_error(self, error: BaseException, now: float) -> None:
+        if is_rate_limit_error(error):
+            self.rate_limited_count += 1
+            retry_after = get_retry_after(error)
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+        else:
+            self.error_count += 1
+        self._decrease(now)
+
+    def _decrease(self, now: float) -> None:
+        if now - self._last_decrease < (self._recent_latency or 0.0):
+            return
+        self._last_decrease = now
+        self._successes = 0
+        self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+
+
 def priority_limit_async_func_call(
     max_size: int,
     llm_timeout: float = None,
@@ -440,6 +726,9 @@ def priority_limit_async_func_call(
     max_queue_size: int = 1000,
     cleanup_timeout: float = 2.0,
     queue_name: str = "limit_async",
+    adaptive: bool = False,
+    min_size: int = 1,
+    reserved_query_size: int = 0,
 ):
     """
     Enhanced priority-limited asynchronous function call decorator with robust timeout handling
@@ -450,6 +739,16 @@ def priority_limit_async_func_call(
     - Enhanced health check system with stuck task detection
     - Proper resource cleanup and error recovery
 
+    In adaptive mode the number of concurrent calls follows an AdaptiveConcurrencyLimit
+    between min_size and max_size, driven by call latency, errors and rate limits.
+
+    With reserved_query_size, calls with a priority of QUERY_PRIORITY or lower get a
+    queue of their own and reserved_query_size of the concurrent calls are kept for
+    them, so that queries are not held back by background work filling the queue.
+
+    wait_func.stats() reports the current limit, and the running calls, queue depth
+    and queue wait times of the query and background lanes.
+
     Args:
         max_size: Maximum number of concurrent calls
         max_queue_size: Maximum queue capacity to prevent memory overflow
@@ -458,6 +757,9 @@ def priority_limit_async_func_call(
         max_task_duration: Maximum time before health check intervenes (defaults to llm_timeout + 60s)
         cleanup_timeout: Maximum time to wait for cleanup operations (defaults to 2.0s)
         queue_name: Optional queue name for logging identification (defaults to "limit_async")
+        adaptive: Adjust the number of concurrent calls to the observed latency and errors
+        min_size: Lowest concurrency the adaptive limit may decrease to
+        reserved_query_size: Concurrent calls only query priority calls may use
 
     Returns:
         Decorator function
@@ -482,6 +784,128 @@ def priority_limit_async_func_call(
 
         queue = asyncio.PriorityQueue(maxsize=max_queue_size)
         tasks = set()
+
+        # Query priority calls get a queue of their own when slots are reserved for
+        # them, so that a queue filled by ingestion does not hold them back
+        reserved = max(0, min(reserved_query_size, max_size - 1))
+        query_queue = (
+            asyncio.PriorityQueue(maxsize=max_queue_size) if reserved else queue
+        )
+
+        # The adaptive limit caps the workers taking tasks from the queue, max_size
+        # workers are started so that the limit can grow up to max_size
+        limiter = AdaptiveConcurrencyLimit(max_size, min_size) if adaptive else None
+        gated = limiter is not None or query_queue is not queue
+        gate = asyncio.Condition()
+        slots_taken = 0
+
+        def lane_of(priority) -> str:
+            return "query" if priority <= QUERY_PRIORITY else "background"
+
+        # Per lane counts and queue wait times (submission to start of execution)
+        lane_stats = {
+            lane: {
+                "queued": 0,
+                "running": 0,
+                "started": 0,
+                "avg_wait": 0.0,
+                "max_wait": 0.0,
+            }
+            for lane in ("query", "background")
+        }
+
+        def record_wait(lane: str, wait: float) -> None:
+            stats = lane_stats[lane]
+            stats["queued"] -= 1
+            stats["started"] += 1
+            stats["avg_wait"] = (
+                wait if stats["started"] == 1 else 0.9 * stats["avg_wait"] + 0.1 * wait
+            )
+            stats["max_wait"] = max(stats["max_wait"], wait)
+
+        def current_limit() -> int:
+            return limiter.limit if limiter is not None else max_size
+
+        async def take_task():
+            """Wait for a free slot and take the next task allowed to use it
+
+            Query priority tasks may use every slot, the other tasks all but the
+            reserved ones. Returns (source queue, item), None on timeout.
+            """
+            nonlocal slots_taken
+            async with gate:
+                while True:
+                    now = asyncio.get_event_loop().time()
+                    paused_until = limiter.paused_until if limiter is not None else 0.0
+                    limit = current_limit()
+                    if now >= paused_until and slots_taken < limit:
+                        source = None
+                        if not query_queue.empty():
+                            source = query_queue
+                        elif not queue.empty() and lane_stats["background"][
+                            "running"
+                        ] < max(1, limit - reserved):
+                            source = queue
+                        if source is not None:
+                            item = source.get_nowait()
+                            slots_taken += 1
+                            lane_stats[lane_of(item[0])]["running"] += 1
+                            return source, item
+                    # Wake up at the end of a Retry-After pause, or to check shutdown
+                    wait = min(1.0, max(0.0, paused_until - now)) or 1.0
+                    try:
+                        await asyncio.wait_for(gate.wait(), wait)
+                    except asyncio.TimeoutError:
+                        if shutdown_event.is_set():
+                            return None
+
+        async def release_slot(lane: str, error=None, latency: float | None = None):
+            """Free a slot, feeding the outcome of a call to the limiter"""
+            nonlocal slots_taken
+            lane_stats[lane]["running"] -= 1
+            if not gated:
+                return
+            slots_taken -= 1
+            async with gate:
+                if limiter is not None and latency is not None:
+                    previous = limiter.limit
+                    now = asyncio.get_event_loop().time()
+                    if error is None:
+                        limiter.on_success(latency, now)
+                    else:
+                        limiter.on_error(error, now)
+                    if limiter.limit < previous:
+                        logger.info(
+                            f"{queue_name}: Concurrency limit decreased {previous} -> {limiter.limit}"
+                        )
+                    elif limiter.limit > previous:
+                        logger.debug(
+                            f"{queue_name}: Concurrency limit increased {previous} -> {limiter.limit}"
+                        )
+                gate.notify_all()
+
+        def stats() -> dict[str, Any]:
+            """Current concurrency limit, running calls and queue depth per lane"""
+            return {
+                "queue_name": queue_name,
+                "adaptive": limiter is not None,
+                "limit": current_limit(),
+                "max_limit": max_size,
+                "reserved_for_query": reserved,
+                "running": sum(lane["running"] for lane in lane_stats.values()),
+                "queued": sum(lane["queued"] for lane in lane_stats.values()),
+                "lanes": {
+                    name: {
+                        **lane,
+                        "avg_wait": round(lane["avg_wait"], 3),
+                        "max_wait": round(lane["max_wait"], 3),
+                    }
+                    for name, lane in lane_stats.items()
+                },
+                "rate_limited": limiter.rate_limited_count if limiter else 0,
+                "errors": limiter.error_count if limiter else 0,
+            }
+
         initialization_lock = asyncio.Lock()
         counter = 0
         shutdown_event = asyncio.Event()
@@ -496,25 +920,42 @@ def priority_limit_async_func_call(
 
         async def worker():
             """Enhanced worker that processes tasks with proper timeout and state management"""
+            nonlocal slots_taken
+            holding_lane = None
             try:
                 while not shutdown_event.is_set():
                     try:
                         # Get task from queue with timeout for shutdown checking
-                        try:
-                            (
-                                priority,
-                                count,
-                                task_id,
-                                args,
-                                kwargs,
-                            ) = await asyncio.wait_for(queue.get(), timeout=1.0)
-                        except asyncio.TimeoutError:
-                            continue
+                        source = queue
+                        if gated:
+                            # Take a slot first so that tasks leave the queues in priority order
+                            taken = await take_task()
+                            if taken is None:
+                                continue
+                            source, (priority, count, task_id, args, kwargs) = taken
+                            holding_lane = lane_of(priority)
+                        else:
+                            try:
+                                (
+                                    priority,
+                                    count,
+                                    task_id,
+                                    args,
+                                    kwargs,
+                                ) = await asyncio.wait_for(queue.get(), timeout=1.0)
+                            except asyncio.TimeoutError:
+                                continue
+                            holding_lane = lane_of(priority)
+                            lane_stats[holding_lane]["running"] += 1
+                        lane = lane_of(priority)
 
                         # Get task state and mark worker as started
                         async with task_states_lock:
                             if task_id not in task_states:
-                                queue.task_done()
+                                lane_stats[lane]["queued"] -= 1
+                                source.task_done()
+                                holding_lane = None
+                                await release_slot(lane)
                                 continue
                             task_state = task_states[task_id]
                             task_state.worker_started = True
@@ -522,6 +963,10 @@ def priority_limit_async_func_call(
                             task_state.execution_start_time = (
                                 asyncio.get_event_loop().time()
                             )
+                        record_wait(
+                            lane,
+                            task_state.execution_start_time - task_state.start_time,
+                        )
 
                         # Check if task was cancelled before worker started
                         if (
@@ -530,9 +975,13 @@ def priority_limit_async_func_call(
                         ):
                             async with task_states_lock:
                                 task_states.pop(task_id, None)
-                            queue.task_done()
+                            source.task_done()
+                            holding_lane = None
+                            await release_slot(lane)
                             continue
 
+                        call_error = None
+                        call_start = asyncio.get_event_loop().time()
                         try:
                             # Execute function with timeout protection
                             if max_execution_timeout is not None:
@@ -546,7 +995,8 @@ def priority_limit_async_func_call(
                             if not task_state.future.done():
                                 task_state.future.set_result(result)
 
-                        except asyncio.TimeoutError:
+                        except asyncio.TimeoutError as e:
+                            call_error = e
                             # Worker-level timeout (max_execution_timeout exceeded)
                             logger.warning(
                                 f"{queue_name}: Worker timeout for task {task_id} after {max_execution_timeout}s"
@@ -565,6 +1015,7 @@ def priority_limit_async_func_call(
                                 f"{queue_name}: Task {task_id} cancelled during execution"
                             )
                         except Exception as e:
+                            call_error = e
                             # Function execution error
                             logger.error(
                                 f"{queue_name}: Error in decorated function for task {task_id}: {str(e)}"
@@ -572,10 +1023,16 @@ def priority_limit_async_func_call(
                             if not task_state.future.done():
                                 task_state.future.set_exception(e)
                         finally:
+                            holding_lane = None
+                            await release_slot(
+                                lane,
+                                call_error,
+                                asyncio.get_event_loop().time() - call_start,
+                            )
                             # Clean up task state
                             async with task_states_lock:
                                 task_states.pop(task_id, None)
-                            queue.task_done()
+                            source.task_done()
 
                     except Exception as e:
                         # Critical error in worker loop
@@ -584,6 +1041,11 @@ def priority_limit_async_func_call(
                         )
                         await asyncio.sleep(0.1)
             finally:
+                if holding_lane is not None:
+                    # Worker cancelled while holding a slot
+                    if gated:
+                        slots_taken -= 1
+                    lane_stats[holding_lane]["running"] -= 1
                 logger.debug(f"{queue_name}: Worker exiting")
 
         async def enhanced_health_check():
@@ -733,7 +1195,9 @@ def priority_limit_async_func_call(
 
             # Wait for queue to empty with timeout
             try:
-                await asyncio.wait_for(queue.join(), timeout=5.0)
+                await asyncio.wait_for(
+                    asyncio.gather(queue.join(), query_queue.join()), timeout=5.0
+                )
             except asyncio.TimeoutError:
                 logger.warning(
                     f"{queue_name}: Timeout waiting for queue to empty during shutdown"
@@ -805,18 +1269,24 @@ def priority_limit_async_func_call(
                     counter += 1
 
                 # Queue the task with timeout handling
+                lane = lane_of(_priority)
+                target = query_queue if lane == "query" else queue
                 try:
                     if _queue_timeout is not None:
                         await asyncio.wait_for(
-                            queue.put(
+                            target.put(
                                 (_priority, current_count, task_id, args, kwargs)
                             ),
                             timeout=_queue_timeout,
                         )
                     else:
-                        await queue.put(
+                        await target.put(
                             (_priority, current_count, task_id, args, kwargs)
                         )
+                    lane_stats[lane]["queued"] += 1
+                    if gated:
+                        async with gate:
+                            gate.notify_all()
                 except asyncio.TimeoutError:
                     raise QueueFullError(
                         f"{queue_name}: Queue full, timeout after {_queue_timeout} seconds"
@@ -871,6 +1341,7 @@ def priority_limit_async_func_call(
 
         # Add shutdown method to decorated function
         wait_func.shutdown = shutdown
+        wait_func.stats = stats
 
         return wait_func
 
@@ -1029,6 +1500,106 @@ def cosine_similarity(v1, v2):
     return dot_product / (norm1 * norm2)
 
 
+METADATA_FILTER_RANGE_OPS = ("gt", "gte", "lt", "lte")
+# Fields holding several values joined with GRAPH_FIELD_SEP (merged entities and
+# relations), eq and in conditions match any one of the values
+METADATA_FILTER_MULTI_VALUE_FIELDS = ("file_path",)
+
+
+def metadata_filter_conditions(
+    metadata_filter: dict[str, Any] | None,
+) -> list[tuple[str, str, Any]]:
+    """Normalize QueryParam.metadata_filter into (field, op, value) conditions
+
+    Each field maps to a value (op "eq"), a list, tuple or set of values (op "in"),
+    or a dict of range bounds keyed by gt, gte, lt and lte (one condition per bound).
+    All conditions must hold. The file_path of entities and relations found in
+    several documents joins their paths; eq and in match any one of them.
+    """
+    conditions = []
+    for name, value in (metadata_filter or {}).items():
+        if isinstance(value, dict):
+            if not value or not set(value) <= set(METADATA_FILTER_RANGE_OPS):
+                raise ValueError(
+                    f"Invalid range for metadata filter field '{name}': {value}"
+                )
+            conditions.extend((name, op, bound) for op, bound in value.items())
+        elif isinstance(value, (list, tuple, set)):
+            conditions.append((name, "in", list(value)))
+        else:
+            conditions.append((name, "eq", value))
+    return conditions
+
+
+def match_metadata_filter(
+    record: dict[str, Any], conditions: list[tuple[str, str, Any]]
+) -> bool:
+    """Check a record against conditions from metadata_filter_conditions"""
+    for name, op, value in conditions:
+        field_value = record.get(name)
+        if op in ("eq", "in"):
+            if name in METADATA_FILTER_MULTI_VALUE_FIELDS and isinstance(
+                field_value, str
+            ):
+                field_values = field_value.split(GRAPH_FIELD_SEP)
+            else:
+                field_values = [field_value]
+            accepted = value if op == "in" else [value]
+            matched = any(v in accepted for v in field_values)
+        elif field_value is None:
+            matched = False
+        else:
+            try:
+                if op == "gt":
+                    matched = field_value > value
+                elif op == "gte":
+                    matched = field_value >= value
+                elif op == "lt":
+                    matched = field_value < value
+                else:
+                    matched = field_value <= value
+            except TypeError:
+                matched = False
+        if not matched:
+            return False
+    return True
+
+
+def multi_value_conditions(
+    conditions: list[tuple[str, str, Any]],
+) -> list[tuple[str, str, Any]]:
+    """eq and in conditions on multi-value fields
+
+    Storages that can only approximate matching one of the joined values apply
+    these conditions again to their results with match_metadata_filter.
+    """
+    return [
+        (name, op, value)
+        for name, op, value in conditions
+        if name in METADATA_FILTER_MULTI_VALUE_FIELDS and op in ("eq", "in")
+    ]
+
+
+def metadata_filter_mask(
+    records: list[dict[str, Any]],
+    conditions: list[tuple[str, str, Any]],
+    field_map: dict[str, str] | None = None,
+) -> np.ndarray:
+    """Boolean mask of the records matching all conditions
+
+    field_map renames filter fields to the keys the records are stored under.
+    """
+    if field_map:
+        conditions = [
+            (field_map.get(name, name), op, value) for name, op, value in conditions
+        ]
+    return np.fromiter(
+        (match_metadata_filter(record, conditions) for record in records),
+        dtype=bool,
+        count=len(records),
+    )
+
+
 async def handle_cache(
     hashing_kv,
     args_hash,
@@ -2273,6 +2844,97 @@ class TokenTracker:
         )
 
 
+class RerankScoreCache:
+    """Bounded LRU cache of rerank scores keyed by model, query and document hash
+
+    Chunk ids are the hash of the chunk content, so a document hash identifies a
+    chunk the same way. Repeated queries rerank mostly the same candidates, their
+    scores are served from memory and only new candidates are sent to the reranker.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._scores: OrderedDict[str, float] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> float | None:
+        score = self._scores.get(key)
+        if score is not None:
+            self._scores.move_to_end(key)
+        return score
+
+    def put(self, key: str, score: float) -> None:
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.max_entries:
+            self._scores.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._scores), "hits": self.hits, "misses": self.misses}
+
+
+def rerank_score_cached(func, cache: RerankScoreCache):
+    """Serve the scores of rerank calls found in the cache, rerank only the others
+
+    Uncached documents are reranked with top_n=None so that all their scores can be
+    cached, the merged results are sorted by score and cut to top_n. Rerank functions
+    returning documents instead of [{"index", "relevance_score"}] are not cached.
+    """
+    model = getattr(func, "model_name", None) or getattr(func, "__qualname__", "")
+
+    @wraps(func)
+    async def wrapper(query: str, documents: list[str], top_n: int = None, **kwargs):
+        options = repr(sorted(kwargs.items()))
+        query_hash = compute_args_hash(model, options, query)
+        keys = [compute_args_hash(query_hash, document) for document in documents]
+        scores: dict[str, float] = {}
+        missing: dict[str, int] = {}
+        for index, key in enumerate(keys):
+            if key in scores or key in missing:
+                continue
+            score = cache.get(key)
+            if score is not None:
+                scores[key] = score
+            else:
+                missing[key] = index
+        cache.hits += len(scores)
+        cache.misses += len(missing)
+
+        if missing:
+            results = await func(
+                query=query,
+                documents=[documents[index] for index in missing.values()],
+                top_n=None,
+                **kwargs,
+            )
+            if results and not (isinstance(results[0], dict) and "index" in results[0]):
+                if scores:
+                    # Legacy format: rerank all documents again
+                    return await func(
+                        query=query, documents=documents, top_n=top_n, **kwargs
+                    )
+                return results
+            missing_keys = list(missing)
+            for result in results or []:
+                key = missing_keys[result["index"]]
+                scores[key] = result["relevance_score"]
+                cache.put(key, result["relevance_score"])
+
+        ranked = sorted(
+            (
+                {"index": index, "relevance_score": scores[key]}
+                for index, key in enumerate(keys)
+                if key in scores
+            ),
+            key=lambda result: result["relevance_score"],
+            reverse=True,
+        )
+        return ranked[:top_n] if top_n else ranked
+
+    return wrapper
+
+
 async def apply_rerank_if_enabled(
     query: str,
     retrieved_docs: list[dict],
@@ -2303,6 +2965,15 @@ async def apply_rerank_if_enabled(
         )
         return retrieved_docs
 
+    # Rerank functions scoring a bounded number of candidates declare it, capping
+    # here keeps the cache wrapper from passing it a different subset
+    max_candidates = getattr(rerank_func, "max_candidates", None)
+    if max_candidates and len(retrieved_docs) > max_candidates:
+        logger.debug(
+            f"Rerank: keeping {max_candidates} of {len(retrieved_docs)} candidates"
+        )
+        retrieved_docs = retrieved_docs[:max_candidates]
+
     try:
         # Extract document content for reranking
         document_texts = []
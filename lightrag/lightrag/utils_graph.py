@@ -5,12 +5,28 @@ import asyncio
 from typing import Any, cast
 
 from .base import DeletionResult
-from .kg.shared_storage import get_graph_db_lock
+from .kg.shared_storage import get_graph_db_lock, get_data_version, bump_data_version
 from .constants import GRAPH_FIELD_SEP
 from .utils import compute_mdhash_id, logger
 from .base import StorageNameSpace
 
 
+def _graph_version_namespace(chunk_entity_relation_graph) -> str:
+    return f"graph_version:{chunk_entity_relation_graph.workspace}:{chunk_entity_relation_graph.namespace}"
+
+
+async def get_graph_version(chunk_entity_relation_graph) -> int:
+    """Get the version of the knowledge graph, increased each time graph changes are committed"""
+    return await get_data_version(_graph_version_namespace(chunk_entity_relation_graph))
+
+
+async def bump_graph_version(chunk_entity_relation_graph) -> int:
+    """Mark the knowledge graph as changed, invalidating anything derived from older versions"""
+    return await bump_data_version(
+        _graph_version_namespace(chunk_entity_relation_graph)
+    )
+
+
 async def adelete_by_entity(
     chunk_entity_relation_graph, entities_vdb, relationships_vdb, entity_name: str
 ) -> DeletionResult:
@@ -79,6 +95,7 @@ async def _delete_by_entity_done(
             ]
         ]
     )
+    await bump_graph_version(chunk_entity_relation_graph)
 
 
 async def adelete_by_relation(
@@ -158,6 +175,7 @@ async def _delete_relation_done(relationships_vdb, chunk_entity_relation_graph)
             ]
         ]
     )
+    await bump_graph_version(chunk_entity_relation_graph)
 
 
 async def aedit_entity(
@@ -370,6 +388,7 @@ async def _edit_entity_done(
             ]
         ]
     )
+    await bump_graph_version(chunk_entity_relation_graph)
 
 
 async def aedit_relation(
@@ -486,6 +505,7 @@ async def _edit_relation_done(relationships_vdb, chunk_entity_relation_graph) ->
             ]
         ]
     )
+    await bump_graph_version(chunk_entity_relation_graph)
 
 
 async def acreate_entity(
@@ -1058,6 +1078,7 @@ async def _merge_entities_done(
             ]
         ]
     )
+    await bump_graph_version(chunk_entity_relation_graph)
 
 
 async def get_entity_info(